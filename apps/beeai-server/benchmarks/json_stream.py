@@ -0,0 +1,125 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Benchmark of the extraction of the markdown from docling responses (extract_string_value_stream).
+
+A synthetic docling response with a markdown document of the given size is fed in chunks of the given sizes to the
+current implementation and to the previous character by character scanner, both results are checked against json.loads:
+
+    uv run python benchmarks/json_stream.py --size-mb 50 --chunk-sizes 1024 65536
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from collections.abc import AsyncIterable, Callable
+
+from beeai_server.utils.json_stream import extract_string_value_stream
+
+
+async def legacy_extract_string_value_stream(
+    async_stream: Callable[[int], AsyncIterable[str]], key: str, chunk_size: int = 1024
+) -> AsyncIterable[str]:
+    """The previous implementation, kept as the baseline."""
+    buffer = ""
+    max_buffer_size = len(key) * 2
+    state = "outside"
+    if chunk_size < max_buffer_size:
+        raise ValueError("Chunk size too small")
+
+    async for chunk in async_stream(chunk_size):
+        buffer += chunk
+        if state == "outside":
+            if match := re.search(rf'"{key}" *: *"', buffer):
+                buffer = buffer[match.end() :]
+                state = "inside"
+            else:
+                buffer = buffer[-max_buffer_size:]
+        if state == "inside":
+            backslash_count = 0
+            for idx, char in enumerate(buffer):
+                if char == "\\":
+                    backslash_count += 1
+                elif char == '"':
+                    if backslash_count % 2 == 0:
+                        yield json.loads(f'"{buffer[:idx]}"')
+                        return
+                    backslash_count = 0
+                else:
+                    backslash_count = 0
+            if backslash_count % 2 == 0:
+                yield json.loads(f'"{buffer}"')
+                buffer = ""
+            else:
+                yield json.loads(f'"{buffer[:-1]}"')
+                buffer = "\\"
+
+    if state == "inside":
+        raise EOFError("Unterminated string value in JSON input")
+    else:
+        raise KeyError(f"Key {key} not found in JSON input")
+
+
+def docling_response(size: int, seed: int = 42) -> tuple[str, str]:
+    """Markdown with headings, tables, quotes and non-ASCII text, serialized like the docling response."""
+    rng = random.Random(seed)
+    lines = [
+        "## Section {n}",
+        "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt {n}.",
+        '| Column "A" | Column B | C:\\path\\{n} |',
+        "|---|---|---|",
+        "Příliš žluťoučký kůň úpěl ďábelské ódy, 中文文本, emoji \U0001f600 {n}",
+        "\t- item {n}",
+        "",
+    ]
+    markdown, length = [], 0
+    while length < size:
+        line = rng.choice(lines).format(n=rng.randint(0, 10_000))
+        markdown.append(line)
+        length += len(line) + 1
+    markdown = "\n".join(markdown)
+    # Without \uXXXX escapes like the docling response, the legacy implementation fails on escapes split by chunks
+    response = json.dumps(
+        {"document": {"filename": "document.pdf", "md_content": markdown}, "status": "success"}, ensure_ascii=False
+    )
+    return response, markdown
+
+
+def reader(response: str) -> Callable[[int], AsyncIterable[str]]:
+    async def read(chunk_size: int) -> AsyncIterable[str]:
+        for offset in range(0, len(response), chunk_size):
+            yield response[offset : offset + chunk_size]
+
+    return read
+
+
+async def measure(extract, response: str, expected: str, chunk_size: int) -> float:
+    start = time.perf_counter()
+    result = [chunk async for chunk in extract(reader(response), "md_content", chunk_size)]
+    elapsed = time.perf_counter() - start
+    assert "".join(result) == expected, "The extracted value does not match json.loads"
+    return elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=50)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[1024, 65536])
+    args = parser.parse_args()
+
+    response, expected = docling_response(int(args.size_mb * 1024 * 1024))
+    assert json.loads(response)["document"]["md_content"] == expected
+    size_mb = len(response) / 1024 / 1024
+    print(f"Response of {size_mb:.1f} MiB")
+    for chunk_size in args.chunk_sizes:
+        for name, extract in [("legacy", legacy_extract_string_value_stream), ("current", extract_string_value_stream)]:
+            elapsed = await measure(extract, response, expected, chunk_size)
+            print(f"{name:>8} chunk_size={chunk_size:>6}: {elapsed:7.3f} s, {size_mb / elapsed:8.1f} MiB/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
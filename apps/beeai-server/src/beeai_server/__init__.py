@@ -8,20 +8,16 @@ import socket
 import sys
 
 from beeai_server.configuration import get_configuration
-
-# configure logging before importing anything
 from beeai_server.logging_config import configure_logging
 
-configure_logging()
-
-from beeai_server.telemetry import configure_telemetry  # noqa: E402
-
-configure_telemetry()
+# Logging and telemetry are configured by the entrypoints, importing the package has no side effects. Modules are
+# imported by worker processes (e.g. the builtin text extraction) which must not set up their own exporters.
 
 logger = logging.getLogger(__name__)
 
 
 def serve():
+    configure_logging()
     config = get_configuration()
     host = "0.0.0.0"
 
@@ -53,12 +49,14 @@ def serve():
 
 
 def migrate():
+    configure_logging()
     from beeai_server.infrastructure.persistence.migrations.migrate import migrate as migrate_fn
 
     migrate_fn()
 
 
 def create_vector_extension():
+    configure_logging()
     from beeai_server.infrastructure.persistence.migrations.migrate import create_vector_extension as create_fn
 
     asyncio.run(create_fn())
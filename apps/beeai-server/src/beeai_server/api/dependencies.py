@@ -10,6 +10,7 @@ from kink import di
 from beeai_server.configuration import Configuration
 from beeai_server.domain.models.user import User, UserRole
 from beeai_server.service_layer.services.a2a import A2AProxyService
+from beeai_server.service_layer.services.embeddings import EmbeddingService
 from beeai_server.service_layer.services.env import EnvService
 from beeai_server.service_layer.services.files import FileService
 from beeai_server.service_layer.services.provider import ProviderService
@@ -20,6 +21,7 @@ ConfigurationDependency = Annotated[Configuration, Depends(lambda: di[Configurat
 ProviderServiceDependency = Annotated[ProviderService, Depends(lambda: di[ProviderService])]
 A2AProxyServiceDependency = Annotated[A2AProxyService, Depends(lambda: di[A2AProxyService])]
 EnvServiceDependency = Annotated[EnvService, Depends(lambda: di[EnvService])]
+EmbeddingServiceDependency = Annotated[EmbeddingService, Depends(lambda: di[EmbeddingService])]
 FileServiceDependency = Annotated[FileService, Depends(lambda: di[FileService])]
 UserServiceDependency = Annotated[UserService, Depends(lambda: di[UserService])]
 VectorStoreServiceDependency = Annotated[VectorStoreService, Depends(lambda: di[VectorStoreService])]
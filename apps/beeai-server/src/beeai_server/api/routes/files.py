@@ -6,17 +6,19 @@ from contextlib import AsyncExitStack
 from uuid import UUID
 
 import fastapi
-from fastapi import APIRouter, UploadFile, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Request, UploadFile, status
+from fastapi.responses import FileResponse, RedirectResponse, Response, StreamingResponse
 
 from beeai_server.api.dependencies import (
     AuthenticatedUserDependency,
     FileServiceDependency,
 )
 from beeai_server.api.schema.common import EntityModel
-from beeai_server.domain.models.file import AsyncFile, File, TextExtraction
+from beeai_server.api.schema.files import CompleteFileUploadRequest, CreateFileUploadRequest, FileUrlResponse
+from beeai_server.domain.models.file import AsyncFile, File, FileUploadSession, TextExtraction
 from beeai_server.domain.models.user import User
 from beeai_server.service_layer.services.files import FileService
+from beeai_server.utils.fastapi import etag_matches, parse_range_header, stream_request_file, streaming_response
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +35,71 @@ async def upload_file(
     )
 
 
+@router.post(
+    "/stream",
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/octet-stream": {"schema": {"type": "string", "format": "binary"}},
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"],
+                    }
+                },
+            },
+        }
+    },
+)
+async def upload_file_stream(
+    request: Request,
+    file_service: FileServiceDependency,
+    user: AuthenticatedUserDependency,
+    filename: str | None = None,
+) -> EntityModel[File]:
+    """Upload a file streamed directly to the object storage as it is received, without buffering it on disk.
+
+    The body is either the raw file content (the filename query parameter is required and the content type is taken
+    from the Content-Type header) or a multipart form with a single file field.
+    """
+    return await file_service.upload_file(file=await stream_request_file(request, filename=filename), user=user)
+
+
+@router.post("/uploads", status_code=status.HTTP_201_CREATED)
+async def create_file_upload(
+    request: CreateFileUploadRequest, file_service: FileServiceDependency, user: AuthenticatedUserDependency
+) -> FileUploadSession:
+    """Start an upload of a file directly to the object storage using presigned URLs.
+
+    Upload each part with a PUT request to its URL (including the session headers), then complete the upload.
+    """
+    return await file_service.create_upload_session(
+        filename=request.filename, content_type=request.content_type, size=request.size, user=user
+    )
+
+
+@router.post("/uploads/{file_id}/complete", status_code=status.HTTP_201_CREATED)
+async def complete_file_upload(
+    file_id: UUID,
+    request: CompleteFileUploadRequest,
+    file_service: FileServiceDependency,
+    user: AuthenticatedUserDependency,
+) -> EntityModel[File]:
+    return await file_service.complete_upload_session(
+        file_id=file_id, upload_id=request.upload_id, parts=request.parts, user=user
+    )
+
+
+@router.delete("/uploads/{file_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_file_upload(
+    file_id: UUID, upload_id: str, file_service: FileServiceDependency, user: AuthenticatedUserDependency
+) -> None:
+    await file_service.abort_upload_session(file_id=file_id, upload_id=upload_id, user=user)
+
+
 @router.get("/{file_id}")
 async def get_file(
     file_id: UUID, file_service: FileServiceDependency, user: AuthenticatedUserDependency
@@ -40,33 +107,92 @@ async def get_file(
     return await file_service.get(file_id=file_id, user=user)
 
 
-async def _stream_file(*, file_service: FileService, user: User, file_id: UUID) -> StreamingResponse:
-    exit_stack = AsyncExitStack()
-    file = await exit_stack.enter_async_context(file_service.get_content(file_id=file_id, user=user))
+# Larger responses are streamed in larger chunks, fewer reads and writes per byte without buffering small files
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 1024 * 1024
+
+
+async def _stream_file(*, file_service: FileService, user: User, file_id: UUID, request: Request) -> Response:
+    metadata = await file_service.get(file_id=file_id, user=user)
+    headers = {"Accept-Ranges": "bytes"}
+    etag = None
+    if metadata.checksum_sha256:
+        headers["ETag"] = etag = f'"{metadata.checksum_sha256}"'
+        if (if_none_match := request.headers.get("If-None-Match")) and etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    # If-Range requires a strong match, otherwise (or with a date) the whole content is sent
+    if range_header and metadata.file_size_bytes is not None and (if_range is None or if_range == etag):
+        byte_range = parse_range_header(range_header, metadata.file_size_bytes)
 
-    async def iter_file(chunk_size=8192):
+    exit_stack = AsyncExitStack()
+    file = await exit_stack.enter_async_context(
+        file_service.get_content(file_id=file_id, user=user, byte_range=byte_range)
+    )
+    if file.path:
+        # Local files are sent by the server, using zero-copy sendfile if it supports the pathsend extension
+        await exit_stack.aclose()
+        return FileResponse(file.path, media_type=file.content_type, headers=headers)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {byte_range[0]}-{byte_range[1]}/{metadata.file_size_bytes}"
+    if file.size is not None:
+        headers["Content-Length"] = str(file.size)
+
+    chunk_size = min(max(MIN_CHUNK_SIZE, (file.size or 0) // 16), MAX_CHUNK_SIZE)
+
+    async def iter_file():
         try:
             while chunk := await file.read(chunk_size):
                 yield chunk
         finally:
             await exit_stack.aclose()
 
-    return StreamingResponse(content=iter_file(), media_type=file.content_type)
+    return StreamingResponse(
+        content=iter_file(),
+        status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+        media_type=file.content_type,
+        headers=headers,
+    )
 
 
 @router.get("/{file_id}/content")
 async def get_file_content(
+    file_id: UUID,
+    request: Request,
+    file_service: FileServiceDependency,
+    user: AuthenticatedUserDependency,
+    redirect: bool = False,
+) -> Response:
+    """
+    Download the file content, with redirect the client is redirected to download it from the object storage.
+
+    Single byte ranges (Range, If-Range) and conditional requests (If-None-Match) are supported.
+    """
+    if redirect:
+        url = await file_service.get_download_url(file_id=file_id, user=user)
+        return RedirectResponse(str(url), status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+    return await _stream_file(file_service=file_service, user=user, file_id=file_id, request=request)
+
+
+@router.get("/{file_id}/url")
+async def get_file_url(
     file_id: UUID, file_service: FileServiceDependency, user: AuthenticatedUserDependency
-) -> StreamingResponse:
-    return await _stream_file(file_service=file_service, user=user, file_id=file_id)
+) -> FileUrlResponse:
+    """Get a presigned URL to download the file content directly from the object storage."""
+    return FileUrlResponse(url=str(await file_service.get_download_url(file_id=file_id, user=user)))
 
 
 @router.get("/{file_id}/text_content")
 async def get_text_file_content(
-    file_id: UUID, file_service: FileServiceDependency, user: AuthenticatedUserDependency
-) -> StreamingResponse:
+    file_id: UUID, request: Request, file_service: FileServiceDependency, user: AuthenticatedUserDependency
+) -> Response:
     extraction = await file_service.get_extraction(file_id=file_id, user=user)
-    return await _stream_file(file_service=file_service, user=user, file_id=extraction.extracted_file_id)
+    return await _stream_file(
+        file_service=file_service, user=user, file_id=extraction.extracted_file_id, request=request
+    )
 
 
 @router.delete("/{file_id}", status_code=fastapi.status.HTTP_204_NO_CONTENT)
@@ -95,6 +221,25 @@ async def get_text_extraction(
     return await file_service.get_extraction(file_id=file_id, user=user)
 
 
+@router.get("/{file_id}/extraction/events")
+async def watch_text_extraction(
+    file_id: UUID, file_service: FileServiceDependency, user: AuthenticatedUserDependency
+) -> StreamingResponse:
+    """
+    Stream the text extraction as server-sent events instead of polling it.
+
+    The first event is the current state, followed by its changes and the progress of a running extraction. The stream
+    ends when the extraction is completed, failed or cancelled.
+    """
+    await file_service.get_extraction(file_id=file_id, user=user)  # respond with 404 before the stream starts
+
+    async def events():
+        async for event in file_service.watch_extraction(file_id=file_id, user=user):
+            yield event.model_dump_json()
+
+    return streaming_response(events())
+
+
 @router.delete("/{file_id}/extraction", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_text_extraction(
     file_id: UUID, file_service: FileServiceDependency, user: AuthenticatedUserDependency
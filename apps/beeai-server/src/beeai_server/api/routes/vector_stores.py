@@ -2,20 +2,29 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import logging
+from contextlib import AsyncExitStack
 from uuid import UUID
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
 
 from beeai_server.api.dependencies import AuthenticatedUserDependency, VectorStoreServiceDependency
 from beeai_server.api.schema.common import EntityModel, PaginatedResponse
 from beeai_server.api.schema.vector_stores import (
+    BatchSearchRequest,
     CreateVectorStoreRequest,
+    FederatedSearchRequest,
     SearchRequest,
 )
 from beeai_server.domain.models.vector_store import (
+    MAX_EF_SEARCH,
+    SnapshotFormat,
     VectorStore,
+    VectorStoreBatchSearchResult,
     VectorStoreDocument,
+    VectorStoreDocumentReplaceResult,
     VectorStoreItem,
+    VectorStoreRecallReport,
     VectorStoreSearchResult,
 )
 
@@ -23,6 +32,11 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+_SNAPSHOT_MEDIA_TYPES = {
+    SnapshotFormat.arrow: "application/vnd.apache.arrow.stream",
+    SnapshotFormat.parquet: "application/vnd.apache.parquet",
+}
+
 
 @router.post("", status_code=status.HTTP_201_CREATED)
 async def create_vector_store(
@@ -32,8 +46,34 @@ async def create_vector_store(
 ) -> EntityModel[VectorStore]:
     """Create a new vector store."""
     return await vector_store_service.create(
-        name=request.name, dimension=request.dimension, user=user, model_id=request.model_id
+        name=request.name,
+        dimension=request.dimension,
+        user=user,
+        model_id=request.model_id,
+        quantization=request.quantization,
+        index_settings=request.index_settings,
+    )
+
+
+@router.post("/search")
+async def federated_search(
+    request: FederatedSearchRequest,
+    vector_store_service: VectorStoreServiceDependency,
+    user: AuthenticatedUserDependency,
+) -> PaginatedResponse[VectorStoreSearchResult]:
+    """Search multiple vector stores at once, results are ranked globally and contain their vector store ID."""
+    response = await vector_store_service.federated_search(
+        vector_store_ids=request.vector_store_ids,
+        query_vector=request.query_vector,
+        query_text=request.query_text,
+        limit=request.limit,
+        include=request.include,
+        embedding_format=request.embedding_format,
+        oversampling=request.oversampling,
+        ef_search=request.ef_search,
+        user=user,
     )
+    return PaginatedResponse(items=response, total_count=len(response))
 
 
 @router.get("/{vector_store_id}")
@@ -77,12 +117,105 @@ async def search_with_vector(
     response = await vector_store_service.search(
         vector_store_id=vector_store_id,
         query_vector=request.query_vector,
+        query_text=request.query_text,
+        mode=request.mode,
         limit=request.limit,
+        include=request.include,
+        embedding_format=request.embedding_format,
+        oversampling=request.oversampling,
+        ef_search=request.ef_search,
+        mmr_lambda=request.mmr_lambda,
+        max_per_document=request.max_per_document,
+        candidate_limit=request.candidate_limit,
         user=user,
     )
     return PaginatedResponse(items=response, total_count=len(response))
 
 
+@router.post("/{vector_store_id}/search/batch")
+async def batch_search_with_vectors(
+    vector_store_id: UUID,
+    request: BatchSearchRequest,
+    vector_store_service: VectorStoreServiceDependency,
+    user: AuthenticatedUserDependency,
+) -> VectorStoreBatchSearchResult:
+    """Search a vector store using multiple query vectors in a single request."""
+    return await vector_store_service.batch_search(
+        vector_store_id=vector_store_id,
+        query_vectors=request.query_vectors,
+        limit=request.limit,
+        deduplicate=request.deduplicate,
+        merge=request.merge,
+        include=request.include,
+        embedding_format=request.embedding_format,
+        oversampling=request.oversampling,
+        ef_search=request.ef_search,
+        user=user,
+    )
+
+
+@router.get("/{vector_store_id}/recall")
+async def get_recall_report(
+    vector_store_id: UUID,
+    vector_store_service: VectorStoreServiceDependency,
+    user: AuthenticatedUserDependency,
+    sample_size: int = Query(default=10, ge=1, le=100),
+    limit: int = Query(default=10, ge=1, le=10),
+    oversampling: int | None = Query(default=None, ge=1, le=100),
+    ef_search: int | None = Query(default=None, ge=1, le=MAX_EF_SEARCH),
+) -> VectorStoreRecallReport:
+    """Estimate the recall of the vector store search compared to exact search."""
+    return await vector_store_service.recall_report(
+        vector_store_id=vector_store_id,
+        sample_size=sample_size,
+        limit=limit,
+        oversampling=oversampling,
+        ef_search=ef_search,
+        user=user,
+    )
+
+
+@router.get("/{vector_store_id}/export")
+async def export_vector_store(
+    vector_store_id: UUID,
+    vector_store_service: VectorStoreServiceDependency,
+    user: AuthenticatedUserDependency,
+    format: SnapshotFormat = SnapshotFormat.arrow,
+) -> StreamingResponse:
+    """Export all items of a vector store as an Arrow IPC stream or a Parquet file."""
+    exit_stack = AsyncExitStack()
+    snapshot = await exit_stack.enter_async_context(
+        vector_store_service.export_snapshot(vector_store_id=vector_store_id, snapshot_format=format, user=user)
+    )
+
+    async def iter_snapshot():
+        try:
+            async for chunk in snapshot:
+                yield chunk
+        finally:
+            await exit_stack.aclose()
+
+    return StreamingResponse(
+        content=iter_snapshot(),
+        media_type=_SNAPSHOT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{vector_store_id}.{format}"'},
+    )
+
+
+@router.post("/{vector_store_id}/import")
+async def import_vector_store(
+    vector_store_id: UUID,
+    file: UploadFile,
+    vector_store_service: VectorStoreServiceDependency,
+    user: AuthenticatedUserDependency,
+    format: SnapshotFormat = SnapshotFormat.arrow,
+) -> EntityModel[VectorStore]:
+    """Import items from a snapshot created by the export endpoint."""
+    return await vector_store_service.import_snapshot(
+        vector_store_id=vector_store_id, file=file.file, snapshot_format=format, user=user
+    )
+
+
 @router.get("/{vector_store_id}/documents")
 async def list_documents(
     vector_store_id: UUID,
@@ -94,6 +227,28 @@ async def list_documents(
     return PaginatedResponse(items=documents, total_count=len(documents))
 
 
+@router.put("/{vector_store_id}/documents/{document_id}")
+async def replace_document(
+    vector_store_id: UUID,
+    document_id: str,
+    items: list[VectorStoreItem],
+    vector_store_service: VectorStoreServiceDependency,
+    user: AuthenticatedUserDependency,
+) -> VectorStoreDocumentReplaceResult:
+    """
+    Replace all items of a document, only new and changed items are written and the items missing are deleted.
+
+    Items are matched by ID and compared by the hash of their text, metadata and embedding.
+    """
+    if any(item.document_id != document_id for item in items):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"All items must belong to document {document_id}"
+        )
+    return await vector_store_service.replace_document(
+        vector_store_id=vector_store_id, document_id=document_id, items=items, user=user
+    )
+
+
 @router.delete("/{vector_store_id}/documents/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_document(
     vector_store_id: UUID,
@@ -3,7 +3,9 @@
 
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from beeai_server.domain.models.file import CompletedUploadPart
 
 
 class FileResponse(BaseModel):
@@ -23,3 +25,22 @@ class FileUrlResponse(BaseModel):
     """Response schema for file URL."""
 
     url: str
+
+
+class CreateFileUploadRequest(BaseModel):
+    """Request to upload a file directly to the object storage."""
+
+    filename: str = Field(..., max_length=256)
+    content_type: str = "application/octet-stream"
+    size: int = Field(..., description="Exact size of the file in bytes", ge=0)
+
+
+class CompleteFileUploadRequest(BaseModel):
+    """Request to complete a direct upload once all parts were uploaded."""
+
+    upload_id: str | None = Field(
+        None, description="Multipart upload ID returned by the upload session, omit for single part uploads"
+    )
+    parts: list[CompletedUploadPart] = Field(
+        default_factory=list, description="Part numbers with the ETag response header returned by each part upload"
+    )
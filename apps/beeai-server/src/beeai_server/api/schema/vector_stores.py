@@ -1,20 +1,130 @@
 # Copyright 2025 © BeeAI a Series of LF Projects, LLC
 # SPDX-License-Identifier: Apache-2.0
 
+from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+from beeai_server.domain.models.vector_store import (
+    MAX_EF_SEARCH,
+    MAX_VECTOR_DIMENSION,
+    EmbeddingFormat,
+    HnswIndexSettings,
+    SearchMode,
+    VectorQuantization,
+    VectorStoreItemField,
+)
 
 
 class CreateVectorStoreRequest(BaseModel):
     """Request to create a new vector store."""
 
     name: str = Field(..., description="Name of the vector store")
-    dimension: int = Field(..., description="Dimension of the vectors to be stored")
+    dimension: int = Field(..., description="Dimension of the vectors to be stored", gt=0, le=MAX_VECTOR_DIMENSION)
     model_id: str
+    quantization: VectorQuantization = Field(
+        VectorQuantization.none,
+        description="Use 'binary' to index vectors as bits, trading some recall for lower memory and faster search",
+    )
+    index_settings: HnswIndexSettings | None = Field(
+        None, description="HNSW build parameters, higher values improve recall at the cost of slower indexing"
+    )
+
+
+class SearchResultOptions(BaseModel):
+    include: list[VectorStoreItemField] = Field(
+        default_factory=lambda: list(VectorStoreItemField),
+        description="Item fields to return, leave out 'embedding' to get smaller and faster responses",
+    )
+    embedding_format: EmbeddingFormat = Field(
+        EmbeddingFormat.float,
+        description="Use 'base64' to get embeddings as base64 encoded little-endian float16 values",
+    )
+    oversampling: int | None = Field(
+        None,
+        description="Candidates retrieved per result before re-ranking in binary quantized stores",
+        ge=1,
+        le=100,
+    )
+    ef_search: int | None = Field(
+        None,
+        description="Size of the HNSW candidate list, higher values improve recall at the cost of latency. "
+        "Derived from the number of requested results by default",
+        ge=1,
+        le=MAX_EF_SEARCH,
+    )
 
 
-class SearchRequest(BaseModel):
+class SearchRequest(SearchResultOptions):
     """Request to search a vector store."""
 
-    query_vector: list[float] = Field(None, description="Vector to search for")
+    query_vector: list[float] | None = Field(None, description="Vector to search for")
+    query_text: str | None = Field(
+        None,
+        description=(
+            "Text to search for, embedded using the model of the vector store when query_vector is not given. "
+            "In hybrid mode, it is also matched using full-text search"
+        ),
+    )
+    mode: SearchMode = Field(
+        SearchMode.vector,
+        description="Use 'hybrid' to fuse vector similarity and full-text results using reciprocal rank fusion",
+    )
     limit: int = Field(5, description="Maximum number of results to return", le=10)
+    mmr_lambda: float | None = Field(
+        None,
+        description=(
+            "Re-rank the candidates using maximal marginal relevance, 1 keeps the relevance order and lower values "
+            "prefer results dissimilar to the ones already selected"
+        ),
+        ge=0,
+        le=1,
+    )
+    max_per_document: int | None = Field(None, description="Maximum number of results from the same document", ge=1)
+    candidate_limit: int | None = Field(
+        None,
+        description=(
+            "Number of candidates to diversify when mmr_lambda or max_per_document is set, defaults to 5 times the limit"
+        ),
+        ge=1,
+        le=100,
+    )
+
+    @model_validator(mode="after")
+    def validate_query(self):
+        if self.query_vector is None and not self.query_text:
+            raise ValueError("Either query_vector or query_text is required")
+        if self.mode == SearchMode.hybrid and not self.query_text:
+            raise ValueError("query_text is required for hybrid search")
+        if self.candidate_limit is not None and self.candidate_limit < self.limit:
+            raise ValueError("candidate_limit must not be lower than limit")
+        return self
+
+
+class BatchSearchRequest(SearchResultOptions):
+    """Request to search a vector store with multiple query vectors at once."""
+
+    query_vectors: list[list[float]] = Field(..., description="Vectors to search for", min_length=1, max_length=32)
+    limit: int = Field(5, description="Maximum number of results to return per query", le=10)
+    deduplicate: bool = Field(False, description="Return each item only for the query where it scored the highest")
+    merge: bool = Field(
+        False, description="Additionally return a single list of unique items ranked by their best score"
+    )
+
+
+class FederatedSearchRequest(SearchResultOptions):
+    """Request to search multiple vector stores with the same dimension and model at once."""
+
+    vector_store_ids: list[UUID] = Field(..., description="Vector stores to search", min_length=1, max_length=100)
+    query_vector: list[float] | None = Field(None, description="Vector to search for")
+    query_text: str | None = Field(
+        None,
+        description="Text to search for, embedded using the model of the vector stores if query_vector is not given",
+    )
+    limit: int = Field(5, description="Maximum number of results to return across all vector stores", le=10)
+
+    @model_validator(mode="after")
+    def validate_query(self):
+        if self.query_vector is None and not self.query_text:
+            raise ValueError("Either query_vector or query_text is required")
+        return self
@@ -24,13 +24,16 @@ from beeai_server.api.routes.ui import router as ui_router
 from beeai_server.api.routes.vector_stores import router as vector_stores_router
 from beeai_server.bootstrap import bootstrap_dependencies_sync
 from beeai_server.configuration import Configuration
+from beeai_server.domain.repositories.file import IExtractionUpdateListener, IObjectStorageRepository
+from beeai_server.domain.repositories.vector_store import IVectorStoreCache
 from beeai_server.exceptions import (
     DuplicateEntityError,
     ManifestLoadError,
     PlatformError,
 )
+from beeai_server.logging_config import configure_logging
 from beeai_server.run_workers import run_workers
-from beeai_server.telemetry import INSTRUMENTATION_NAME, shutdown_telemetry
+from beeai_server.telemetry import INSTRUMENTATION_NAME, configure_telemetry, shutdown_telemetry
 
 logger = logging.getLogger(__name__)
 
@@ -97,6 +100,23 @@ def register_telemetry():
 
     meter.create_observable_gauge("platform_status", callbacks=[scrape_platform_status])
 
+    def scrape_vector_store_cache(options: CallbackOptions) -> Iterable[Observation]:
+        vector_store_cache = di[IVectorStoreCache]
+        yield Observation(value=vector_store_cache.memory_bytes, attributes={"type": "used"})
+        yield Observation(value=vector_store_cache.memory_limit_bytes, attributes={"type": "limit"})
+
+    def scrape_vector_store_cache_stores(options: CallbackOptions) -> Iterable[Observation]:
+        yield Observation(value=di[IVectorStoreCache].num_stores)
+
+    def scrape_vector_store_cache_searches(options: CallbackOptions) -> Iterable[Observation]:
+        vector_store_cache = di[IVectorStoreCache]
+        yield Observation(value=vector_store_cache.hits, attributes={"result": "hit"})
+        yield Observation(value=vector_store_cache.misses, attributes={"result": "miss"})
+
+    meter.create_observable_gauge("vector_store_cache_memory", callbacks=[scrape_vector_store_cache], unit="By")
+    meter.create_observable_gauge("vector_store_cache_stores", callbacks=[scrape_vector_store_cache_stores])
+    meter.create_observable_counter("vector_store_cache_searches", callbacks=[scrape_vector_store_cache_searches])
+
     # TODO: extract to a separate "metrics exporter" pod
     # def scrape_providers_by_status(options: CallbackOptions) -> Iterable[Observation]:
     #     providers = provider_container.loaded_providers.values()
@@ -118,19 +138,29 @@ def register_telemetry():
 def app(*, dependency_overrides: Container | None = None) -> FastAPI:
     """Entrypoint for API application, called by Uvicorn"""
 
+    configure_logging()
+    configure_telemetry()
+
     logger.info("Bootstrapping dependencies...")
     bootstrap_dependencies_sync(dependency_overrides=dependency_overrides)
     configuration = di[Configuration]
 
     @asynccontextmanager
     @inject
-    async def lifespan(_app: FastAPI, procrastinate_app: procrastinate.App):
+    async def lifespan(
+        _app: FastAPI,
+        procrastinate_app: procrastinate.App,
+        object_storage_repository: IObjectStorageRepository,
+        extraction_update_listener: IExtractionUpdateListener,
+    ):
         try:
             register_telemetry()
             async with procrastinate_app.open_async(), run_workers(app=procrastinate_app):
                 try:
                     yield
                 finally:
+                    await object_storage_repository.close()
+                    await extraction_update_listener.close()
                     shutdown_telemetry()
         except Exception as e:
             logger.error("Error during startup: %s", repr(extract_messages(e)))
@@ -10,11 +10,21 @@ from kink import Container, di
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 
 from beeai_server.configuration import Configuration, get_configuration
-from beeai_server.domain.repositories.file import IObjectStorageRepository, ITextExtractionBackend
+from beeai_server.domain.repositories.file import (
+    IBuiltinTextExtractionBackend,
+    IExtractionUpdateListener,
+    IObjectStorageRepository,
+    ITextExtractionBackend,
+)
+from beeai_server.domain.repositories.vector_store import IVectorStoreCache
 from beeai_server.infrastructure.kubernetes.provider_deployment_manager import KubernetesProviderDeploymentManager
+from beeai_server.infrastructure.object_storage.filesystem import FilesystemObjectStorageRepository
 from beeai_server.infrastructure.object_storage.repository import S3ObjectStorageRepository
+from beeai_server.infrastructure.persistence.extraction_updates import PostgresExtractionUpdateListener
 from beeai_server.infrastructure.persistence.unit_of_work import SqlAlchemyUnitOfWorkFactory
+from beeai_server.infrastructure.text_extraction.builtin import BuiltinTextExtractionBackend
 from beeai_server.infrastructure.text_extraction.docling import DoclingTextExtractionBackend
+from beeai_server.infrastructure.vector_database.cache import InMemoryVectorStoreCache
 from beeai_server.jobs.procrastinate import create_app
 from beeai_server.service_layer.deployment_manager import IProviderDeploymentManager
 from beeai_server.service_layer.unit_of_work import IUnitOfWorkFactory
@@ -63,10 +73,17 @@ async def bootstrap_dependencies(dependency_overrides: Container | None = None):
     )
 
     # Register object storage repository and file service
-    _set_di(IObjectStorageRepository, S3ObjectStorageRepository(di[Configuration]))
+    match di[Configuration].object_storage.backend:
+        case "s3":
+            _set_di(IObjectStorageRepository, S3ObjectStorageRepository(di[Configuration]))
+        case "filesystem":
+            _set_di(IObjectStorageRepository, FilesystemObjectStorageRepository(di[Configuration]))
+    _set_di(IExtractionUpdateListener, PostgresExtractionUpdateListener(di[Configuration]))
     _set_di(procrastinate.App, create_app())
 
     _set_di(ITextExtractionBackend, DoclingTextExtractionBackend(di[Configuration].text_extraction))
+    _set_di(IBuiltinTextExtractionBackend, BuiltinTextExtractionBackend(di[Configuration].builtin_text_extraction))
+    _set_di(IVectorStoreCache, InMemoryVectorStoreCache(di[Configuration].vector_stores))
 
 
 bootstrap_dependencies_sync = async_to_sync_isolated(bootstrap_dependencies)
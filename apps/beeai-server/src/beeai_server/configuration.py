@@ -81,6 +81,9 @@ class AuthConfiguration(BaseModel):
 
 
 class ObjectStorageConfiguration(BaseModel):
+    # The filesystem backend keeps the files in a local directory, intended for desktop and single node installations
+    backend: Literal["s3", "filesystem"] = "s3"
+    filesystem_root_dir: Path = Path("/var/lib/beeai-server/files")
     endpoint_url: AnyUrl = AnyUrl("http://seaweedfs-all-in-one:9009")
     access_key_id: Secret[str] = Secret("beeai-admin-user")
     access_key_secret: Secret[str] = Secret("beeai-admin-password")
@@ -89,6 +92,18 @@ class ObjectStorageConfiguration(BaseModel):
     use_ssl: bool = False
     storage_limit_per_user_bytes: int = 1 * (1024 * 1024 * 1024)  # 1GiB
     max_single_file_size: int = 100 * (1024 * 1024)  # 100 MiB
+    # A single S3 client is shared by all operations, its connections are kept alive and reused between them
+    max_pool_connections: int = Field(default=50, ge=1)
+    keepalive_timeout_sec: float = Field(default=60, gt=0)
+    connect_timeout_sec: float = Field(default=5, gt=0)
+    read_timeout_sec: float = Field(default=60, gt=0)
+    max_retry_attempts: int = Field(default=3, ge=0)
+    # Files larger than a single part are uploaded using multipart uploads, uploading parts concurrently
+    multipart_chunk_size: int = Field(default=8 * (1024 * 1024), ge=5 * (1024 * 1024))  # 8 MiB, S3 minimum is 5 MiB
+    multipart_max_concurrency: int = Field(default=4, ge=1)
+    # Endpoint used in presigned URLs handed out to API clients, the endpoint_url may not be reachable from outside
+    public_endpoint_url: AnyUrl | None = None
+    presigned_url_expiration_sec: int = Field(default=int(timedelta(hours=1).total_seconds()), gt=0)
 
 
 class PersistenceConfiguration(BaseModel):
@@ -102,7 +117,26 @@ class PersistenceConfiguration(BaseModel):
 
 class VectorStoresConfiguration(BaseModel):
     expire_after_days: int = 7  # Number of days after which a vector store is considered expired
+    # Expired vector stores are deleted in batches, each in its own transaction, with a delay between the batches
+    expire_batch_size: int = Field(default=100, ge=1)
+    expire_batch_delay_seconds: float = Field(default=1.0, ge=0)
+    # Number of items deleted from a collection table after which it is vacuumed and its vector index rebuilt
+    expire_vacuum_threshold: int = Field(default=100_000, ge=1)
     storage_limit_per_user_bytes: int = 1 * (1024 * 1024 * 1024)  # 1GiB
+    # Number of binary quantized candidates retrieved per requested result before re-ranking with full precision
+    quantization_oversampling: int = Field(default=4, ge=1)
+    query_embedding_cache_size: int = 1024  # Number of embedded text search queries to keep in memory
+    # Number of seconds the embedding backend settings (platform env) used to embed search queries are kept in memory
+    query_embedding_env_ttl_seconds: float = Field(default=30, ge=0)
+    # In-process cache of frequently searched vector stores answering searches without the database, 0 disables it
+    cache_size_bytes: int = 512 * (1024 * 1024)  # 512MiB
+    cache_max_store_bytes: int = 128 * (1024 * 1024)  # Larger vector stores (by usage_bytes) are never cached
+    cache_min_searches: int = 3  # Number of searches after which a vector store is loaded into the cache
+    # Number of recently searched vector stores (not in the cache) whose searches are counted towards cache_min_searches
+    cache_tracked_stores: int = Field(default=10_000, ge=1)
+    snapshot_batch_size: int = Field(default=1000, ge=1)  # Number of items per batch of snapshot export and import
+    # Number of vector stores (and users) whose statistics are reconciled in a single transaction
+    reconcile_batch_size: int = Field(default=500, ge=1)
 
 
 class TelemetryConfiguration(BaseModel):
@@ -143,6 +177,14 @@ class DoclingExtractionConfiguration(BaseModel):
     processing_timeout_sec: int = timedelta(minutes=5).total_seconds()
 
 
+class BuiltinExtractionConfiguration(BaseModel):
+    """Text extraction of simple formats (HTML, CSV, JSON, DOCX) in local worker processes instead of docling."""
+
+    enabled: bool = True
+    max_file_size: int = 20 * (1024 * 1024)  # 20 MiB, larger files are extracted by docling
+    max_processes: int = Field(default=2, ge=1)  # also the number of concurrently running extraction jobs
+
+
 class Configuration(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", env_nested_delimiter="__", extra="ignore"
@@ -158,6 +200,7 @@ class Configuration(BaseSettings):
     object_storage: ObjectStorageConfiguration = Field(default_factory=ObjectStorageConfiguration)
     vector_stores: VectorStoresConfiguration = Field(default_factory=VectorStoresConfiguration)
     text_extraction: DoclingExtractionConfiguration = Field(default_factory=DoclingExtractionConfiguration)
+    builtin_text_extraction: BuiltinExtractionConfiguration = Field(default_factory=BuiltinExtractionConfiguration)
     k8s_namespace: str | None = None
     k8s_kubeconfig: Path | None = None
 
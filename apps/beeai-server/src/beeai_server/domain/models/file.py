@@ -3,9 +3,11 @@
 
 from collections.abc import Awaitable, Callable
 from enum import StrEnum
+from pathlib import Path
+from typing import Self
 from uuid import UUID, uuid4
 
-from pydantic import AwareDatetime, BaseModel, Field
+from pydantic import AwareDatetime, BaseModel, Field, HttpUrl, model_validator
 
 from beeai_server.utils.utils import utc_now
 
@@ -31,6 +33,7 @@ class FileMetadata(BaseModel, extra="allow"):
     content_type: str
     filename: str
     content_length: int
+    created_by: UUID | None = None
 
 
 class AsyncFile(BaseModel):
@@ -38,16 +41,54 @@ class AsyncFile(BaseModel):
     content_type: str
     read: Callable[[int], Awaitable[bytes]]
     size: int | None = None
+    path: Path | None = None  # local file with the (whole) content, it can be sent without reading it in Python
+
+
+class UploadedFileInfo(BaseModel):
+    size: int
+    checksum_sha256: str
+
+
+class PresignedUploadPart(BaseModel):
+    part_number: int
+    size: int = Field(description="Exact size of the part in bytes, the Content-Length is part of the signature")
+    url: HttpUrl
+
+
+class FileUploadSession(BaseModel):
+    """Upload of a file directly to the object storage using presigned URLs, completed by the client."""
+
+    file_id: UUID
+    upload_id: str | None = Field(
+        None, description="Opaque multipart upload ID, None if the file is uploaded in one part"
+    )
+    parts: list[PresignedUploadPart]
+    headers: dict[str, str] = Field(default_factory=dict, description="Headers required by the presigned URLs")
+    expires_at: AwareDatetime
+
+
+class CompletedUploadPart(BaseModel):
+    part_number: int
+    etag: str
 
 
 class File(BaseModel):
     id: UUID = Field(default_factory=uuid4)
     filename: str
     file_size_bytes: int | None = None
+    checksum_sha256: str | None = Field(None, description="Hex encoded SHA-256 of the file content")
     created_at: AwareDatetime = Field(default_factory=utc_now)
     created_by: UUID
     file_type: FileType = FileType.user_upload
     parent_file_id: UUID | None = None
+    object_id: UUID | None = Field(
+        None, exclude=True, description="Object storage object with the content, shared by files with the same content"
+    )
+
+    @model_validator(mode="after")
+    def _default_object_id(self) -> Self:
+        self.object_id = self.object_id or self.id
+        return self
 
 
 class TextExtraction(BaseModel):
@@ -95,3 +136,15 @@ class TextExtraction(BaseModel):
         self.started_at = None
         self.finished_at = None
         self.job_id = None
+
+
+class TextExtractionUpdate(BaseModel):
+    """Notification of a change of a text extraction, only the progress changed if progress_bytes is set."""
+
+    file_id: UUID
+    progress_bytes: int | None = None
+
+
+class TextExtractionEvent(BaseModel):
+    extraction: TextExtraction
+    progress_bytes: int | None = Field(None, description="Bytes of text extracted so far by a running extraction")
@@ -5,11 +5,39 @@ from enum import StrEnum
 from typing import Literal
 from uuid import UUID, uuid4
 
-from pydantic import AwareDatetime, BaseModel, Field
+from pydantic import AwareDatetime, BaseModel, ConfigDict, Field, model_validator
 
 from beeai_server.domain.models.common import Metadata
 from beeai_server.utils.utils import utc_now
 
+# Maximum dimension of halfvec columns that can be indexed using HNSW in pgvector
+MAX_VECTOR_DIMENSION = 4000
+
+# Maximum value of hnsw.ef_search accepted by pgvector
+MAX_EF_SEARCH = 1000
+
+
+class VectorQuantization(StrEnum):
+    none = "none"
+    binary = "binary"
+
+
+class HnswIndexSettings(BaseModel):
+    """Build parameters of the HNSW vector index, stores with the same settings share the index."""
+
+    model_config = ConfigDict(frozen=True)
+
+    m: int = Field(16, ge=2, le=100, description="Maximum number of connections per node in the graph")
+    ef_construction: int = Field(
+        64, ge=4, le=1000, description="Size of the candidate list used when building the graph"
+    )
+
+    @model_validator(mode="after")
+    def validate_ef_construction(self):
+        if self.ef_construction < 2 * self.m:
+            raise ValueError("ef_construction must be at least twice as large as m")
+        return self
+
 
 class VectorStoreStats(BaseModel):
     usage_bytes: int
@@ -25,7 +53,10 @@ class VectorStore(BaseModel):
     dimension: int = Field(gt=0, lt=10_000)
     created_at: AwareDatetime = Field(default_factory=utc_now)
     last_active_at: AwareDatetime = Field(default_factory=utc_now)
+    modified_at: AwareDatetime = Field(default_factory=utc_now, description="Last time documents were changed")
     created_by: UUID
+    quantization: VectorQuantization = VectorQuantization.none
+    index_settings: HnswIndexSettings = Field(default_factory=HnswIndexSettings)
     stats: VectorStoreStats | None = None
 
 
@@ -50,6 +81,27 @@ class DocumentType(StrEnum):
     external = "external"
 
 
+class SearchMode(StrEnum):
+    vector = "vector"
+    hybrid = "hybrid"
+
+
+class VectorStoreItemField(StrEnum):
+    text = "text"
+    metadata = "metadata"
+    embedding = "embedding"
+
+
+class EmbeddingFormat(StrEnum):
+    float = "float"
+    base64 = "base64"  # little-endian float16 values encoded as base64
+
+
+class SnapshotFormat(StrEnum):
+    arrow = "arrow"  # Arrow IPC stream format
+    parquet = "parquet"
+
+
 class VectorStoreDocumentInfo(BaseModel):
     id: str
     usage_bytes: int | None = None
@@ -67,8 +119,60 @@ class VectorStoreItem(BaseModel):
     metadata: Metadata | None = None
 
 
+class VectorStoreSearchItem(BaseModel):
+    """Vector store item returned from search, fields not requested by the client are left out (None)."""
+
+    id: UUID
+    vector_store_id: UUID
+    document_id: str
+    text: str | None = None
+    embedding: list[float] | str | None = Field(
+        None, description="List of floats or base64 encoded little-endian float16 values, based on embedding_format"
+    )
+    metadata: Metadata | None = None
+
+
 class VectorStoreSearchResult(BaseModel):
-    """Result of a vector store search operation containing full item data and similarity score."""
+    """Result of a vector store search operation containing item data and similarity score."""
 
-    item: VectorStoreItem
+    item: VectorStoreSearchItem
     score: float
+
+
+class VectorStoreBatchSearchResult(BaseModel):
+    """Results of a multi-query search, optionally merged into a single ranked list of unique items."""
+
+    results: list[list[VectorStoreSearchResult]]
+    merged: list[VectorStoreSearchResult] | None = None
+
+
+class VectorStoreDocumentReplaceResult(BaseModel):
+    """Number of items of a replaced document by how they were changed."""
+
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+
+class ExpiredVectorStoresReport(BaseModel):
+    """Rows and bytes reclaimed by the deletion of expired vector stores."""
+
+    vector_stores: int = 0
+    documents: int = 0
+    items: int = 0
+    usage_bytes: int = 0
+    batches: int = 0
+    vacuumed_tables: int = 0
+
+
+class VectorStoreRecallReport(BaseModel):
+    """Recall@k of the approximate (indexed or quantized) search compared to exact brute force search."""
+
+    sample_size: int
+    limit: int
+    quantization: VectorQuantization
+    index_settings: HnswIndexSettings | None = Field(None, description="HNSW build parameters of the vector store")
+    oversampling: int | None = None
+    ef_search: int | None = Field(None, description="Size of the HNSW candidate list, None if derived from the limit")
+    recall: float | None = Field(None, description="Mean recall over the sampled queries, None if the store is empty")
@@ -1,7 +1,7 @@
 # Copyright 2025 © BeeAI a Series of LF Projects, LLC
 # SPDX-License-Identifier: Apache-2.0
 
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Sequence
 from contextlib import AbstractAsyncContextManager
 from datetime import timedelta
 from typing import Protocol, runtime_checkable
@@ -9,7 +9,17 @@ from uuid import UUID
 
 from pydantic import AnyUrl, HttpUrl
 
-from beeai_server.domain.models.file import AsyncFile, File, FileMetadata, FileType, TextExtraction
+from beeai_server.domain.models.file import (
+    AsyncFile,
+    CompletedUploadPart,
+    File,
+    FileMetadata,
+    FileType,
+    FileUploadSession,
+    TextExtraction,
+    TextExtractionUpdate,
+    UploadedFileInfo,
+)
 
 
 class IFileRepository(Protocol):
@@ -19,22 +29,59 @@ class IFileRepository(Protocol):
     async def get(self, *, file_id: UUID, user_id: UUID | None = None, file_type: FileType | None = None) -> File: ...
     async def delete(self, *, file_id: UUID, user_id: UUID | None = None) -> None: ...
 
+    # Content addressed objects shared by files with the same content
+    async def add_object_reference(self, *, object_id: UUID, checksum_sha256: str, size: int) -> UUID: ...
+    async def reference_object(self, *, object_id: UUID) -> bool: ...
+    async def release_object(self, *, object_id: UUID) -> bool: ...
+
     # Text extraction methods
     async def create_extraction(self, *, extraction: TextExtraction) -> None: ...
     async def get_extraction_by_file_id(self, *, file_id: UUID, user_id: UUID | None = None) -> TextExtraction: ...
     async def update_extraction(self, *, extraction: TextExtraction) -> None: ...
     async def delete_extraction(self, *, extraction_id: UUID) -> None: ...
+    async def find_extracted_file(self, *, checksum_sha256: str, backend: str) -> File | None: ...
+    async def notify_extraction_progress(self, *, file_id: UUID, progress_bytes: int) -> None: ...
+
+
+@runtime_checkable
+class IExtractionUpdateListener(Protocol):
+    def subscribe(self, *, file_id: UUID) -> AbstractAsyncContextManager[AsyncIterator[TextExtractionUpdate]]: ...
+    async def close(self) -> None: ...
 
 
 @runtime_checkable
 class IObjectStorageRepository(Protocol):
-    async def upload_file(self, *, file_id: UUID, file: AsyncFile) -> int: ...
-    async def get_file(self, *, file_id: UUID) -> AbstractAsyncContextManager[AsyncFile]: ...
+    async def upload_file(self, *, file_id: UUID, file: AsyncFile) -> UploadedFileInfo: ...
+    async def get_file(
+        self, *, file_id: UUID, byte_range: tuple[int, int] | None = None
+    ) -> AbstractAsyncContextManager[AsyncFile]: ...
     async def delete_file(self, *, file_id: UUID) -> None: ...
-    async def get_file_url(self, *, file_id: UUID) -> HttpUrl: ...
+    async def get_file_url(self, *, file_id: UUID, public: bool = False) -> HttpUrl: ...
+    async def create_upload(
+        self, *, file_id: UUID, filename: str, content_type: str, size: int, created_by: UUID
+    ) -> FileUploadSession: ...
+    async def complete_upload(
+        self, *, file_id: UUID, upload_id: str | None = None, parts: Sequence[CompletedUploadPart] = ()
+    ) -> FileMetadata: ...
+    async def abort_upload(self, *, file_id: UUID, upload_id: str) -> None: ...
     async def get_file_metadata(self, *, file_id: UUID) -> FileMetadata: ...
+    async def close(self) -> None: ...
+
+
+@runtime_checkable
+class IBuiltinTextExtractionBackend(Protocol):
+    """Extraction of the text from the content of simple formats, done by the server itself."""
+
+    @property
+    def name(self) -> str: ...
+
+    def supports(self, *, content_type: str, size: int | None = None) -> bool: ...
+    def extract_text(self, *, file: AsyncFile) -> AbstractAsyncContextManager[AsyncFile]: ...
 
 
 @runtime_checkable
 class ITextExtractionBackend(Protocol):
+    @property
+    def name(self) -> str: ...
+
     async def extract_text(self, *, file_url: AnyUrl, timeout: timedelta | None = None) -> AsyncFile: ...  # noqa: ASYNC109 (the timeout actually corresponds to kubernetes timeout)
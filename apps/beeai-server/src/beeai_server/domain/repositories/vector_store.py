@@ -1,16 +1,26 @@
 # Copyright 2025 © BeeAI a Series of LF Projects, LLC
 # SPDX-License-Identifier: Apache-2.0
 
-from collections.abc import AsyncIterator, Iterable, Sequence
+import builtins
+from collections.abc import AsyncIterator, Collection, Iterable, Sequence
 from datetime import timedelta
 from typing import Protocol
 from uuid import UUID
 
+import numpy as np
+import pyarrow as pa
+
 from beeai_server.domain.models.vector_store import (
+    EmbeddingFormat,
+    HnswIndexSettings,
+    VectorQuantization,
     VectorStore,
     VectorStoreDocument,
     VectorStoreDocumentInfo,
+    VectorStoreDocumentReplaceResult,
     VectorStoreItem,
+    VectorStoreItemField,
+    VectorStoreSearchItem,
     VectorStoreSearchResult,
 )
 
@@ -18,7 +28,9 @@ from beeai_server.domain.models.vector_store import (
 class IVectorStoreRepository(Protocol):
     """Interface for vector store repository operations."""
 
-    async def list(self, *, user_id: UUID | None = None) -> AsyncIterator[VectorStore]:
+    async def list(
+        self, *, user_id: UUID | None = None, vector_store_ids: Collection[UUID] | None = None
+    ) -> AsyncIterator[VectorStore]:
         yield
 
     async def create(self, *, vector_store: VectorStore) -> None: ...
@@ -26,21 +38,181 @@ class IVectorStoreRepository(Protocol):
     async def delete(self, *, vector_store_id: UUID, user_id: UUID | None = None) -> None: ...
     async def update_last_accessed(self, *, vector_store_ids: Iterable[UUID]) -> None: ...
     async def upsert_documents(self, *, documents: Iterable[VectorStoreDocument]) -> None: ...
+    async def replace_document(self, *, document: VectorStoreDocument) -> None: ...
     async def list_documents(self, *, vector_store_id: UUID, user_id: UUID | None = None):
         yield
 
     async def remove_documents(
         self, *, vector_store_id: UUID, document_ids: Iterable[str], user_id: UUID | None = None
     ) -> int: ...
-    async def delete_expired(self, *, active_threshold: timedelta) -> int: ...
+    async def list_expired(
+        self, *, active_threshold: timedelta, limit: int | None = None
+    ) -> builtins.list[VectorStore]: ...
+    async def delete_expired(
+        self, *, active_threshold: timedelta, vector_store_ids: Collection[UUID] | None = None
+    ) -> int: ...
+    async def total_usage(self, *, user_id: UUID | None = None) -> int: ...
+    async def reconcile_stats(self, *, limit: int, after_id: UUID | None = None) -> tuple[UUID | None, int]: ...
+    async def reconcile_usage(self, *, limit: int, after_user_id: UUID | None = None) -> tuple[UUID | None, int]: ...
 
 
 class IVectorDatabaseRepository(Protocol):
-    async def create_collection(self, collection_id: UUID, dimension: int): ...
-    async def delete_collection(self, collection_id: UUID, dimension: int): ...
-    async def add_items(self, collection_id: UUID, items: Sequence[VectorStoreItem]) -> None: ...
+    async def create_collection(
+        self,
+        collection_id: UUID,
+        dimension: int,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ): ...
+    async def delete_collection(
+        self,
+        collection_id: UUID | Collection[UUID],
+        dimension: int,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ) -> int: ...
+    async def vacuum_collections(
+        self,
+        dimension: int,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ) -> None: ...
+    async def add_items(
+        self,
+        collection_id: UUID,
+        items: Sequence[VectorStoreItem],
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ) -> None: ...
     def estimate_size(self, items: Sequence[VectorStoreItem]) -> list[VectorStoreDocumentInfo]: ...
-    async def delete_documents(self, collection_id: UUID, dimension: int, document_ids: Iterable[str]): ...
+    async def replace_document_items(
+        self,
+        collection_id: UUID,
+        document_id: str,
+        items: Sequence[VectorStoreItem],
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ) -> VectorStoreDocumentReplaceResult: ...
+    async def delete_documents(
+        self,
+        collection_id: UUID,
+        dimension: int,
+        document_ids: Iterable[str],
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ): ...
     async def similarity_search(
-        self, collection_id: UUID, query_vector: Sequence[float], limit: int = 10
+        self,
+        collection_id: UUID,
+        query_vector: Sequence[float],
+        limit: int = 10,
+        include: Collection[VectorStoreItemField] | None = None,
+        embedding_format: EmbeddingFormat = EmbeddingFormat.float,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+        oversampling: int | None = None,
+        ef_search: int | None = None,
+    ) -> Iterable[VectorStoreSearchResult]: ...
+    async def exact_search(
+        self,
+        collection_id: UUID,
+        query_vector: Sequence[float],
+        limit: int = 10,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ) -> Iterable[VectorStoreSearchResult]: ...
+    async def sample_embeddings(
+        self,
+        collection_id: UUID,
+        dimension: int,
+        sample_size: int,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ) -> list[list[float]]: ...
+    async def load_items(
+        self,
+        collection_id: UUID,
+        dimension: int,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ) -> tuple[list[VectorStoreSearchItem], np.ndarray]: ...
+    async def export_items(
+        self,
+        collection_id: UUID,
+        dimension: int,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[pa.RecordBatch]:
+        yield
+
+    async def import_items(
+        self,
+        collection_id: UUID,
+        batch: pa.RecordBatch,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ) -> list[VectorStoreDocumentInfo]: ...
+    async def federated_search(
+        self,
+        collection_ids: Collection[UUID],
+        query_vector: Sequence[float],
+        limit: int = 10,
+        include: Collection[VectorStoreItemField] | None = None,
+        embedding_format: EmbeddingFormat = EmbeddingFormat.float,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+        oversampling: int | None = None,
+        ef_search: int | None = None,
     ) -> Iterable[VectorStoreSearchResult]: ...
+    async def batch_similarity_search(
+        self,
+        collection_id: UUID,
+        query_vectors: Sequence[Sequence[float]],
+        limit: int = 10,
+        include: Collection[VectorStoreItemField] | None = None,
+        embedding_format: EmbeddingFormat = EmbeddingFormat.float,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+        oversampling: int | None = None,
+        ef_search: int | None = None,
+    ) -> list[list[VectorStoreSearchResult]]: ...
+    async def hybrid_search(
+        self,
+        collection_id: UUID,
+        query_vector: Sequence[float],
+        query_text: str,
+        limit: int = 10,
+        candidate_limit: int | None = None,
+        include: Collection[VectorStoreItemField] | None = None,
+        embedding_format: EmbeddingFormat = EmbeddingFormat.float,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+        oversampling: int | None = None,
+        ef_search: int | None = None,
+    ) -> Iterable[VectorStoreSearchResult]: ...
+
+
+class IVectorStoreCache(Protocol):
+    """In-process cache of frequently searched vector stores."""
+
+    memory_bytes: int
+    memory_limit_bytes: int
+    num_stores: int
+    hits: int
+    misses: int
+
+    def should_load(self, vector_store: VectorStore) -> bool:
+        """Whether the vector store is hot enough to be loaded, True is returned only once per load."""
+        ...
+
+    def put(self, vector_store: VectorStore, items: list[VectorStoreSearchItem], embeddings: np.ndarray) -> None: ...
+    def invalidate(self, vector_store_id: UUID) -> None: ...
+    async def search(
+        self,
+        vector_store: VectorStore,
+        query_vector: Sequence[float],
+        limit: int = 10,
+        include: Collection[VectorStoreItemField] | None = None,
+        embedding_format: EmbeddingFormat = EmbeddingFormat.float,
+    ) -> list[VectorStoreSearchResult] | None: ...
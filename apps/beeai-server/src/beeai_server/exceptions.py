@@ -44,6 +44,18 @@ class EntityNotFoundError(PlatformError):
 class InvalidVectorDimensionError(PlatformError): ...
 
 
+class IncompatibleVectorStoresError(PlatformError):
+    def __init__(self, message: str, status_code: int = status.HTTP_400_BAD_REQUEST):
+        self.status_code = status_code
+        super().__init__(message)
+
+
+class InvalidVectorStoreSnapshotError(PlatformError):
+    def __init__(self, message: str, status_code: int = status.HTTP_400_BAD_REQUEST):
+        self.status_code = status_code
+        super().__init__(message)
+
+
 class StorageCapacityExceededError(PlatformError):
     entity: str
     status_code: int
@@ -57,6 +69,12 @@ class StorageCapacityExceededError(PlatformError):
         )
 
 
+class UnsupportedOperationError(PlatformError):
+    def __init__(self, message: str, status_code: int = status.HTTP_501_NOT_IMPLEMENTED):
+        self.status_code = status_code
+        super().__init__(message)
+
+
 class MissingConfigurationError(Exception):
     def __init__(self, missing_env: list["EnvVar"], status_code: int = status.HTTP_400_BAD_REQUEST):
         self.missing_env = missing_env
@@ -5,6 +5,7 @@ import asyncio
 import logging
 from datetime import timedelta
 
+import anyio
 from aioboto3 import Session
 from botocore.exceptions import ClientError
 from tenacity import retry, stop_after_delay, wait_fixed
@@ -39,6 +40,10 @@ async def _wait_for_db(config: ObjectStorageConfiguration):
 
 
 async def create_buckets(config: ObjectStorageConfiguration, wait_for_db: bool = True):
+    if config.backend == "filesystem":
+        await anyio.Path(config.filesystem_root_dir).mkdir(parents=True, exist_ok=True)
+        logger.info(f"Using directory {config.filesystem_root_dir} for file storage")
+        return
     if wait_for_db:
         await _wait_for_db(config)
     async with _get_client(config) as s3:
@@ -0,0 +1,128 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+import hashlib
+import os
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import anyio
+import anyio.to_thread
+from kink import inject
+from pydantic import HttpUrl
+
+from beeai_server.configuration import Configuration
+from beeai_server.domain.models.file import (
+    AsyncFile,
+    CompletedUploadPart,
+    FileMetadata,
+    FileUploadSession,
+    UploadedFileInfo,
+)
+from beeai_server.domain.repositories.file import IObjectStorageRepository
+from beeai_server.exceptions import EntityNotFoundError, UnsupportedOperationError
+
+CHUNK_SIZE = 1024 * 1024
+
+
+@inject
+class FilesystemObjectStorageRepository(IObjectStorageRepository):
+    """
+    Implementation of IObjectStorageRepository storing the files in a local directory.
+
+    Every file is stored as its content and a JSON metadata file next to it. Both are written to a temporary directory
+    on the same filesystem and renamed, the content last, so a file is either complete or missing.
+    """
+
+    def __init__(self, configuration: Configuration):
+        self.config = configuration.object_storage
+        self._root_dir = anyio.Path(self.config.filesystem_root_dir)
+        self._tmp_dir = self._root_dir / ".tmp"
+
+    def _get_path(self, file_id: UUID) -> anyio.Path:
+        return self._root_dir / str(file_id)
+
+    def _get_metadata_path(self, file_id: UUID) -> anyio.Path:
+        return self._root_dir / f"{file_id}.json"
+
+    async def upload_file(self, *, file_id: UUID, file: AsyncFile) -> UploadedFileInfo:
+        await self._tmp_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._tmp_dir / str(uuid4())
+        tmp_metadata_path = self._tmp_dir / f"{tmp_path.name}.json"
+        checksum = hashlib.sha256()
+        size = 0
+        try:
+            async with await anyio.open_file(tmp_path, "wb") as target:
+                while chunk := await file.read(CHUNK_SIZE):
+                    checksum.update(chunk)
+                    size += len(chunk)
+                    await target.write(chunk)
+                await target.flush()
+                await anyio.to_thread.run_sync(os.fsync, target.wrapped.fileno())
+            metadata = FileMetadata(content_type=file.content_type, filename=file.filename, content_length=size)
+            await tmp_metadata_path.write_text(metadata.model_dump_json())
+            await tmp_metadata_path.replace(self._get_metadata_path(file_id))
+            await tmp_path.replace(self._get_path(file_id))
+        finally:
+            await tmp_path.unlink(missing_ok=True)
+            await tmp_metadata_path.unlink(missing_ok=True)
+        return UploadedFileInfo(size=size, checksum_sha256=checksum.hexdigest())
+
+    @asynccontextmanager
+    async def get_file(self, *, file_id: UUID, byte_range: tuple[int, int] | None = None) -> AsyncIterator[AsyncFile]:
+        """Open the file, with byte_range only the inclusive (start, end) range of the file is read."""
+        metadata = await self.get_file_metadata(file_id=file_id)
+        path = self._get_path(file_id)
+        try:
+            source = await anyio.open_file(path, "rb")
+        except FileNotFoundError as e:
+            raise EntityNotFoundError(entity="file", id=file_id) from e
+
+        async with source:
+            start, end = byte_range or (0, metadata.content_length - 1)
+            await source.seek(start)
+            remaining = end - start + 1
+
+            async def read(amount: int = CHUNK_SIZE) -> bytes:
+                nonlocal remaining
+                chunk = await source.read(remaining if amount < 0 else min(amount, remaining))
+                remaining -= len(chunk)
+                return chunk
+
+            yield AsyncFile(
+                filename=metadata.filename,
+                content_type=metadata.content_type,
+                read=read,
+                size=remaining,
+                path=None if byte_range else Path(await path.absolute()),
+            )
+
+    async def delete_file(self, *, file_id: UUID) -> None:
+        await self._get_path(file_id).unlink(missing_ok=True)
+        await self._get_metadata_path(file_id).unlink(missing_ok=True)
+
+    async def get_file_url(self, *, file_id: UUID, public: bool = False) -> HttpUrl:
+        raise UnsupportedOperationError("File URLs are not supported by the filesystem object storage")
+
+    async def create_upload(
+        self, *, file_id: UUID, filename: str, content_type: str, size: int, created_by: UUID
+    ) -> FileUploadSession:
+        raise UnsupportedOperationError("Direct uploads are not supported by the filesystem object storage")
+
+    async def complete_upload(
+        self, *, file_id: UUID, upload_id: str | None = None, parts: Sequence[CompletedUploadPart] = ()
+    ) -> FileMetadata:
+        raise UnsupportedOperationError("Direct uploads are not supported by the filesystem object storage")
+
+    async def abort_upload(self, *, file_id: UUID, upload_id: str) -> None:
+        raise UnsupportedOperationError("Direct uploads are not supported by the filesystem object storage")
+
+    async def get_file_metadata(self, *, file_id: UUID) -> FileMetadata:
+        try:
+            return FileMetadata.model_validate_json(await self._get_metadata_path(file_id).read_bytes())
+        except FileNotFoundError as e:
+            raise EntityNotFoundError(entity="file", id=file_id) from e
+
+    async def close(self) -> None: ...
@@ -1,23 +1,55 @@
 # Copyright 2025 © BeeAI a Series of LF Projects, LLC
 # SPDX-License-Identifier: Apache-2.0
 
+import asyncio
+import base64
+import hashlib
 import logging
-from collections.abc import AsyncIterator
-from contextlib import asynccontextmanager
+import math
+from collections.abc import AsyncIterator, Sequence
+from contextlib import AsyncExitStack, asynccontextmanager, suppress
+from datetime import timedelta
 from uuid import UUID
 
 import aioboto3
+import anyio.to_thread
+from aiobotocore.config import AioConfig
 from botocore.exceptions import ClientError
 from kink import inject
 from pydantic import HttpUrl
 
 from beeai_server.configuration import Configuration
-from beeai_server.domain.models.file import AsyncFile, FileMetadata
+from beeai_server.domain.models.file import (
+    AsyncFile,
+    CompletedUploadPart,
+    FileMetadata,
+    FileUploadSession,
+    PresignedUploadPart,
+    UploadedFileInfo,
+)
 from beeai_server.domain.repositories.file import IObjectStorageRepository
 from beeai_server.exceptions import EntityNotFoundError
+from beeai_server.utils.utils import utc_now
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of parts of a multipart upload allowed by S3
+MAX_MULTIPART_UPLOAD_PARTS = 10_000
+
+
+async def _read_part(file: AsyncFile, part_size: int) -> bytes:
+    """Read a full part, the reads can return fewer bytes than requested before the end of the file."""
+    part = bytearray()
+    while len(part) < part_size and (chunk := await file.read(part_size - len(part))):
+        part += chunk
+    return bytes(part)
+
+
+def _update_checksums(checksum: "hashlib._Hash", part: bytes) -> str:
+    """Add the part to the file checksum and return the base64 encoded MD5 of the part (the Content-MD5 header)."""
+    checksum.update(part)
+    return base64.b64encode(hashlib.md5(part, usedforsecurity=False).digest()).decode("ascii")
+
 
 @inject
 class S3ObjectStorageRepository(IObjectStorageRepository):
@@ -25,90 +57,274 @@ class S3ObjectStorageRepository(IObjectStorageRepository):
 
     def __init__(self, configuration: Configuration):
         self.config = configuration.object_storage
+        # The session caches the parsed botocore service models. The clients (and their connection pools) are shared by
+        # all operations, they are created on first use because they are bound to the event loop they were created in.
+        self._session = aioboto3.Session()
+        self._clients = {}
+        self._client_lock = asyncio.Lock()
+        self._exit_stack = AsyncExitStack()
 
-    def _get_client(self):
-        session = aioboto3.Session()
-        return session.client(
-            "s3",
-            endpoint_url=str(self.config.endpoint_url),
-            aws_access_key_id=self.config.access_key_id.get_secret_value(),
-            aws_secret_access_key=self.config.access_key_secret.get_secret_value(),
-            region_name=self.config.region,
-            use_ssl=self.config.use_ssl,
-        )
+    async def _get_client(self, *, public: bool = False):
+        """Get the shared client, the public client is used to presign URLs handed out to API clients."""
+        endpoint_url = str((public and self.config.public_endpoint_url) or self.config.endpoint_url)
+        if endpoint_url not in self._clients:
+            async with self._client_lock:
+                if endpoint_url not in self._clients:
+                    self._clients[endpoint_url] = await self._exit_stack.enter_async_context(
+                        self._session.client(
+                            "s3",
+                            endpoint_url=endpoint_url,
+                            aws_access_key_id=self.config.access_key_id.get_secret_value(),
+                            aws_secret_access_key=self.config.access_key_secret.get_secret_value(),
+                            region_name=self.config.region,
+                            use_ssl=self.config.use_ssl,
+                            config=AioConfig(
+                                # SigV4 signs the Content-Length and metadata headers of presigned uploads
+                                signature_version="s3v4",
+                                max_pool_connections=self.config.max_pool_connections,
+                                connect_timeout=self.config.connect_timeout_sec,
+                                read_timeout=self.config.read_timeout_sec,
+                                retries={"max_attempts": self.config.max_retry_attempts, "mode": "standard"},
+                                connector_args={"keepalive_timeout": self.config.keepalive_timeout_sec},
+                            ),
+                        )
+                    )
+        return self._clients[endpoint_url]
+
+    async def close(self) -> None:
+        """Close the shared clients and their connection pools, new clients are created if the repository is used again."""
+        async with self._client_lock:
+            await self._exit_stack.aclose()
+            self._clients.clear()
 
     def _get_object_key(self, file_id: UUID) -> str:
         return f"files/{file_id}"
 
-    async def upload_file(self, *, file_id: UUID, file: AsyncFile) -> int:
+    async def upload_file(self, *, file_id: UUID, file: AsyncFile) -> UploadedFileInfo:
+        """
+        Upload the file part by part while it is read, files larger than a single part use a multipart upload.
+
+        Up to multipart_max_concurrency parts are uploaded concurrently, reading of the next part waits for a free
+        slot so at most that many parts (plus the one being read) are kept in memory. Each part is sent with its MD5
+        for the storage to verify and a SHA-256 of the whole file is computed along the way.
+        """
         object_key = self._get_object_key(file_id)
-        async with self._get_client() as client:
-            await client.upload_fileobj(
-                file,
-                self.config.bucket_name,
-                object_key,
-                ExtraArgs={"ContentType": file.content_type, "Metadata": {"filename": file.filename}},
+        part_size = self.config.multipart_chunk_size
+        extra_args = {"ContentType": file.content_type, "Metadata": {"filename": file.filename}}
+        client = await self._get_client()
+        checksum = hashlib.sha256()
+
+        part = await _read_part(file, part_size)
+        part_md5 = await anyio.to_thread.run_sync(_update_checksums, checksum, part)
+        if len(part) < part_size:
+            await client.put_object(
+                Bucket=self.config.bucket_name, Key=object_key, Body=part, ContentMD5=part_md5, **extra_args
             )
-            result = await client.head_object(Bucket=self.config.bucket_name, Key=object_key)
-            return result["ContentLength"]
+            return UploadedFileInfo(size=len(part), checksum_sha256=checksum.hexdigest())
+
+        upload = await client.create_multipart_upload(Bucket=self.config.bucket_name, Key=object_key, **extra_args)
+        upload_id = upload["UploadId"]
+
+        async def upload_part(part_number: int, body: bytes, content_md5: str) -> dict:
+            response = await client.upload_part(
+                Bucket=self.config.bucket_name,
+                Key=object_key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=body,
+                ContentMD5=content_md5,
+            )
+            return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+        size, uploaded_parts, pending = 0, [], set()
+        try:
+            for part_number in range(1, MAX_MULTIPART_UPLOAD_PARTS + 1):
+                size += len(part)
+                pending.add(asyncio.create_task(upload_part(part_number, part, part_md5)))
+                if len(pending) >= self.config.multipart_max_concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    uploaded_parts += [task.result() for task in done]
+                if not (part := await _read_part(file, part_size)):
+                    break
+                part_md5 = await anyio.to_thread.run_sync(_update_checksums, checksum, part)
+            else:
+                raise ValueError(f"File exceeds the maximum of {MAX_MULTIPART_UPLOAD_PARTS} parts of {part_size} bytes")
+            uploaded_parts += await asyncio.gather(*pending)
+            await client.complete_multipart_upload(
+                Bucket=self.config.bucket_name,
+                Key=object_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": sorted(uploaded_parts, key=lambda p: p["PartNumber"])},
+            )
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            with suppress(Exception):
+                await client.abort_multipart_upload(Bucket=self.config.bucket_name, Key=object_key, UploadId=upload_id)
+            raise
+        return UploadedFileInfo(size=size, checksum_sha256=checksum.hexdigest())
 
     @asynccontextmanager
-    async def get_file(self, *, file_id: UUID) -> AsyncIterator[AsyncFile]:
+    async def get_file(self, *, file_id: UUID, byte_range: tuple[int, int] | None = None) -> AsyncIterator[AsyncFile]:
+        """Open the object, with byte_range only the inclusive (start, end) range of the object is downloaded."""
         object_key = self._get_object_key(file_id)
-        async with self._get_client() as client:
-            try:
-                response = await client.get_object(Bucket=self.config.bucket_name, Key=object_key)
+        client = await self._get_client()
+        kwargs = {"Range": f"bytes={byte_range[0]}-{byte_range[1]}"} if byte_range else {}
+        try:
+            response = await client.get_object(Bucket=self.config.bucket_name, Key=object_key, **kwargs)
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "NoSuchKey":
+                raise EntityNotFoundError(entity="file", id=file_id) from e
+            raise
 
-                async def read(amount: int = 8192) -> bytes:
-                    return await response["Body"].read(amount)
+        # Release the connection back to the shared pool even if the body is not read completely. The context manager
+        # of the StreamingBody returns the wrapped aiohttp response, the reads must go through the StreamingBody.
+        body = response["Body"]
+        async with body:
 
-                yield AsyncFile(
-                    filename=response["Metadata"]["filename"], content_type=response["ContentType"], read=read
-                )
+            async def read(amount: int = 8192) -> bytes:
+                return await body.read(amount)
 
-            except ClientError as e:
-                if e.response["Error"]["Code"] == "NoSuchKey":
-                    raise EntityNotFoundError(entity="file", id=file_id) from e
-                raise
+            yield AsyncFile(
+                filename=response["Metadata"]["filename"],
+                content_type=response["ContentType"],
+                read=read,
+                size=response["ContentLength"],
+            )
 
     async def delete_file(self, *, file_id: UUID) -> None:
         object_key = self._get_object_key(file_id)
 
-        async with self._get_client() as client:
-            try:
-                await client.delete_object(Bucket=self.config.bucket_name, Key=object_key)
-            except ClientError as e:
-                logger.error(f"Error deleting file {file_id}: {e}")
-                raise
+        client = await self._get_client()
+        try:
+            await client.delete_object(Bucket=self.config.bucket_name, Key=object_key)
+        except ClientError as e:
+            logger.error(f"Error deleting file {file_id}: {e}")
+            raise
 
-    async def get_file_url(self, *, file_id: UUID) -> HttpUrl:
+    async def get_file_url(self, *, file_id: UUID, public: bool = False) -> HttpUrl:
         object_key = self._get_object_key(file_id)
-        async with self._get_client() as client:
-            try:
-                await client.head_object(Bucket=self.config.bucket_name, Key=object_key)
-                url = await client.generate_presigned_url(
-                    "get_object",
-                    Params={"Bucket": self.config.bucket_name, "Key": object_key},
-                    ExpiresIn=3600,  # 1 hour
-                )
-                return HttpUrl(url)
+        client = await self._get_client()
+        try:
+            await client.head_object(Bucket=self.config.bucket_name, Key=object_key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "NoSuchKey" or e.response["Error"]["Code"] == "404":
+                raise EntityNotFoundError(entity="file", id=file_id) from e
+            raise
+        presign_client = await self._get_client(public=public)
+        url = await presign_client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.config.bucket_name, "Key": object_key},
+            ExpiresIn=self.config.presigned_url_expiration_sec,
+        )
+        return HttpUrl(url)
 
-            except ClientError as e:
-                if e.response["Error"]["Code"] == "NoSuchKey" or e.response["Error"]["Code"] == "404":
-                    raise EntityNotFoundError(entity="file", id=file_id) from e
-                raise
+    async def create_upload(
+        self, *, file_id: UUID, filename: str, content_type: str, size: int, created_by: UUID
+    ) -> FileUploadSession:
+        """
+        Start an upload of a file by the API client, using a single presigned PUT or a presigned multipart upload.
 
-    async def get_file_metadata(self, *, file_id: UUID) -> FileMetadata:
+        The signatures cover the Content-Length of each part, so the storage rejects anything but the declared size.
+        The user is stored in the object metadata to check the ownership of the upload when it is completed.
+        """
         object_key = self._get_object_key(file_id)
-        async with self._get_client() as client:
+        metadata = {"filename": filename, "created-by": str(created_by)}
+        expires_at = utc_now() + timedelta(seconds=self.config.presigned_url_expiration_sec)
+        presign_client = await self._get_client(public=True)
+
+        if size <= self.config.multipart_chunk_size:
+            url = await presign_client.generate_presigned_url(
+                "put_object",
+                Params={
+                    "Bucket": self.config.bucket_name,
+                    "Key": object_key,
+                    "ContentType": content_type,
+                    "ContentLength": size,
+                    "Metadata": metadata,
+                },
+                ExpiresIn=self.config.presigned_url_expiration_sec,
+            )
+            return FileUploadSession(
+                file_id=file_id,
+                parts=[PresignedUploadPart(part_number=1, size=size, url=url)],
+                headers={
+                    "Content-Type": content_type,
+                    **{f"x-amz-meta-{key}": value for key, value in metadata.items()},
+                },
+                expires_at=expires_at,
+            )
+
+        client = await self._get_client()
+        upload = await client.create_multipart_upload(
+            Bucket=self.config.bucket_name, Key=object_key, ContentType=content_type, Metadata=metadata
+        )
+        part_size = max(self.config.multipart_chunk_size, math.ceil(size / MAX_MULTIPART_UPLOAD_PARTS))
+        parts = []
+        for part_number, offset in enumerate(range(0, size, part_size), start=1):
+            part_length = min(part_size, size - offset)
+            url = await presign_client.generate_presigned_url(
+                "upload_part",
+                Params={
+                    "Bucket": self.config.bucket_name,
+                    "Key": object_key,
+                    "UploadId": upload["UploadId"],
+                    "PartNumber": part_number,
+                    "ContentLength": part_length,
+                },
+                ExpiresIn=self.config.presigned_url_expiration_sec,
+            )
+            parts.append(PresignedUploadPart(part_number=part_number, size=part_length, url=url))
+        return FileUploadSession(file_id=file_id, upload_id=upload["UploadId"], parts=parts, expires_at=expires_at)
+
+    async def complete_upload(
+        self, *, file_id: UUID, upload_id: str | None = None, parts: Sequence[CompletedUploadPart] = ()
+    ) -> FileMetadata:
+        """Complete an upload started by create_upload, completing an already completed upload is a no-op."""
+        if upload_id is not None:
+            client = await self._get_client()
             try:
-                response = await client.head_object(Bucket=self.config.bucket_name, Key=object_key)
-                return FileMetadata(
-                    content_type=response.get("ContentType", ""),
-                    filename=response.get("Metadata", {}).get("filename", ""),
-                    content_length=response.get("ContentLength", 0),
+                await client.complete_multipart_upload(
+                    Bucket=self.config.bucket_name,
+                    Key=self._get_object_key(file_id),
+                    UploadId=upload_id,
+                    MultipartUpload={
+                        "Parts": [
+                            {"PartNumber": part.part_number, "ETag": part.etag}
+                            for part in sorted(parts, key=lambda part: part.part_number)
+                        ]
+                    },
                 )
             except ClientError as e:
-                if e.response["Error"]["Code"] == "NoSuchKey" or e.response["Error"]["Code"] == "404":
-                    raise EntityNotFoundError(entity="file", id=file_id) from e
-                raise
+                # The upload was completed before (a retry), the object exists unless it was aborted
+                if e.response["Error"]["Code"] != "NoSuchUpload":
+                    raise
+        return await self.get_file_metadata(file_id=file_id)
+
+    async def abort_upload(self, *, file_id: UUID, upload_id: str) -> None:
+        client = await self._get_client()
+        try:
+            await client.abort_multipart_upload(
+                Bucket=self.config.bucket_name, Key=self._get_object_key(file_id), UploadId=upload_id
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "NoSuchUpload":
+                raise EntityNotFoundError(entity="file_upload", id=upload_id) from e
+            raise
+
+    async def get_file_metadata(self, *, file_id: UUID) -> FileMetadata:
+        object_key = self._get_object_key(file_id)
+        client = await self._get_client()
+        try:
+            response = await client.head_object(Bucket=self.config.bucket_name, Key=object_key)
+            return FileMetadata(
+                content_type=response.get("ContentType", ""),
+                filename=response.get("Metadata", {}).get("filename", ""),
+                content_length=response.get("ContentLength", 0),
+                created_by=response.get("Metadata", {}).get("created-by"),
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "NoSuchKey" or e.response["Error"]["Code"] == "404":
+                raise EntityNotFoundError(entity="file", id=file_id) from e
+            raise
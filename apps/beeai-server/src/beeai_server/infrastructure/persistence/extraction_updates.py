@@ -0,0 +1,97 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import logging
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from uuid import UUID
+
+import asyncpg
+from kink import inject
+from pydantic import ValidationError
+from sqlalchemy import make_url
+
+from beeai_server.configuration import Configuration
+from beeai_server.domain.models.file import TextExtractionUpdate
+from beeai_server.domain.repositories.file import IExtractionUpdateListener
+from beeai_server.infrastructure.persistence.repositories.file import EXTRACTION_UPDATES_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+
+class _QueueIterator(AsyncIterator[TextExtractionUpdate]):
+    """
+    Endless iterator over the queue.
+
+    Unlike an async generator it stays usable after a read is cancelled, e.g. by a timeout waiting for an update.
+    """
+
+    def __init__(self, queue: asyncio.Queue[TextExtractionUpdate]):
+        self._queue = queue
+
+    async def __anext__(self) -> TextExtractionUpdate:
+        return await self._queue.get()
+
+
+@inject
+class PostgresExtractionUpdateListener(IExtractionUpdateListener):
+    """
+    Receive the text extraction updates notified by any replica using Postgres LISTEN.
+
+    A single dedicated connection listens to the channel and dispatches the updates to the subscribers of the file.
+    It is opened on first use because it is bound to the event loop it was created in, and reopened by the next
+    subscription if it is lost. Updates notified while the connection is lost are missed, subscribers must not rely
+    on receiving every update.
+    """
+
+    def __init__(self, configuration: Configuration):
+        db_url = make_url(str(configuration.persistence.db_url.get_secret_value()))
+        self._dsn = db_url.set(drivername="postgresql").render_as_string(hide_password=False)
+        self._connection: asyncpg.Connection | None = None
+        self._connection_lock = asyncio.Lock()
+        self._subscribers: defaultdict[UUID, set[asyncio.Queue[TextExtractionUpdate]]] = defaultdict(set)
+
+    async def _ensure_listening(self) -> None:
+        async with self._connection_lock:
+            if self._connection and not self._connection.is_closed():
+                return
+            connection = await asyncpg.connect(self._dsn)
+            connection.add_termination_listener(self._on_termination)
+            await connection.add_listener(EXTRACTION_UPDATES_CHANNEL, self._on_notification)
+            self._connection = connection
+
+    def _on_termination(self, connection: asyncpg.Connection) -> None:
+        if connection is self._connection:
+            logger.warning("Connection listening to text extraction updates was lost")
+            self._connection = None
+
+    def _on_notification(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            update = TextExtractionUpdate.model_validate_json(payload)
+        except ValidationError as e:
+            logger.warning(f"Invalid text extraction update: {e}")
+            return
+        for queue in self._subscribers.get(update.file_id, ()):
+            queue.put_nowait(update)
+
+    @asynccontextmanager
+    async def subscribe(self, *, file_id: UUID) -> AsyncIterator[AsyncIterator[TextExtractionUpdate]]:
+        """Receive the updates of the text extraction of the file notified after the subscription."""
+        await self._ensure_listening()
+        queue = asyncio.Queue()
+        self._subscribers[file_id].add(queue)
+
+        try:
+            yield _QueueIterator(queue)
+        finally:
+            self._subscribers[file_id].discard(queue)
+            if not self._subscribers[file_id]:
+                del self._subscribers[file_id]
+
+    async def close(self) -> None:
+        async with self._connection_lock:
+            if self._connection:
+                connection, self._connection = self._connection, None
+                await connection.close()
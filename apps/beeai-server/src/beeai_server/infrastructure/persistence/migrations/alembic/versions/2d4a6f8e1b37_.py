@@ -0,0 +1,59 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""store vector store statistics
+
+Revision ID: 2d4a6f8e1b37
+Revises: ebcf8b9e5aea
+Create Date: 2025-07-30 14:02:55.174283
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2d4a6f8e1b37"
+down_revision: str | None = "ebcf8b9e5aea"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("vector_stores", sa.Column("usage_bytes", sa.BigInteger(), server_default="0", nullable=False))
+    op.add_column("vector_stores", sa.Column("num_documents", sa.Integer(), server_default="0", nullable=False))
+    op.create_table(
+        "vector_store_usage",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("usage_bytes", sa.BigInteger(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.execute(
+        """
+        UPDATE vector_stores
+        SET usage_bytes = stats.usage_bytes, num_documents = stats.num_documents
+        FROM (
+            SELECT vector_store_id, coalesce(sum(usage_bytes), 0) AS usage_bytes, count(*) AS num_documents
+            FROM vector_store_documents
+            GROUP BY vector_store_id
+        ) AS stats
+        WHERE vector_stores.id = stats.vector_store_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO vector_store_usage (user_id, usage_bytes)
+        SELECT created_by, sum(usage_bytes) FROM vector_stores GROUP BY created_by
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("vector_store_usage")
+    op.drop_column("vector_stores", "num_documents")
+    op.drop_column("vector_stores", "usage_bytes")
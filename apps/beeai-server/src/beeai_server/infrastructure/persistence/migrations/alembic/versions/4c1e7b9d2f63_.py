@@ -0,0 +1,50 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""add content hash column to vector collections
+
+Revision ID: 4c1e7b9d2f63
+Revises: 7f3c9e2a5d81
+Create Date: 2025-08-01 09:21:37.184520
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+from beeai_server import get_configuration
+
+# revision identifiers, used by Alembic.
+revision: str = "4c1e7b9d2f63"
+down_revision: str | None = "7f3c9e2a5d81"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def _collection_tables(schema: str) -> list[str]:
+    # Collection tables are created dynamically by the VectorDatabaseRepository, they are not part of the metadata
+    result = op.get_bind().execute(
+        sa.text(
+            "SELECT tablename FROM pg_tables WHERE schemaname = :schema "
+            "AND (tablename LIKE 'collections_dim_%' OR tablename LIKE 'collections_bq_dim_%')"
+        ),
+        {"schema": schema},
+    )
+    return [row.tablename for row in result]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    schema = get_configuration().persistence.vector_db_schema
+    for table in _collection_tables(schema):
+        # Existing items have no hash, they are considered changed when their document is replaced
+        op.execute(f"ALTER TABLE {schema}.{table} ADD COLUMN IF NOT EXISTS content_hash bytea")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    schema = get_configuration().persistence.vector_db_schema
+    for table in _collection_tables(schema):
+        op.execute(f"ALTER TABLE {schema}.{table} DROP COLUMN IF EXISTS content_hash")
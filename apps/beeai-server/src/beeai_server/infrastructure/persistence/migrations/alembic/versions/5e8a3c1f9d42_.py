@@ -0,0 +1,31 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""add file checksum
+
+Revision ID: 5e8a3c1f9d42
+Revises: 9b2d6e4f1a37
+Create Date: 2025-08-05 10:41:26.902315
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5e8a3c1f9d42"
+down_revision: str | None = "9b2d6e4f1a37"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("files", sa.Column("checksum_sha256", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("files", "checksum_sha256")
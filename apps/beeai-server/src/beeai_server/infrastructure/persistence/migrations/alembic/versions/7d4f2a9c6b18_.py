@@ -0,0 +1,56 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""add content addressed file objects
+
+Revision ID: 7d4f2a9c6b18
+Revises: 5e8a3c1f9d42
+Create Date: 2025-08-06 09:17:43.518204
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7d4f2a9c6b18"
+down_revision: str | None = "5e8a3c1f9d42"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "file_objects",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("checksum_sha256", sa.String(length=64), nullable=False),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("checksum_sha256"),
+    )
+    op.add_column("files", sa.Column("object_id", sa.UUID(), nullable=True))
+    op.create_index("ix_files_checksum_sha256", "files", ["checksum_sha256"])
+    # Existing objects are not merged, the oldest file with each checksum becomes the shared object for new uploads
+    op.execute(
+        """
+        INSERT INTO file_objects (id, checksum_sha256, size_bytes, ref_count, created_at)
+        SELECT DISTINCT ON (checksum_sha256) id, checksum_sha256, file_size_bytes, 1, created_at
+        FROM files
+        WHERE checksum_sha256 IS NOT NULL AND file_size_bytes IS NOT NULL
+        ORDER BY checksum_sha256, created_at
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Shared objects are kept under the ID of the first file, files sharing it would lose their content
+    op.execute("DELETE FROM files WHERE object_id != id")
+    op.drop_index("ix_files_checksum_sha256", table_name="files")
+    op.drop_column("files", "object_id")
+    op.drop_table("file_objects")
@@ -0,0 +1,33 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""add vector store modified_at
+
+Revision ID: 7f3c9e2a5d81
+Revises: 2d4a6f8e1b37
+Create Date: 2025-07-31 11:47:19.602447
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7f3c9e2a5d81"
+down_revision: str | None = "2d4a6f8e1b37"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("vector_stores", sa.Column("modified_at", sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE vector_stores SET modified_at = last_active_at")
+    op.alter_column("vector_stores", "modified_at", nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("vector_stores", "modified_at")
@@ -0,0 +1,61 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""add vector store index settings, index collections using the cosine distance
+
+Revision ID: 9b2d6e4f1a37
+Revises: 4c1e7b9d2f63
+Create Date: 2025-08-04 14:02:11.630418
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+from beeai_server import get_configuration
+
+# revision identifiers, used by Alembic.
+revision: str = "9b2d6e4f1a37"
+down_revision: str | None = "4c1e7b9d2f63"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def _collection_tables(schema: str) -> list[str]:
+    # Full precision collection tables created so far, all of them use the default index settings
+    result = op.get_bind().execute(
+        sa.text("SELECT tablename FROM pg_tables WHERE schemaname = :schema AND tablename LIKE 'collections_dim_%'"),
+        {"schema": schema},
+    )
+    return [row.tablename for row in result]
+
+
+def _recreate_vector_index(schema: str, table: str, opclass: str) -> None:
+    op.execute(f"DROP INDEX IF EXISTS {schema}.{table}_vector_index")
+    op.execute(
+        f"CREATE INDEX {table}_vector_index ON {schema}.{table} "
+        f"USING hnsw (embedding {opclass}) WITH (m = 16, ef_construction = 64)"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("vector_stores", sa.Column("index_m", sa.Integer(), server_default="16", nullable=False))
+    op.add_column(
+        "vector_stores", sa.Column("index_ef_construction", sa.Integer(), server_default="64", nullable=False)
+    )
+    # The index was built for the L2 distance, it could not be used by the cosine distance search queries
+    schema = get_configuration().persistence.vector_db_schema
+    for table in _collection_tables(schema):
+        _recreate_vector_index(schema, table, "halfvec_cosine_ops")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    schema = get_configuration().persistence.vector_db_schema
+    for table in _collection_tables(schema):
+        _recreate_vector_index(schema, table, "halfvec_l2_ops")
+    op.drop_column("vector_stores", "index_ef_construction")
+    op.drop_column("vector_stores", "index_m")
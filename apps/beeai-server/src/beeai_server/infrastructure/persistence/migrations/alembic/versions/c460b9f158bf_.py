@@ -0,0 +1,51 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""add full-text search column to vector collections
+
+Revision ID: c460b9f158bf
+Revises: 644ccacc48f3
+Create Date: 2025-07-28 10:12:41.318270
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+from beeai_server import get_configuration
+
+# revision identifiers, used by Alembic.
+revision: str = "c460b9f158bf"
+down_revision: str | None = "644ccacc48f3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def _collection_tables(schema: str) -> list[str]:
+    # Collection tables are created dynamically by the VectorDatabaseRepository, they are not part of the metadata
+    result = op.get_bind().execute(
+        sa.text("SELECT tablename FROM pg_tables WHERE schemaname = :schema AND tablename LIKE 'collections_dim_%'"),
+        {"schema": schema},
+    )
+    return [row.tablename for row in result]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    schema = get_configuration().persistence.vector_db_schema
+    for table in _collection_tables(schema):
+        op.execute(
+            f"ALTER TABLE {schema}.{table} ADD COLUMN IF NOT EXISTS text_search tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('english', text)) STORED"
+        )
+        op.execute(f"CREATE INDEX IF NOT EXISTS {table}_text_search_index ON {schema}.{table} USING gin (text_search)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    schema = get_configuration().persistence.vector_db_schema
+    for table in _collection_tables(schema):
+        op.execute(f"DROP INDEX IF EXISTS {schema}.{table}_text_search_index")
+        op.execute(f"ALTER TABLE {schema}.{table} DROP COLUMN IF EXISTS text_search")
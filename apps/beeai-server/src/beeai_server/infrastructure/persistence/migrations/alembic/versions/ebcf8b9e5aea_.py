@@ -0,0 +1,37 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""add vector store quantization
+
+Revision ID: ebcf8b9e5aea
+Revises: c460b9f158bf
+Create Date: 2025-07-29 09:31:07.514806
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "ebcf8b9e5aea"
+down_revision: str | None = "c460b9f158bf"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+vector_quantization_enum = sa.Enum("none", "binary", name="vector_quantization")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    vector_quantization_enum.create(op.get_bind())
+    op.add_column("vector_stores", sa.Column("quantization", vector_quantization_enum, nullable=True))
+    op.execute("UPDATE vector_stores SET quantization = 'none'")
+    op.alter_column("vector_stores", "quantization", nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("vector_stores", "quantization")
+    vector_quantization_enum.drop(op.get_bind())
@@ -7,6 +7,7 @@ from uuid import UUID
 from kink import inject
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Column,
     DateTime,
     Enum,
@@ -21,12 +22,16 @@ from sqlalchemy import (
     select,
 )
 from sqlalchemy import UUID as SQL_UUID
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncConnection
 
-from beeai_server.domain.models.file import ExtractionStatus, File, FileType, TextExtraction
+from beeai_server.domain.models.file import ExtractionStatus, File, FileType, TextExtraction, TextExtractionUpdate
 from beeai_server.domain.repositories.file import IFileRepository
 from beeai_server.exceptions import EntityNotFoundError
 from beeai_server.infrastructure.persistence.repositories.db_metadata import metadata
+from beeai_server.utils.utils import utc_now
+
+EXTRACTION_UPDATES_CHANNEL = "text_extraction_updates"
 
 files_table = Table(
     "files",
@@ -34,10 +39,24 @@ files_table = Table(
     Column("id", SQL_UUID, primary_key=True),
     Column("filename", String(256), nullable=False),
     Column("file_size_bytes", Integer, nullable=True),
+    Column("checksum_sha256", String(64), nullable=True),
     Column("created_at", DateTime(timezone=True), nullable=False),
     Column("created_by", ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
     Column("file_type", Enum(FileType, name="file_type"), nullable=False),
     Column("parent_file_id", ForeignKey("files.id", ondelete="CASCADE"), nullable=True),
+    Column("object_id", SQL_UUID, nullable=True),  # NULL if the object is stored under the file ID
+)
+
+# Reference counted objects shared by the files with the same content, objects of files uploaded without a checksum
+# are not shared and have no row in this table
+file_objects_table = Table(
+    "file_objects",
+    metadata,
+    Column("id", SQL_UUID, primary_key=True),
+    Column("checksum_sha256", String(64), nullable=False, unique=True),
+    Column("size_bytes", BigInteger, nullable=False),
+    Column("ref_count", Integer, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
 )
 
 text_extractions_table = Table(
@@ -68,8 +87,10 @@ class SqlAlchemyFileRepository(IFileRepository):
             created_at=file.created_at,
             created_by=file.created_by,
             file_size_bytes=file.file_size_bytes,
+            checksum_sha256=file.checksum_sha256,
             file_type=file.file_type,
             parent_file_id=file.parent_file_id,
+            object_id=file.object_id,
         )
         await self.connection.execute(query)
 
@@ -81,8 +102,10 @@ class SqlAlchemyFileRepository(IFileRepository):
                 "created_at": row.created_at,
                 "created_by": row.created_by,
                 "file_size_bytes": row.file_size_bytes,
+                "checksum_sha256": row.checksum_sha256,
                 "file_type": row.file_type,
                 "parent_file_id": row.parent_file_id,
+                "object_id": row.object_id,
             }
         )
 
@@ -109,6 +132,44 @@ class SqlAlchemyFileRepository(IFileRepository):
             query = query.where(files_table.c.created_by == user_id)
         await self.connection.execute(query)
 
+    async def add_object_reference(self, *, object_id: UUID, checksum_sha256: str, size: int) -> UUID:
+        """Reference the object with the same content or register the new object, returns the referenced object ID."""
+        query = (
+            insert(file_objects_table)
+            .values(id=object_id, checksum_sha256=checksum_sha256, size_bytes=size, ref_count=1, created_at=utc_now())
+            .on_conflict_do_update(
+                index_elements=[file_objects_table.c.checksum_sha256],
+                set_={"ref_count": file_objects_table.c.ref_count + 1},
+            )
+            .returning(file_objects_table.c.id)
+        )
+        return await self.connection.scalar(query)
+
+    async def reference_object(self, *, object_id: UUID) -> bool:
+        """Add a reference to a shared object, returns False if the object is not shared (anymore)."""
+        query = (
+            file_objects_table.update()
+            .where(file_objects_table.c.id == object_id)
+            .values(ref_count=file_objects_table.c.ref_count + 1)
+            .returning(file_objects_table.c.id)
+        )
+        return await self.connection.scalar(query) is not None
+
+    async def release_object(self, *, object_id: UUID) -> bool:
+        """Remove a reference to the object, returns True if the object is no longer referenced and can be deleted."""
+        query = (
+            file_objects_table.update()
+            .where(file_objects_table.c.id == object_id)
+            .values(ref_count=file_objects_table.c.ref_count - 1)
+            .returning(file_objects_table.c.ref_count)
+        )
+        ref_count = await self.connection.scalar(query)
+        if ref_count:
+            return False
+        if ref_count is not None:
+            await self.connection.execute(delete(file_objects_table).where(file_objects_table.c.id == object_id))
+        return True
+
     async def list(self, *, user_id: UUID | None = None) -> AsyncIterator[File]:
         query = files_table.select().where(files_table.c.file_type == FileType.user_upload)
         if user_id:
@@ -174,7 +235,37 @@ class SqlAlchemyFileRepository(IFileRepository):
             )
         )
         await self.connection.execute(query)
+        await self._notify(TextExtractionUpdate(file_id=extraction.file_id))
+
+    async def notify_extraction_progress(self, *, file_id: UUID, progress_bytes: int) -> None:
+        await self._notify(TextExtractionUpdate(file_id=file_id, progress_bytes=progress_bytes))
+
+    async def _notify(self, update: TextExtractionUpdate) -> None:
+        # The notification is delivered to the listeners of all replicas when the transaction is committed
+        await self.connection.execute(
+            select(func.pg_notify(EXTRACTION_UPDATES_CHANNEL, update.model_dump_json(exclude_none=True)))
+        )
 
     async def delete_extraction(self, *, extraction_id: UUID) -> None:
         query = text_extractions_table.delete().where(text_extractions_table.c.id == extraction_id)
         await self.connection.execute(query)
+
+    async def find_extracted_file(self, *, checksum_sha256: str, backend: str) -> File | None:
+        """Find the text extracted by the backend from any file with the same content."""
+        source_files = files_table.alias("source_files")
+        query = (
+            select(files_table)
+            .join(text_extractions_table, text_extractions_table.c.extracted_file_id == files_table.c.id)
+            .join(source_files, text_extractions_table.c.file_id == source_files.c.id)
+            .join(
+                file_objects_table, file_objects_table.c.id == func.coalesce(files_table.c.object_id, files_table.c.id)
+            )
+            .where(
+                source_files.c.checksum_sha256 == checksum_sha256,
+                text_extractions_table.c.status == ExtractionStatus.completed,
+                text_extractions_table.c.extraction_metadata["backend"].as_string() == backend,
+            )
+            .limit(1)
+        )
+        result = await self.connection.execute(query)
+        return self._to_file(row) if (row := result.fetchone()) else None
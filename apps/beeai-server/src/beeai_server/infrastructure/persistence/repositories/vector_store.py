@@ -1,7 +1,9 @@
 # Copyright 2025 © BeeAI a Series of LF Projects, LLC
 # SPDX-License-Identifier: Apache-2.0
 
-from collections.abc import AsyncIterator, Iterable
+import builtins
+from collections import defaultdict
+from collections.abc import AsyncIterator, Collection, Iterable
 from datetime import timedelta
 from uuid import UUID
 
@@ -10,8 +12,10 @@ from sqlalchemy import (
     UUID as SQL_UUID,
 )
 from sqlalchemy import (
+    BigInteger,
     Column,
     DateTime,
+    Enum,
     ForeignKey,
     Integer,
     PrimaryKeyConstraint,
@@ -19,13 +23,14 @@ from sqlalchemy import (
     String,
     Table,
     func,
+    literal_column,
     select,
 )
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncConnection
 
-from beeai_server.domain.models.vector_store import VectorStore, VectorStoreDocument
+from beeai_server.domain.models.vector_store import VectorQuantization, VectorStore, VectorStoreDocument
 from beeai_server.domain.repositories.vector_store import IVectorStoreRepository
 from beeai_server.exceptions import DuplicateEntityError, EntityNotFoundError
 from beeai_server.infrastructure.persistence.repositories.db_metadata import metadata
@@ -41,7 +46,23 @@ vector_stores_table = Table(
     Column("dimension", Integer, nullable=False),
     Column("created_at", DateTime(timezone=True), nullable=False),
     Column("last_active_at", DateTime(timezone=True), nullable=False),
+    Column("modified_at", DateTime(timezone=True), nullable=False),
     Column("created_by", ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("quantization", Enum(VectorQuantization, name="vector_quantization"), nullable=False),
+    # HNSW build parameters, stores with non-default settings are kept in a separate collection table
+    Column("index_m", Integer, nullable=False, server_default="16"),
+    Column("index_ef_construction", Integer, nullable=False, server_default="64"),
+    # Statistics maintained together with vector_store_documents, see reconcile_stats
+    Column("usage_bytes", BigInteger, nullable=False, server_default="0"),
+    Column("num_documents", Integer, nullable=False, server_default="0"),
+)
+
+# Total usage of all vector stores of a user, maintained together with vector_stores
+vector_store_usage_table = Table(
+    "vector_store_usage",
+    metadata,
+    Column("user_id", ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("usage_bytes", BigInteger, nullable=False, server_default="0"),
 )
 
 vector_store_documents_table = Table(
@@ -69,9 +90,12 @@ class SqlAlchemyVectorStoreRepository(IVectorStoreRepository):
             "dimension": row.dimension,
             "created_at": row.created_at,
             "last_active_at": row.last_active_at,
+            "modified_at": row.modified_at,
             "created_by": row.created_by,
+            "quantization": row.quantization,
+            "index_settings": {"m": row.index_m, "ef_construction": row.index_ef_construction},
             "stats": {
-                "usage_bytes": row.total_usage_bytes,
+                "usage_bytes": row.usage_bytes,
                 "num_documents": row.num_documents,
             },
         }
@@ -96,63 +120,75 @@ class SqlAlchemyVectorStoreRepository(IVectorStoreRepository):
             dimension=vector_store.dimension,
             created_at=vector_store.created_at,
             last_active_at=vector_store.last_active_at,
+            modified_at=vector_store.modified_at,
             created_by=vector_store.created_by,
+            quantization=vector_store.quantization,
+            index_m=vector_store.index_settings.m,
+            index_ef_construction=vector_store.index_settings.ef_construction,
         )
         await self.connection.execute(query)
 
-    async def list(self, *, user_id: UUID | None = None) -> AsyncIterator[VectorStore]:
-        query = select(
-            vector_stores_table,
-            func.coalesce(func.sum(vector_store_documents_table.c.usage_bytes), 0).label("total_usage_bytes"),
-            func.coalesce(func.count(vector_store_documents_table.c.id), 0).label("num_documents"),
-        ).outerjoin(
-            vector_store_documents_table,
-            vector_stores_table.c.id == vector_store_documents_table.c.vector_store_id,
-        )
-
+    async def list(
+        self, *, user_id: UUID | None = None, vector_store_ids: Collection[UUID] | None = None
+    ) -> AsyncIterator[VectorStore]:
+        query = select(vector_stores_table)
         if user_id:
             query = query.where(vector_stores_table.c.created_by == user_id)
-
-        # Group by all columns of the vector_stores_table to collapse the joined rows
-        query = query.group_by(*vector_stores_table.c)
+        if vector_store_ids is not None:
+            query = query.where(vector_stores_table.c.id.in_(vector_store_ids))
 
         async for row in await self.connection.stream(query):
             yield self._to_vector_store(row)
 
     async def get(self, *, vector_store_id: UUID, user_id: UUID | None = None) -> VectorStore:
-        # Select all columns from the main table
-        query = (
-            select(
-                vector_stores_table,
-                func.coalesce(func.sum(vector_store_documents_table.c.usage_bytes), 0).label("total_usage_bytes"),
-                func.coalesce(func.count(vector_store_documents_table.c.id), 0).label("num_documents"),
-            )
-            .outerjoin(
-                vector_store_documents_table,
-                vector_stores_table.c.id == vector_store_documents_table.c.vector_store_id,
-            )
-            .where(vector_stores_table.c.id == vector_store_id)
-        )
-
+        query = select(vector_stores_table).where(vector_stores_table.c.id == vector_store_id)
         if user_id:
             query = query.where(vector_stores_table.c.created_by == user_id)
 
-        # Group by all columns of the vector_stores_table to collapse the joined rows
-        query = query.group_by(*vector_stores_table.c)
-
         result = await self.connection.execute(query)
         if not (row := result.fetchone()):
             raise EntityNotFoundError(entity="vector_store", id=vector_store_id)
 
         return self._to_vector_store(row)
 
+    async def _update_stats(self, *, usage_bytes: dict[UUID, int], num_documents: dict[UUID, int]) -> None:
+        """Mark the vector stores as modified and apply usage deltas to them and to the usage of their owners."""
+        usage_per_user = defaultdict(int)
+        for vector_store_id in sorted(usage_bytes.keys() | num_documents.keys()):
+            query = (
+                vector_stores_table.update()
+                .where(vector_stores_table.c.id == vector_store_id)
+                .values(
+                    usage_bytes=vector_stores_table.c.usage_bytes + usage_bytes.get(vector_store_id, 0),
+                    num_documents=vector_stores_table.c.num_documents + num_documents.get(vector_store_id, 0),
+                    modified_at=utc_now(),
+                )
+                .returning(vector_stores_table.c.created_by)
+            )
+            if (user_id := await self.connection.scalar(query)) is not None:
+                usage_per_user[user_id] += usage_bytes.get(vector_store_id, 0)
+        await self._update_user_usage(usage_per_user)
+
+    async def _update_user_usage(self, usage_per_user: dict[UUID, int]) -> None:
+        for user_id, usage_bytes in usage_per_user.items():
+            if not usage_bytes:
+                continue
+            query = insert(vector_store_usage_table).values(user_id=user_id, usage_bytes=usage_bytes)
+            query = query.on_conflict_do_update(
+                index_elements=["user_id"],
+                set_={"usage_bytes": vector_store_usage_table.c.usage_bytes + query.excluded.usage_bytes},
+            )
+            await self.connection.execute(query)
+
     async def delete(self, *, vector_store_id: UUID, user_id: UUID | None = None) -> None:
         query = vector_stores_table.delete().where(vector_stores_table.c.id == vector_store_id)
 
         if user_id:
             query = query.where(vector_stores_table.c.created_by == user_id)
 
-        await self.connection.execute(query)
+        query = query.returning(vector_stores_table.c.created_by, vector_stores_table.c.usage_bytes)
+        result = await self.connection.execute(query)
+        await self._update_user_usage({row.created_by: -row.usage_bytes for row in result.fetchall()})
 
     async def update_last_accessed(self, *, vector_store_ids: Iterable[UUID]) -> None:
         query = (
@@ -189,22 +225,63 @@ class SqlAlchemyVectorStoreRepository(IVectorStoreRepository):
                         query.excluded.usage_bytes
                     )
                 },
+            ).returning(
+                vector_store_documents_table.c.vector_store_id,
+                # xmax is only set for rows updated by the ON CONFLICT clause
+                (literal_column("xmax") == 0).label("inserted"),
             )
-            await self.connection.execute(query)
+            result = await self.connection.execute(query)
         except IntegrityError as e:
             raise DuplicateEntityError(
                 entity="vector_store_document", field="id", value=str({d.id for d in documents})
             ) from e
+
+        usage_bytes, num_documents = defaultdict(int), defaultdict(int)
+        for document in documents:
+            usage_bytes[document.vector_store_id] += document.usage_bytes or 0
+        for row in result.fetchall():
+            num_documents[row.vector_store_id] += int(row.inserted)
+        await self._update_stats(usage_bytes=usage_bytes, num_documents=num_documents)
         await self.update_last_accessed(vector_store_ids={d.vector_store_id for d in documents})
 
     async def total_usage(self, *, user_id: UUID | None = None) -> int:
-        query = select(func.coalesce(func.sum(vector_store_documents_table.c.usage_bytes), 0))
+        query = select(func.coalesce(func.sum(vector_store_usage_table.c.usage_bytes), 0))
         if user_id:
-            query = query.join(vector_stores_table.c.id == vector_store_documents_table.c.vector_store_id).where(
-                vector_store_documents_table.c.created_by == user_id
-            )
+            query = query.where(vector_store_usage_table.c.user_id == user_id)
         return await self.connection.scalar(query)
 
+    async def replace_document(self, *, document: VectorStoreDocument) -> None:
+        """Insert or replace a document, unlike upsert_documents the usage is replaced instead of incremented."""
+        # Lock the document, so that concurrent replacements of the same document are serialized
+        existing = (
+            await self.connection.execute(
+                select(vector_store_documents_table.c.usage_bytes)
+                .where(
+                    (vector_store_documents_table.c.id == document.id)
+                    & (vector_store_documents_table.c.vector_store_id == document.vector_store_id)
+                )
+                .with_for_update()
+            )
+        ).first()
+        query = insert(vector_store_documents_table).values(
+            id=document.id,
+            vector_store_id=document.vector_store_id,
+            file_id=document.file_id,
+            usage_bytes=document.usage_bytes,
+            created_at=document.created_at,
+        )
+        query = query.on_conflict_do_update(
+            index_elements=["id", "vector_store_id"],
+            set_={"usage_bytes": query.excluded.usage_bytes, "file_id": query.excluded.file_id},
+        )
+        await self.connection.execute(query)
+        usage_delta = (document.usage_bytes or 0) - ((existing and existing.usage_bytes) or 0)
+        await self._update_stats(
+            usage_bytes={document.vector_store_id: usage_delta},
+            num_documents={document.vector_store_id: int(existing is None)},
+        )
+        await self.update_last_accessed(vector_store_ids=[document.vector_store_id])
+
     async def list_documents(
         self, *, vector_store_id: UUID, user_id: UUID | None = None
     ) -> AsyncIterator[VectorStoreDocument]:
@@ -233,12 +310,145 @@ class SqlAlchemyVectorStoreRepository(IVectorStoreRepository):
                     select(vector_stores_table.c.id).where(vector_stores_table.c.created_by == user_id)
                 )
             )
+        query = query.returning(vector_store_documents_table.c.usage_bytes)
+        usage_bytes = [row.usage_bytes or 0 for row in (await self.connection.execute(query)).fetchall()]
+        if usage_bytes:
+            await self._update_stats(
+                usage_bytes={vector_store_id: -sum(usage_bytes)}, num_documents={vector_store_id: -len(usage_bytes)}
+            )
+        return len(usage_bytes)
+
+    async def list_expired(
+        self, *, active_threshold: timedelta, limit: int | None = None
+    ) -> builtins.list[VectorStore]:
+        """
+        List and lock the least recently active expired vector stores.
+
+        The rows stay locked until the end of the transaction, so they cannot become active again before they are
+        deleted. Rows locked by other transactions are skipped.
+        """
+        expiration_date = utc_now() - active_threshold
+        query = (
+            select(vector_stores_table)
+            .where(vector_stores_table.c.last_active_at < expiration_date)
+            .order_by(vector_stores_table.c.last_active_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
         result = await self.connection.execute(query)
-        return result.rowcount
+        return [self._to_vector_store(row) for row in result.fetchall()]
 
-    async def delete_expired(self, *, active_threshold: timedelta) -> int:
+    async def delete_expired(
+        self, *, active_threshold: timedelta, vector_store_ids: Collection[UUID] | None = None
+    ) -> int:
+        """Delete expired vector stores, optionally only those in vector_store_ids (e.g. a batch from list_expired)."""
         # Calculate the expiration date
         expiration_date = utc_now() - active_threshold
         query = vector_stores_table.delete().where(vector_stores_table.c.last_active_at < expiration_date)
+        if vector_store_ids is not None:
+            query = query.where(vector_stores_table.c.id.in_(vector_store_ids))
+        query = query.returning(vector_stores_table.c.created_by, vector_stores_table.c.usage_bytes)
+        rows = (await self.connection.execute(query)).fetchall()
+        usage_per_user = defaultdict(int)
+        for row in rows:
+            usage_per_user[row.created_by] -= row.usage_bytes
+        await self._update_user_usage(usage_per_user)
+        return len(rows)
+
+    async def reconcile_stats(self, *, limit: int, after_id: UUID | None = None) -> tuple[UUID | None, int]:
+        """
+        Recompute the statistics of the next batch of vector stores (ordered by id) from their documents.
+
+        The statistics are maintained incrementally, this fixes any drift (e.g. caused by manual changes in the
+        database). Only the vector stores of the batch are locked, those locked by a running ingest are skipped and
+        reconciled by the next run. Returns the id to continue after (None once all vector stores were processed) and
+        the number of vector stores whose statistics were corrected.
+        """
+        query = select(vector_stores_table.c.id).order_by(vector_stores_table.c.id).limit(limit)
+        if after_id is not None:
+            query = query.where(vector_stores_table.c.id > after_id)
+        # Block concurrent updates of the statistics, so that the documents read below match the counters
+        vector_store_ids = (await self.connection.execute(query.with_for_update(skip_locked=True))).scalars().all()
+        if not vector_store_ids:
+            return None, 0
+
+        documents_stats = (
+            select(
+                vector_store_documents_table.c.vector_store_id,
+                func.coalesce(func.sum(vector_store_documents_table.c.usage_bytes), 0).label("usage_bytes"),
+                func.count().label("num_documents"),
+            )
+            .where(vector_store_documents_table.c.vector_store_id.in_(vector_store_ids))
+            .group_by(vector_store_documents_table.c.vector_store_id)
+            .subquery("documents_stats")
+        )
+        usage_bytes = func.coalesce(documents_stats.c.usage_bytes, 0)
+        num_documents = func.coalesce(documents_stats.c.num_documents, 0)
+        stats = (
+            select(vector_stores_table.c.id, usage_bytes.label("usage_bytes"), num_documents.label("num_documents"))
+            .outerjoin(documents_stats, documents_stats.c.vector_store_id == vector_stores_table.c.id)
+            .where(
+                vector_stores_table.c.id.in_(vector_store_ids),
+                (vector_stores_table.c.usage_bytes != usage_bytes)
+                | (vector_stores_table.c.num_documents != num_documents),
+            )
+            .subquery("stats")
+        )
+        query = (
+            vector_stores_table.update()
+            .where(vector_stores_table.c.id == stats.c.id)
+            .values(usage_bytes=stats.c.usage_bytes, num_documents=stats.c.num_documents)
+        )
         result = await self.connection.execute(query)
-        return result.rowcount
+        return vector_store_ids[-1], result.rowcount
+
+    async def reconcile_usage(self, *, limit: int, after_user_id: UUID | None = None) -> tuple[UUID | None, int]:
+        """
+        Recompute the usage of the next batch of users (ordered by id) from the statistics of their vector stores.
+
+        The usage rows are updated in place, the rows locked by a running ingest are skipped. Every change of the
+        statistics of a vector store updates the usage of its owner in the same transaction, so the usage computed
+        while the row is locked stays consistent with the changes committed afterwards. Returns the id to continue
+        after (None once all users were processed) and the number of users whose usage was corrected.
+        """
+        stores_usage = (
+            select(func.coalesce(func.sum(vector_stores_table.c.usage_bytes), 0))
+            .where(vector_stores_table.c.created_by == vector_store_usage_table.c.user_id)
+            .scalar_subquery()
+        )
+        corrected_count = 0
+        if after_user_id is None:
+            # Users whose usage row is missing, a concurrent ingest waits for the inserted row and then applies its delta
+            missing_usage = (
+                select(vector_stores_table.c.created_by, func.sum(vector_stores_table.c.usage_bytes))
+                .where(
+                    ~select(vector_store_usage_table.c.user_id)
+                    .where(vector_store_usage_table.c.user_id == vector_stores_table.c.created_by)
+                    .exists()
+                )
+                .group_by(vector_stores_table.c.created_by)
+                .having(func.sum(vector_stores_table.c.usage_bytes) != 0)
+            )
+            query = (
+                insert(vector_store_usage_table)
+                .from_select(["user_id", "usage_bytes"], missing_usage)
+                .on_conflict_do_nothing(index_elements=["user_id"])
+            )
+            corrected_count += (await self.connection.execute(query)).rowcount
+
+        query = select(vector_store_usage_table.c.user_id).order_by(vector_store_usage_table.c.user_id).limit(limit)
+        if after_user_id is not None:
+            query = query.where(vector_store_usage_table.c.user_id > after_user_id)
+        user_ids = (await self.connection.execute(query.with_for_update(skip_locked=True))).scalars().all()
+        if not user_ids:
+            return None, corrected_count
+
+        query = (
+            vector_store_usage_table.update()
+            .where(
+                vector_store_usage_table.c.user_id.in_(user_ids), vector_store_usage_table.c.usage_bytes != stores_usage
+            )
+            .values(usage_bytes=stores_usage)
+        )
+        corrected_count += (await self.connection.execute(query)).rowcount
+        return user_ids[-1], corrected_count
@@ -53,7 +53,9 @@ class SQLAlchemyUnitOfWork(IUnitOfWork):
             self.users = SqlAlchemyUserRepository(self._connection)
             self.vector_stores = SqlAlchemyVectorStoreRepository(self._connection)
             self.vector_database = VectorDatabaseRepository(
-                self._connection, schema_name=self._config.persistence.vector_db_schema
+                self._connection,
+                schema_name=self._config.persistence.vector_db_schema,
+                quantization_oversampling=self._config.vector_stores.quantization_oversampling,
             )
 
         except Exception as e:
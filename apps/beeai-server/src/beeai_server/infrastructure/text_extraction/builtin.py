@@ -0,0 +1,56 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import anyio
+import anyio.to_process
+
+from beeai_server.configuration import BuiltinExtractionConfiguration
+from beeai_server.domain.models.file import AsyncFile
+from beeai_server.domain.repositories.file import IBuiltinTextExtractionBackend
+from beeai_server.exceptions import StorageCapacityExceededError
+from beeai_server.infrastructure.text_extraction.markdown import CONVERTERS, convert_to_markdown, media_type
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class BuiltinTextExtractionBackend(IBuiltinTextExtractionBackend):
+    """Convert simple formats to markdown in a pool of worker processes, keeping the event loop free."""
+
+    def __init__(self, config: BuiltinExtractionConfiguration):
+        self._config = config
+        self._limiter = anyio.CapacityLimiter(config.max_processes)
+
+    @property
+    def name(self) -> str:
+        return "builtin"
+
+    def supports(self, *, content_type: str, size: int | None = None) -> bool:
+        return (
+            self._config.enabled
+            and media_type(content_type) in CONVERTERS
+            and (size is None or size <= self._config.max_file_size)
+        )
+
+    @asynccontextmanager
+    async def extract_text(self, *, file: AsyncFile) -> AsyncIterator[AsyncFile]:
+        content = bytearray()
+        while chunk := await file.read(CHUNK_SIZE):
+            content += chunk
+            if len(content) > self._config.max_file_size:
+                raise StorageCapacityExceededError("file", self._config.max_file_size)
+        markdown = await anyio.to_process.run_sync(
+            convert_to_markdown, bytes(content), file.content_type, self._config.max_file_size, limiter=self._limiter
+        )
+        data = markdown.encode("utf-8")
+        offset = 0
+
+        async def read(size: int = CHUNK_SIZE) -> bytes:
+            nonlocal offset
+            chunk = data[offset : offset + size] if size >= 0 else data[offset:]
+            offset += len(chunk)
+            return chunk
+
+        yield AsyncFile(filename="extracted_text.md", content_type="text/markdown", read=read, size=len(data))
@@ -11,7 +11,7 @@ from pydantic import AnyUrl
 from beeai_server.configuration import DoclingExtractionConfiguration
 from beeai_server.domain.models.file import AsyncFile
 from beeai_server.domain.repositories.file import ITextExtractionBackend
-from beeai_server.utils.utils import extract_string_value_stream
+from beeai_server.utils.json_stream import extract_string_value_stream
 
 
 class DoclingTextExtractionBackend(ITextExtractionBackend):
@@ -19,6 +19,10 @@ class DoclingTextExtractionBackend(ITextExtractionBackend):
         self._config = config
         self._enabled = config.enabled
 
+    @property
+    def name(self) -> str:
+        return self._config.backend
+
     @asynccontextmanager
     async def extract_text(self, *, file_url: AnyUrl, timeout: timedelta | None = None) -> AsyncIterable[AsyncFile]:  # noqa: ASYNC109 (the timeout actually corresponds to docling timeout)
         if not self._enabled:
@@ -0,0 +1,209 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Conversion of simple document formats to markdown using only the standard library.
+
+The functions are CPU bound and run in worker processes, they must stay importable without side effects.
+"""
+
+import csv
+import io
+import json
+import re
+import zipfile
+from collections.abc import Callable
+from contextlib import suppress
+from html.parser import HTMLParser
+from types import MappingProxyType
+from xml.etree import ElementTree
+
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def _decode(content: bytes, content_type: str) -> str:
+    charset = re.search(r"charset=\"?([\w.:-]+)", content_type)
+    try:
+        return content.decode(charset.group(1) if charset else "utf-8-sig", errors="replace")
+    except LookupError:  # unknown charset
+        return content.decode("utf-8-sig", errors="replace")
+
+
+def _table(rows: list[list[str]]) -> str:
+    if not rows:
+        return ""
+    width = max(len(row) for row in rows)
+    rows = [[" ".join(cell.replace("|", "\\|").split()) for cell in row] + [""] * (width - len(row)) for row in rows]
+    lines = [f"| {' | '.join(rows[0])} |", f"|{'---|' * width}"]
+    lines.extend(f"| {' | '.join(row)} |" for row in rows[1:])
+    return "\n".join(lines)
+
+
+_HTML_SKIPPED_TAGS = frozenset({"script", "style", "head", "noscript", "template", "svg"})
+_HTML_BLOCK_TAGS = frozenset(
+    {"p", "div", "section", "article", "header", "footer", "main", "aside", "nav", "blockquote", "ul", "ol"}
+)
+_HTML_INLINE_MARKS = MappingProxyType({"strong": "**", "b": "**", "em": "*", "i": "*", "code": "`"})
+
+
+class _HtmlToMarkdown(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._output: list[str] = []
+        self._skip_depth = 0
+        self._pre_depth = 0
+        self._links: list[str | None] = []
+        self._tables: list[list[list[str]]] = []
+        self._cell: list[str] | None = None
+
+    def _write(self, text: str) -> None:
+        if self._cell is not None:
+            self._cell.append(text)
+        else:
+            self._output.append(text)
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in _HTML_SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif self._skip_depth:
+            return
+        elif re.fullmatch(r"h[1-6]", tag):
+            self._write(f"\n\n{'#' * int(tag[1])} ")
+        elif tag in _HTML_BLOCK_TAGS:
+            self._write("\n\n")
+        elif tag == "br":
+            self._write("\n")
+        elif tag == "li":
+            self._write("\n- ")
+        elif tag == "pre":
+            self._pre_depth += 1
+            self._write("\n\n```\n")
+        elif tag in _HTML_INLINE_MARKS and not self._pre_depth:
+            self._write(_HTML_INLINE_MARKS[tag])
+        elif tag == "a":
+            self._links.append(dict(attrs).get("href"))
+            self._write("[")
+        elif tag == "table":
+            self._tables.append([])
+        elif tag == "tr" and self._tables:
+            self._tables[-1].append([])
+        elif tag in {"td", "th"} and self._tables:
+            self._cell = []
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _HTML_SKIPPED_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif self._skip_depth:
+            return
+        elif re.fullmatch(r"h[1-6]", tag) or tag in _HTML_BLOCK_TAGS:
+            self._write("\n\n")
+        elif tag == "pre" and self._pre_depth:
+            self._pre_depth -= 1
+            self._write("\n```\n\n")
+        elif tag in _HTML_INLINE_MARKS and not self._pre_depth:
+            self._write(_HTML_INLINE_MARKS[tag])
+        elif tag == "a" and self._links:
+            href = self._links.pop()
+            self._write(f"]({href})" if href else "]")
+        elif tag in {"td", "th"} and self._cell is not None:
+            cell, self._cell = "".join(self._cell), None
+            if self._tables and self._tables[-1]:
+                self._tables[-1][-1].append(cell)
+        elif tag == "table" and self._tables:
+            self._write(f"\n\n{_table([row for row in self._tables.pop() if row])}\n\n")
+
+    def handle_data(self, data: str) -> None:
+        if self._skip_depth:
+            return
+        self._write(data if self._pre_depth else re.sub(r"\s+", " ", data))
+
+    def markdown(self) -> str:
+        self.close()
+        lines = (line.rstrip() for line in "".join(self._output).splitlines())
+        return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip() + "\n"
+
+
+def html_to_markdown(content: bytes, content_type: str) -> str:
+    parser = _HtmlToMarkdown()
+    parser.feed(_decode(content, content_type))
+    return parser.markdown()
+
+
+def csv_to_markdown(content: bytes, content_type: str) -> str:
+    text = _decode(content, content_type)
+    try:
+        dialect = csv.Sniffer().sniff(text[: 64 * 1024], delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel
+    return _table(list(csv.reader(io.StringIO(text), dialect))) + "\n"
+
+
+def json_to_markdown(content: bytes, content_type: str) -> str:
+    text = _decode(content, content_type)
+    with suppress(ValueError):  # kept as is otherwise, possibly JSON lines
+        text = json.dumps(json.loads(text), indent=2, ensure_ascii=False)
+    return f"```json\n{text}\n```\n"
+
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def _docx_paragraph(paragraph: ElementTree.Element) -> str:
+    parts = []
+    for element in paragraph.iter():
+        if element.tag == f"{_W}t":
+            parts.append(element.text or "")
+        elif element.tag == f"{_W}tab":
+            parts.append("\t")
+        elif element.tag in {f"{_W}br", f"{_W}cr"}:
+            parts.append("\n")
+    text = "".join(parts).strip()
+    style = paragraph.find(f"{_W}pPr/{_W}pStyle")
+    style = style.get(f"{_W}val", "") if style is not None else ""
+    if text and (heading := re.fullmatch(r"(?i)heading\s*([1-6])", style)):
+        return f"{'#' * int(heading.group(1))} {text}"
+    if text and (style.lower() == "title"):
+        return f"# {text}"
+    if text and paragraph.find(f"{_W}pPr/{_W}numPr") is not None:
+        return f"- {text}"
+    return text
+
+
+def docx_to_markdown(content: bytes, content_type: str, max_size: int | None = None) -> str:
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        # zipfile does not decompress more than the declared size, a small archive cannot expand beyond the limit
+        if max_size is not None and (size := archive.getinfo("word/document.xml").file_size) > max_size:
+            raise ValueError(f"DOCX document of {size} bytes exceeds the limit of {max_size} bytes")
+        document = ElementTree.fromstring(archive.read("word/document.xml"))
+    body = document.find(f"{_W}body")
+    blocks = []
+    for element in body if body is not None else ():
+        if element.tag == f"{_W}p":
+            blocks.append(_docx_paragraph(element))
+        elif element.tag == f"{_W}tbl":
+            rows = [
+                [" ".join(_docx_paragraph(p) for p in cell.iter(f"{_W}p")) for cell in row.iter(f"{_W}tc")]
+                for row in element.iter(f"{_W}tr")
+            ]
+            blocks.append(_table(rows))
+    return "\n\n".join(block for block in blocks if block) + "\n"
+
+
+CONVERTERS: dict[str, Callable[[bytes, str], str]] = {
+    "text/html": html_to_markdown,
+    "application/xhtml+xml": html_to_markdown,
+    "text/csv": csv_to_markdown,
+    "application/json": json_to_markdown,
+    DOCX_CONTENT_TYPE: docx_to_markdown,
+}
+
+
+def media_type(content_type: str) -> str:
+    return content_type.split(";")[0].strip().lower()
+
+
+def convert_to_markdown(content: bytes, content_type: str, max_size: int | None = None) -> str:
+    """Convert the content to markdown, max_size also limits the decompressed size of DOCX archives."""
+    if media_type(content_type) == DOCX_CONTENT_TYPE:
+        return docx_to_markdown(content, content_type, max_size)
+    return CONVERTERS[media_type(content_type)](content, content_type)
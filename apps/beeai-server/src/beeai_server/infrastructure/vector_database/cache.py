@@ -0,0 +1,171 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+import base64
+import json
+import logging
+from collections import OrderedDict
+from collections.abc import Collection, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+import anyio.to_thread
+import numpy as np
+from cachetools import LRUCache
+
+from beeai_server.configuration import VectorStoresConfiguration
+from beeai_server.domain.models.vector_store import (
+    EmbeddingFormat,
+    VectorStore,
+    VectorStoreItemField,
+    VectorStoreSearchItem,
+    VectorStoreSearchResult,
+)
+from beeai_server.domain.repositories.vector_store import IVectorStoreCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CachedVectorStore:
+    modified_at: datetime
+    items: list[VectorStoreSearchItem]
+    embeddings: np.ndarray
+    norms: np.ndarray
+    size_bytes: int
+
+
+def _top_k(embeddings: np.ndarray, norms: np.ndarray, query_vector: np.ndarray, limit: int) -> tuple[np.ndarray, ...]:
+    """Exact cosine similarity top-k, returns indices and scores ordered from the most similar."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = embeddings @ query_vector / (norms * np.linalg.norm(query_vector))
+    # Zero vectors have undefined similarity, postgres returns NaN distance for them and orders them last
+    scores = np.nan_to_num(scores, nan=-np.inf)
+    indices = np.argpartition(-scores, limit)[:limit] if limit < len(scores) else np.arange(len(scores))
+    indices = indices[np.argsort(-scores[indices], kind="stable")]
+    return indices, scores[indices]
+
+
+class InMemoryVectorStoreCache(IVectorStoreCache):
+    """
+    LRU cache of whole vector stores answering searches using exact (brute force) cosine similarity.
+
+    Entries are checked against modified_at of the vector store on every search, so changes made by other server
+    replicas are never served from the cache.
+    """
+
+    def __init__(self, configuration: VectorStoresConfiguration):
+        self._size_bytes = configuration.cache_size_bytes
+        self._max_store_bytes = min(configuration.cache_max_store_bytes, configuration.cache_size_bytes)
+        self._min_searches = configuration.cache_min_searches
+        self._stores: OrderedDict[UUID, _CachedVectorStore] = OrderedDict()
+        # Bounded, vector stores searched only a few times must not accumulate in long running processes
+        self._search_counts: LRUCache[UUID, int] = LRUCache(maxsize=configuration.cache_tracked_stores)
+        self.memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._size_bytes > 0
+
+    @property
+    def num_stores(self) -> int:
+        return len(self._stores)
+
+    @property
+    def memory_limit_bytes(self) -> int:
+        return self._size_bytes
+
+    def should_load(self, vector_store: VectorStore) -> bool:
+        should_load = (
+            self.enabled
+            and self._search_counts.get(vector_store.id, 0) >= self._min_searches
+            and vector_store.stats is not None
+            and vector_store.stats.usage_bytes <= self._max_store_bytes
+        )
+        if should_load:
+            # Reset the counter, so that concurrent searches don't load the same vector store again
+            self._search_counts.pop(vector_store.id, None)
+        return should_load
+
+    def put(self, vector_store: VectorStore, items: list[VectorStoreSearchItem], embeddings: np.ndarray) -> None:
+        self.invalidate(vector_store.id)
+        size_bytes = embeddings.nbytes + sum(
+            len(item.text or "") + len(json.dumps(item.metadata)) + 64 for item in items
+        )
+        if size_bytes > self._max_store_bytes:
+            return
+        while self._stores and self.memory_bytes + size_bytes > self._size_bytes:
+            _, evicted = self._stores.popitem(last=False)
+            self.memory_bytes -= evicted.size_bytes
+        self._stores[vector_store.id] = _CachedVectorStore(
+            modified_at=vector_store.modified_at,
+            items=items,
+            embeddings=np.ascontiguousarray(embeddings, dtype=np.float32),
+            norms=np.linalg.norm(embeddings, axis=1),
+            size_bytes=size_bytes,
+        )
+        self.memory_bytes += size_bytes
+        logger.debug(f"Cached vector store {vector_store.id} ({len(items)} items, {size_bytes} bytes)")
+
+    def invalidate(self, vector_store_id: UUID) -> None:
+        if cached := self._stores.pop(vector_store_id, None):
+            self.memory_bytes -= cached.size_bytes
+
+    async def search(
+        self,
+        vector_store: VectorStore,
+        query_vector: Sequence[float],
+        limit: int = 10,
+        include: Collection[VectorStoreItemField] | None = None,
+        embedding_format: EmbeddingFormat = EmbeddingFormat.float,
+    ) -> list[VectorStoreSearchResult] | None:
+        if not self.enabled:
+            return None
+        cached = self._stores.get(vector_store.id)
+        if cached is None or cached.modified_at != vector_store.modified_at:
+            self.invalidate(vector_store.id)
+            self._search_counts[vector_store.id] = self._search_counts.get(vector_store.id, 0) + 1
+            self.misses += 1
+            return None
+
+        self._stores.move_to_end(vector_store.id)
+        self.hits += 1
+        indices, scores = await anyio.to_thread.run_sync(
+            _top_k, cached.embeddings, cached.norms, np.asarray(query_vector, dtype=np.float32), limit
+        )
+        include = set(VectorStoreItemField) if include is None else set(include)
+        return [
+            VectorStoreSearchResult(
+                item=self._to_item(cached, index, include, embedding_format),
+                score=float(score),
+            )
+            for index, score in zip(indices, scores, strict=True)
+        ]
+
+    def _to_item(
+        self,
+        cached: _CachedVectorStore,
+        index: int,
+        include: set[VectorStoreItemField],
+        embedding_format: EmbeddingFormat,
+    ) -> VectorStoreSearchItem:
+        item = cached.items[index]
+        embedding = None
+        if VectorStoreItemField.embedding in include:
+            # Stored embeddings are float16 values, the conversion is lossless and matches the database results
+            match embedding_format:
+                case EmbeddingFormat.float:
+                    embedding = cached.embeddings[index].tolist()
+                case EmbeddingFormat.base64:
+                    embedding = base64.b64encode(cached.embeddings[index].astype("<f2").tobytes()).decode("ascii")
+        return VectorStoreSearchItem(
+            id=item.id,
+            vector_store_id=item.vector_store_id,
+            document_id=item.document_id,
+            text=item.text if VectorStoreItemField.text in include else None,
+            metadata=item.metadata if VectorStoreItemField.metadata in include else None,
+            embedding=embedding,
+        )
@@ -0,0 +1,123 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Columnar (Arrow IPC stream or Parquet) snapshots of vector store items, written and read batch by batch."""
+
+import io
+from collections.abc import AsyncIterator
+from typing import BinaryIO
+from uuid import UUID
+
+import anyio.to_thread
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from pydantic import TypeAdapter, ValidationError
+
+from beeai_server.domain.models.common import Metadata
+from beeai_server.domain.models.vector_store import SnapshotFormat
+from beeai_server.exceptions import InvalidVectorStoreSnapshotError
+
+_metadata_adapter = TypeAdapter(Metadata)
+
+MAX_DOCUMENT_ID_LENGTH = 256  # String(256) of the vector_store_document_id column
+
+
+def snapshot_schema(dimension: int) -> pa.Schema:
+    return pa.schema(
+        [
+            pa.field("id", pa.string(), nullable=False),
+            pa.field("document_id", pa.string(), nullable=False),
+            pa.field("text", pa.string(), nullable=False),
+            pa.field("metadata", pa.map_(pa.string(), pa.string())),
+            pa.field("embedding", pa.list_(pa.float16(), dimension), nullable=False),
+        ]
+    )
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file collecting the bytes written by the Arrow writers until they are drained."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def write_snapshot(
+    batches: AsyncIterator[pa.RecordBatch], schema: pa.Schema, snapshot_format: SnapshotFormat
+) -> AsyncIterator[bytes]:
+    """Serialize the batches, the output is yielded after every batch so only a single batch is kept in memory."""
+    sink = _ChunkSink()
+    match snapshot_format:
+        case SnapshotFormat.arrow:
+            writer = pa.ipc.new_stream(sink, schema)
+        case SnapshotFormat.parquet:
+            writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    async for batch in batches:
+        # Parquet writes every batch as a separate row group
+        await anyio.to_thread.run_sync(writer.write_batch, batch)
+        if data := sink.drain():
+            yield data
+    writer.close()
+    if data := sink.drain():
+        yield data
+
+
+async def read_snapshot(
+    file: BinaryIO, snapshot_format: SnapshotFormat, dimension: int, batch_size: int
+) -> AsyncIterator[pa.RecordBatch]:
+    """Read and validate the batches of a snapshot, parquet snapshots must be seekable files."""
+    schema = snapshot_schema(dimension)
+    try:
+        match snapshot_format:
+            case SnapshotFormat.arrow:
+                reader = await anyio.to_thread.run_sync(pa.ipc.open_stream, file)
+                batches = iter(reader)
+            case SnapshotFormat.parquet:
+                parquet_file = await anyio.to_thread.run_sync(pq.ParquetFile, file)
+                batches = parquet_file.iter_batches(batch_size=batch_size, columns=schema.names)
+        while (batch := await anyio.to_thread.run_sync(next, batches, None)) is not None:
+            yield _validate_batch(batch, schema)
+    except (pa.ArrowException, OSError) as e:
+        raise InvalidVectorStoreSnapshotError(f"Invalid {snapshot_format} snapshot: {e}") from e
+
+
+def _validate_batch(batch: pa.RecordBatch, schema: pa.Schema) -> pa.RecordBatch:
+    if missing := set(schema.names) - set(batch.schema.names):
+        raise InvalidVectorStoreSnapshotError(f"Snapshot is missing columns: {', '.join(sorted(missing))}")
+    embedding_type = batch.schema.field("embedding").type
+    dimension = schema.field("embedding").type.list_size
+    if not pa.types.is_fixed_size_list(embedding_type) or embedding_type.list_size != dimension:
+        raise InvalidVectorStoreSnapshotError(f"Snapshot embeddings must match vector store dimension: {dimension}")
+    batch = batch.select(schema.names).cast(schema)
+    required = [batch.column(name) for name in schema.names if name != "metadata"]
+    if any(column.null_count for column in required) or batch.column("embedding").flatten().null_count:
+        raise InvalidVectorStoreSnapshotError("Only the metadata column of a snapshot can contain null values")
+    try:
+        for item_id in batch.column("id").to_pylist():
+            UUID(item_id)
+    except ValueError as e:
+        raise InvalidVectorStoreSnapshotError(f"Invalid snapshot item id {item_id!r}: ids must be UUIDs") from e
+    if batch.num_rows and pc.max(pc.utf8_length(batch.column("document_id"))).as_py() > MAX_DOCUMENT_ID_LENGTH:
+        raise InvalidVectorStoreSnapshotError(
+            f"Snapshot document ids must be at most {MAX_DOCUMENT_ID_LENGTH} characters long"
+        )
+    try:
+        for metadata in batch.column("metadata").to_pylist():
+            if metadata is not None:
+                _metadata_adapter.validate_python(dict(metadata))
+    except ValidationError as e:
+        raise InvalidVectorStoreSnapshotError(f"Invalid snapshot metadata: {e}") from e
+    return batch
@@ -1,53 +1,165 @@
 # Copyright 2025 © BeeAI a Series of LF Projects, LLC
 # SPDX-License-Identifier: Apache-2.0
 
+import base64
+import csv
+import hashlib
+import io
 import json
 from collections import defaultdict
-from collections.abc import Iterable, Sequence
+from collections.abc import AsyncIterator, Collection, Iterable, Sequence
 from uuid import UUID
 
-from pgvector.sqlalchemy import HALFVEC
+import asyncpg
+import numpy as np
+import pyarrow as pa
+from pgvector.sqlalchemy import BIT, HALFVEC
 from sqlalchemy import (
     Column,
+    Computed,
     ForeignKeyConstraint,
     Index,
+    Integer,
+    LargeBinary,
     MetaData,
     PrimaryKeyConstraint,
     Row,
     String,
     Table,
     Text,
+    any_,
+    bindparam,
+    cast,
+    column,
+    event,
+    func,
+    literal,
+    select,
+    text,
+    true,
+    values,
 )
-from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR, insert
 from sqlalchemy.dialects.postgresql import UUID as SQL_UUID
 from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.selectable import Select
 
-from beeai_server.domain.models.vector_store import VectorStoreDocumentInfo, VectorStoreItem, VectorStoreSearchResult
+from beeai_server.domain.models.vector_store import (
+    MAX_EF_SEARCH,
+    DocumentType,
+    EmbeddingFormat,
+    HnswIndexSettings,
+    VectorQuantization,
+    VectorStoreDocumentInfo,
+    VectorStoreDocumentReplaceResult,
+    VectorStoreItem,
+    VectorStoreItemField,
+    VectorStoreSearchItem,
+    VectorStoreSearchResult,
+)
 from beeai_server.domain.repositories.vector_store import IVectorDatabaseRepository
+from beeai_server.exceptions import DuplicateEntityError
 from beeai_server.infrastructure.persistence.repositories.vector_store import (
     vector_store_documents_table,
 )
+from beeai_server.infrastructure.vector_database.snapshot import snapshot_schema
+
+# Text search configuration used by the generated tsvector column, must be the same when building the tsquery
+TEXT_SEARCH_CONFIG = "english"
+
+DEFAULT_INDEX_SETTINGS = HnswIndexSettings()
+
+# Lower bound of hnsw.ef_search derived from the number of requested candidates (40 is the pgvector default)
+MIN_EF_SEARCH = 40
 
-# Common dimensions that we'll support
-# From MTEB leaderboard sorted unique dimensions up to 4000:
-# https://huggingface.co/spaces/mteb/leaderboard
-# len(SUPPORTED_DIMENSIONS) is the upper limit on the number of tables we'll create in the database
-SUPPORTED_DIMENSIONS = [64, 128, 256, 312, 384, 512, 768, 896, 1024, 1536, 1792, 2048, 2304, 2560, 3072, 3584, 4000]
+# Reciprocal rank fusion constant, 60 is the value used in the original paper (Cormack et al., 2009)
+RRF_K = 60
 
 
 metadata = MetaData()
 
+# Tables (including indexes) known to exist in the database, a table is only added once its creation was committed
+_created_tables: set[str] = set()
+
+
+def clear_created_tables_cache() -> None:
+    """Forget which tables exist, must be called when the collection tables are dropped outside of this module."""
+    _created_tables.clear()
+
+
+def _estimate_item_size(
+    *,
+    document_id: str,
+    text: str,
+    metadata: dict[str, str] | None,
+    dimension: int,
+    document_type: DocumentType = DocumentType.platform_file,
+    model_id: str = "platform",
+) -> int:
+    """Approximate size of a single item in bytes."""
+    return (
+        16  # UUID
+        + len(str(document_id).encode("utf-8"))
+        + len(document_type.encode("utf-8"))
+        + len(model_id.encode("utf-8"))
+        + len(text.encode("utf-8"))
+        + len(json.dumps(metadata).encode("utf-8"))
+        + dimension * 2
+    )
+
+
+def _content_hash(text: str, metadata: dict[str, str] | None, embedding: Sequence[float] | np.ndarray) -> bytes:
+    """Hash of the stored content of an item, the embedding is hashed in its stored (float16) precision."""
+    digest = hashlib.sha256(json.dumps([text, metadata], sort_keys=True).encode("utf-8"))
+    digest.update(np.asarray(embedding, dtype="<f2").tobytes())
+    return digest.digest()
+
 
 class VectorDatabaseRepository(IVectorDatabaseRepository):
-    def __init__(self, connection: AsyncConnection, schema_name: str):
+    def __init__(self, connection: AsyncConnection, schema_name: str, quantization_oversampling: int):
         self.connection = connection
         self.schema_name = schema_name
+        # Number of binary quantized candidates retrieved per requested result unless given by the search
+        self._quantization_oversampling = quantization_oversampling
+        self._pending_tables: set[str] = set()
 
-    def _get_table(self, dimension: int) -> Table:
-        table_name = f"collections_dim_{dimension}"
+    def _get_table(
+        self,
+        dimension: int,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ) -> Table:
+        # Binary quantized stores live in a separate table per dimension, indexed only by the (16x smaller) binary
+        # quantized HNSW index, so that they don't inflate the full precision HNSW index of the other stores
+        prefix = "collections_bq_dim" if quantization == VectorQuantization.binary else "collections_dim"
+        table_name = f"{prefix}_{dimension}"
+        # HNSW build parameters are set per index, stores with non-default settings get a separate table
+        index_settings = index_settings or DEFAULT_INDEX_SETTINGS
+        if index_settings != DEFAULT_INDEX_SETTINGS:
+            table_name = f"{table_name}_m{index_settings.m}_ef{index_settings.ef_construction}"
         table_name_with_schema = f"{self.schema_name}.{table_name}"
         if table_name_with_schema in metadata.tables:
             return metadata.tables[table_name_with_schema]
+
+        index_with = {"m": index_settings.m, "ef_construction": index_settings.ef_construction}
+        match quantization:
+            case VectorQuantization.none:
+                vector_index = Index(
+                    f"{table_name}_vector_index",
+                    "embedding",
+                    postgresql_using="hnsw",
+                    postgresql_with=index_with,
+                    postgresql_ops={"embedding": "halfvec_cosine_ops"},
+                )
+            case VectorQuantization.binary:
+                vector_index = Index(
+                    f"{table_name}_vector_index",
+                    cast(func.binary_quantize(column("embedding")), BIT(dimension)).label("embedding_bq"),
+                    postgresql_using="hnsw",
+                    postgresql_with=index_with,
+                    postgresql_ops={"embedding_bq": "bit_hamming_ops"},
+                )
         return Table(
             table_name,
             metadata,
@@ -66,45 +178,173 @@ class VectorDatabaseRepository(IVectorDatabaseRepository):
             Column("text", Text, nullable=False),
             Column("embedding", HALFVEC(dimension), nullable=False),
             Column("metadata", JSONB, nullable=True),
-            Index(
-                f"{table_name}_vector_index",
-                "embedding",
-                postgresql_using="hnsw",
-                postgresql_with={"m": 16, "ef_construction": 64},
-                postgresql_ops={"embedding": "halfvec_l2_ops"},
-            ),
+            # Hash of text, metadata and embedding used to skip unchanged items when a document is replaced
+            Column("content_hash", LargeBinary, nullable=True),
+            Column("text_search", TSVECTOR, Computed(f"to_tsvector('{TEXT_SEARCH_CONFIG}', text)", persisted=True)),
+            vector_index,
             Index(f"{table_name}_vector_store_id_index", "vector_store_id", "vector_store_document_id"),
+            Index(f"{table_name}_text_search_index", "text_search", postgresql_using="gin"),
             schema=self.schema_name,
+            info={"dimension": dimension, "quantization": quantization, "index_settings": index_settings},
+        )
+
+    def _get_item_columns(self, table: Table, include: Collection[VectorStoreItemField] | None = None) -> list[Column]:
+        # Only select the requested fields, the embedding is by far the largest part of each row.
+        # text_search is derived from the text column and only used for filtering, it is never sent over the wire
+        include = set(VectorStoreItemField) if include is None else set(include)
+        return [
+            table.c.id,
+            table.c.vector_store_id,
+            table.c.vector_store_document_id,
+            *(table.c[field] for field in sorted(include)),
+        ]
+
+    def _filter_collection(self, table: Table, collection_id: UUID | Collection[UUID]) -> ColumnElement:
+        if isinstance(collection_id, UUID):
+            return table.c.vector_store_id == collection_id
+        # A single array parameter keeps the statement (and its cached plan) the same for any number of collections
+        return table.c.vector_store_id == any_(bindparam(None, list(collection_id), type_=ARRAY(SQL_UUID)))
+
+    def _get_query_vector(self, table: Table, query_vector: Sequence[float] | ColumnElement) -> ColumnElement:
+        dimension = table.info["dimension"]
+        if not isinstance(query_vector, ColumnElement):
+            query_vector = bindparam(None, query_vector, type_=HALFVEC(dimension))
+        return cast(query_vector, HALFVEC(dimension))
+
+    def _nearest(
+        self,
+        table: Table,
+        collection_id: UUID | Collection[UUID],
+        query_vector: Sequence[float] | ColumnElement,
+        limit: int,
+        include: Collection[VectorStoreItemField] | None = None,
+        oversampling: int | None = None,
+    ) -> Select:
+        """
+        Build a query returning the nearest items (item columns and cosine distance), ordered by distance.
+
+        For binary quantized tables, the candidates are first retrieved using the hamming distance of the quantized
+        vectors (limit * oversampling candidates) and then re-ranked by the exact distance of the stored embeddings.
+        """
+        query_vector = self._get_query_vector(table, query_vector)
+        columns = self._get_item_columns(table, include)
+
+        if table.info["quantization"] == VectorQuantization.none:
+            distance = table.c.embedding.cosine_distance(query_vector)
+            return (
+                select(*columns, distance.label("distance"))
+                .where(self._filter_collection(table, collection_id))
+                .order_by(distance)
+                .limit(limit)
+            )
+
+        # The expression must be exactly the same as in the index definition for the index to be used
+        dimension = table.info["dimension"]
+        hamming_distance = cast(func.binary_quantize(table.c.embedding), BIT(dimension)).hamming_distance(
+            cast(func.binary_quantize(query_vector), BIT(dimension))
         )
+        if "embedding" not in {col.name for col in columns}:
+            columns = [*columns, table.c.embedding]
+        candidates = (
+            select(*columns)
+            .where(self._filter_collection(table, collection_id))
+            .order_by(hamming_distance)
+            .limit(limit * (oversampling or self._quantization_oversampling))
+            .subquery("candidates")
+        )
+        distance = candidates.c.embedding.cosine_distance(query_vector)
+        return (
+            select(
+                *(candidates.c[col.name] for col in self._get_item_columns(table, include)), distance.label("distance")
+            )
+            .order_by(distance)
+            .limit(limit)
+        )
+
+    async def _set_ef_search(
+        self, table: Table, limit: int, oversampling: int | None = None, ef_search: int | None = None
+    ) -> None:
+        """
+        Set the size of the HNSW candidate list for the rest of the transaction.
+
+        The index scan returns at most ef_search rows, which are filtered by vector store afterwards. Unless given
+        explicitly, ef_search is derived from the number of candidates the query needs, so that large limits (and
+        oversampled binary quantized searches) are not silently truncated by the session default.
+        """
+        if ef_search is None:
+            candidates = limit
+            if table.info["quantization"] == VectorQuantization.binary:
+                candidates *= oversampling or self._quantization_oversampling
+            ef_search = min(max(MIN_EF_SEARCH, 2 * candidates), MAX_EF_SEARCH)
+        await self.connection.execute(select(func.set_config("hnsw.ef_search", str(ef_search), true())))
+
+    def _on_commit(self, _connection) -> None:
+        _created_tables.update(self._pending_tables)
+        self._pending_tables.clear()
 
-    def _get_supported_dimension(self, dimension: int) -> int:
-        new_dimension = SUPPORTED_DIMENSIONS[0]
-        for supported_dim in SUPPORTED_DIMENSIONS:
-            if supported_dim > dimension:
-                break
-            new_dimension = supported_dim
-        return new_dimension
+    def _on_rollback(self, _connection) -> None:
+        self._pending_tables.clear()
 
-    async def create_collection(self, collection_id: UUID, dimension: int):
-        supported_dimension = self._get_supported_dimension(dimension)
-        table = self._get_table(supported_dimension)
+    async def _create_table(self, table: Table) -> None:
+        """Create the table and its indexes unless they are already known to exist."""
+        if table.fullname in _created_tables or table.fullname in self._pending_tables:
+            return
         await self.connection.run_sync(table.create, checkfirst=True)
+        # DDL is transactional, the table must not be cached until the transaction creating it is committed
+        sync_connection = self.connection.sync_connection
+        if not event.contains(sync_connection, "commit", self._on_commit):
+            event.listen(sync_connection, "commit", self._on_commit)
+            event.listen(sync_connection, "rollback", self._on_rollback)
+        self._pending_tables.add(table.fullname)
+
+    async def create_collection(
+        self,
+        collection_id: UUID,
+        dimension: int,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ):
+        await self._create_table(self._get_table(dimension, quantization, index_settings))
+
+    async def delete_collection(
+        self,
+        collection_id: UUID | Collection[UUID],
+        dimension: int,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ) -> int:
+        """Delete all items of the collection(s), returns the number of deleted items."""
+        table = self._get_table(dimension, quantization, index_settings)
+        result = await self.connection.execute(table.delete().where(self._filter_collection(table, collection_id)))
+        return result.rowcount
+
+    async def vacuum_collections(
+        self,
+        dimension: int,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ) -> None:
+        """
+        Reclaim the space of deleted items and rebuild the vector index without blocking reads and writes.
 
-    async def delete_collection(self, collection_id: UUID, dimension: int):
-        supported_dimension = self._get_supported_dimension(dimension)
-        table = self._get_table(supported_dimension)
-        await table.delete().where(table.c.vector_store_id == collection_id)
+        VACUUM and REINDEX CONCURRENTLY cannot run inside a transaction block, the transaction must be committed first.
+        """
+        table = self._get_table(dimension, quantization, index_settings)
+        if self.connection.in_transaction():
+            raise RuntimeError("Collections can only be vacuumed outside of a transaction")
+        connection = await self.connection.execution_options(isolation_level="AUTOCOMMIT")
+        await connection.execute(text(f"VACUUM (ANALYZE) {table.fullname}"))
+        await connection.execute(text(f"REINDEX INDEX CONCURRENTLY {self.schema_name}.{table.name}_vector_index"))
 
     def _get_item_size(self, item: VectorStoreItem) -> int:
         """Approximate size of a single item in bytes."""
-        return (
-            len(item.id.bytes)
-            + len(str(item.document_id).encode("utf-8"))
-            + len(item.document_type.encode("utf-8"))
-            + len(item.model_id.encode("utf-8"))
-            + len(item.text.encode("utf-8"))
-            + len(json.dumps(item.metadata).encode("utf-8"))
-            + len(item.embedding) * 2
+        return _estimate_item_size(
+            document_id=item.document_id,
+            text=item.text,
+            metadata=item.metadata,
+            dimension=len(item.embedding),
+            document_type=item.document_type,
+            model_id=item.model_id,
         )
 
     def estimate_size(self, items: Sequence[VectorStoreItem]) -> list[VectorStoreDocumentInfo]:
@@ -113,12 +353,19 @@ class VectorDatabaseRepository(IVectorDatabaseRepository):
             inserted_sizes[item.document_id] += self._get_item_size(item)
         return [VectorStoreDocumentInfo(id=key, usage_bytes=value) for key, value in inserted_sizes.items()]
 
-    async def add_items(self, collection_id: UUID, items: Sequence[VectorStoreItem]) -> None:
+    async def add_items(
+        self,
+        collection_id: UUID,
+        items: Sequence[VectorStoreItem],
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ) -> None:
         if not items:
             return
         dimension = len(items[0].embedding)
-        supported_dimension = self._get_supported_dimension(dimension)
-        table = self._get_table(supported_dimension)
+        table = self._get_table(dimension, quantization, index_settings)
+        # Vector stores created before tables were kept per exact dimension might not have their table yet
+        await self._create_table(table)
 
         query = insert(table).values(
             [
@@ -129,55 +376,408 @@ class VectorDatabaseRepository(IVectorDatabaseRepository):
                     "embedding": item.embedding,
                     "text": item.text,
                     "metadata": item.metadata,
+                    "content_hash": _content_hash(item.text, item.metadata, item.embedding),
                 }
                 for item in items
             ]
         )
         await self.connection.execute(query)
 
-    async def delete_documents(self, collection_id: UUID, dimension: int, vector_store_document_ids: Iterable[str]):
-        supported_dimension = self._get_supported_dimension(dimension)
-        table = self._get_table(supported_dimension)
+    async def replace_document_items(
+        self,
+        collection_id: UUID,
+        document_id: str,
+        items: Sequence[VectorStoreItem],
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ) -> VectorStoreDocumentReplaceResult:
+        """
+        Replace all items of a document, only new and changed items (by ID and content hash) are written.
+
+        Items of the document missing from items are deleted.
+        """
+        if not items:
+            raise ValueError("At least one item is required to replace a document")
+        table = self._get_table(len(items[0].embedding), quantization, index_settings)
+        await self._create_table(table)
+
+        query = select(table.c.id, table.c.content_hash).where(
+            (table.c.vector_store_id == collection_id) & (table.c.vector_store_document_id == document_id)
+        )
+        stored_hashes = {row.id: row.content_hash for row in (await self.connection.execute(query)).fetchall()}
+        changed_items = [
+            item
+            for item in items
+            # Items stored before content hashes were introduced have no hash and are always rewritten
+            if (stored_hash := stored_hashes.get(item.id)) is None
+            or stored_hash != _content_hash(item.text, item.metadata, item.embedding)
+        ]
+        stale_ids = stored_hashes.keys() - {item.id for item in items}
+        updated_ids = {item.id for item in changed_items} & stored_hashes.keys()
+        if stale_ids or updated_ids:
+            await self.connection.execute(
+                table.delete().where(
+                    (table.c.vector_store_id == collection_id)
+                    & (table.c.id == any_(bindparam(None, list(stale_ids | updated_ids), type_=ARRAY(SQL_UUID))))
+                )
+            )
+        await self.add_items(
+            collection_id=collection_id, items=changed_items, quantization=quantization, index_settings=index_settings
+        )
+        return VectorStoreDocumentReplaceResult(
+            inserted=len(changed_items) - len(updated_ids),
+            updated=len(updated_ids),
+            deleted=len(stale_ids),
+            unchanged=len(items) - len(changed_items),
+        )
+
+    async def delete_documents(
+        self,
+        collection_id: UUID,
+        dimension: int,
+        vector_store_document_ids: Iterable[str],
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ):
+        table = self._get_table(dimension, quantization, index_settings)
         query = table.delete().where(
             (table.c.vector_store_id == collection_id)
             & (table.c.vector_store_document_id.in_(vector_store_document_ids))
         )
         return await self.connection.execute(query)
 
-    def _to_item(self, row: Row) -> VectorStoreItem:
-        return VectorStoreItem(
+    def _to_item(self, row: Row, embedding_format: EmbeddingFormat = EmbeddingFormat.float) -> VectorStoreSearchItem:
+        embedding = row._mapping.get("embedding")
+        if embedding is not None:
+            match embedding_format:
+                case EmbeddingFormat.float:
+                    embedding = embedding.to_list()
+                case EmbeddingFormat.base64:
+                    embedding = base64.b64encode(embedding.to_numpy().astype("<f2").tobytes()).decode("ascii")
+        return VectorStoreSearchItem(
             id=row.id,
+            vector_store_id=row.vector_store_id,
             document_id=row.vector_store_document_id,
-            embedding=row.embedding.to_list(),
-            text=row.text,
-            metadata=row.metadata,
+            embedding=embedding,
+            text=row._mapping.get("text"),
+            metadata=row._mapping.get("metadata"),
         )
 
-    def _to_search_result(self, row: Row) -> VectorStoreSearchResult:
+    def _to_search_result(
+        self, row: Row, embedding_format: EmbeddingFormat = EmbeddingFormat.float
+    ) -> VectorStoreSearchResult:
         """Convert a database row to a VectorStoreSearchResult with score."""
-        item = self._to_item(row)
+        item = self._to_item(row, embedding_format=embedding_format)
         # Convert cosine distance to similarity score (1 - distance)
         score = 1.0 - row.distance
         return VectorStoreSearchResult(item=item, score=score)
 
+    def _to_hybrid_search_result(
+        self, row: Row, embedding_format: EmbeddingFormat = EmbeddingFormat.float
+    ) -> VectorStoreSearchResult:
+        return VectorStoreSearchResult(
+            item=self._to_item(row, embedding_format=embedding_format), score=float(row.score)
+        )
+
     async def similarity_search(
         self,
         collection_id: UUID,
         query_vector: Sequence[float],
         limit: int = 10,
+        include: Collection[VectorStoreItemField] | None = None,
+        embedding_format: EmbeddingFormat = EmbeddingFormat.float,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+        oversampling: int | None = None,
+        ef_search: int | None = None,
+    ) -> Iterable[VectorStoreSearchResult]:
+        dimension = len(query_vector)
+        table = self._get_table(dimension, quantization, index_settings)
+
+        await self._set_ef_search(table, limit, oversampling=oversampling, ef_search=ef_search)
+        query = self._nearest(table, collection_id, query_vector, limit, include=include, oversampling=oversampling)
+        rows = await self.connection.execute(query)
+        return [self._to_search_result(row, embedding_format=embedding_format) for row in rows.fetchall()]
+
+    async def exact_search(
+        self,
+        collection_id: UUID,
+        query_vector: Sequence[float],
+        limit: int = 10,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
     ) -> Iterable[VectorStoreSearchResult]:
+        """Brute force search ignoring the vector indexes, used as a ground truth to measure recall."""
         dimension = len(query_vector)
-        supported_dimension = self._get_supported_dimension(dimension)
-        table = self._get_table(supported_dimension)
+        table = self._get_table(dimension, quantization, index_settings)
 
-        # Select all columns plus the distance as a named column
+        await self.connection.execute(text("SET LOCAL enable_indexscan = off"))
+        distance = table.c.embedding.cosine_distance(self._get_query_vector(table, query_vector))
         query = (
-            table.select()
-            .add_columns(table.c.embedding.cosine_distance(query_vector).label("distance"))
+            select(*self._get_item_columns(table, include=[]), distance.label("distance"))
             .where(table.c.vector_store_id == collection_id)
-            .order_by(table.c.embedding.cosine_distance(query_vector))
+            .order_by(distance)
             .limit(limit)
         )
+        try:
+            rows = await self.connection.execute(query)
+            return [self._to_search_result(row) for row in rows.fetchall()]
+        finally:
+            await self.connection.execute(text("SET LOCAL enable_indexscan TO DEFAULT"))
+
+    async def sample_embeddings(
+        self,
+        collection_id: UUID,
+        dimension: int,
+        sample_size: int,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ) -> list[list[float]]:
+        table = self._get_table(dimension, quantization, index_settings)
+        query = (
+            select(table.c.embedding)
+            .where(table.c.vector_store_id == collection_id)
+            .order_by(func.random())
+            .limit(sample_size)
+        )
+        rows = await self.connection.execute(query)
+        return [row.embedding.to_list() for row in rows.fetchall()]
+
+    async def load_items(
+        self,
+        collection_id: UUID,
+        dimension: int,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ) -> tuple[list[VectorStoreSearchItem], np.ndarray]:
+        """Load all items of a collection, the embeddings are returned separately as a single float32 matrix."""
+        table = self._get_table(dimension, quantization, index_settings)
+        query = select(*self._get_item_columns(table)).where(table.c.vector_store_id == collection_id)
+        rows = (await self.connection.execute(query)).fetchall()
+        embeddings = np.empty((len(rows), dimension), dtype=np.float32)
+        for i, row in enumerate(rows):
+            embeddings[i] = row.embedding.to_numpy()
+        items = [
+            VectorStoreSearchItem(
+                id=row.id,
+                vector_store_id=row.vector_store_id,
+                document_id=row.vector_store_document_id,
+                text=row.text,
+                metadata=row.metadata,
+            )
+            for row in rows
+        ]
+        return items, embeddings
+
+    async def export_items(
+        self,
+        collection_id: UUID,
+        dimension: int,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[pa.RecordBatch]:
+        """Stream all items of a collection as record batches of the snapshot schema using a server-side cursor."""
+        table = self._get_table(dimension, quantization, index_settings)
+        schema = snapshot_schema(dimension)
+        query = (
+            select(*self._get_item_columns(table))
+            .where(table.c.vector_store_id == collection_id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.connection.stream(query)
+        async for rows in result.partitions():
+            embeddings = np.array([row.embedding.to_numpy() for row in rows], dtype=np.float16)
+            yield pa.RecordBatch.from_arrays(
+                [
+                    pa.array([str(row.id) for row in rows], type=pa.string()),
+                    pa.array([row.vector_store_document_id for row in rows], type=pa.string()),
+                    pa.array([row.text for row in rows], type=pa.string()),
+                    pa.array([row.metadata for row in rows], type=schema.field("metadata").type),
+                    pa.FixedSizeListArray.from_arrays(pa.array(embeddings.reshape(-1)), dimension),
+                ],
+                schema=schema,
+            )
+
+    async def import_items(
+        self,
+        collection_id: UUID,
+        batch: pa.RecordBatch,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+    ) -> list[VectorStoreDocumentInfo]:
+        """Bulk load a record batch of the snapshot schema using COPY, returns the size of the items per document."""
+        dimension = batch.schema.field("embedding").type.list_size
+        table = self._get_table(dimension, quantization, index_settings)
+        await self._create_table(table)
 
+        inserted_sizes = defaultdict(int)
+        buffer = io.StringIO()
+        # Unlike empty strings, None is written unquoted and loaded as NULL
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NOTNULL)
+        embeddings = batch.column("embedding").flatten().to_numpy().reshape(-1, dimension)
+        for item_id, document_id, item_text, metadata, embedding in zip(
+            batch.column("id").to_pylist(),
+            batch.column("document_id").to_pylist(),
+            batch.column("text").to_pylist(),
+            batch.column("metadata").to_pylist(),
+            embeddings,
+            strict=True,
+        ):
+            metadata = None if metadata is None else dict(metadata)
+            inserted_sizes[document_id] += _estimate_item_size(
+                document_id=document_id, text=item_text, metadata=metadata, dimension=dimension
+            )
+            writer.writerow(
+                [
+                    item_id,
+                    collection_id,
+                    document_id,
+                    item_text,
+                    None if metadata is None else json.dumps(metadata),
+                    f"[{','.join(map(str, embedding.tolist()))}]",
+                    f"\\x{_content_hash(item_text, metadata, embedding).hex()}",
+                ]
+            )
+
+        # COPY bypasses SQLAlchemy, it runs in the transaction opened by the statements preceding the import
+        raw_connection = await self.connection.get_raw_connection()
+        try:
+            await raw_connection.driver_connection.copy_to_table(
+                table.name,
+                schema_name=self.schema_name,
+                columns=[
+                    "id",
+                    "vector_store_id",
+                    "vector_store_document_id",
+                    "text",
+                    "metadata",
+                    "embedding",
+                    "content_hash",
+                ],
+                source=io.BytesIO(buffer.getvalue().encode("utf-8")),
+                format="csv",
+            )
+        except asyncpg.UniqueViolationError as e:
+            raise DuplicateEntityError(entity="vector_store_item", field="id") from e
+        return [VectorStoreDocumentInfo(id=key, usage_bytes=value) for key, value in inserted_sizes.items()]
+
+    async def federated_search(
+        self,
+        collection_ids: Collection[UUID],
+        query_vector: Sequence[float],
+        limit: int = 10,
+        include: Collection[VectorStoreItemField] | None = None,
+        embedding_format: EmbeddingFormat = EmbeddingFormat.float,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+        oversampling: int | None = None,
+        ef_search: int | None = None,
+    ) -> Iterable[VectorStoreSearchResult]:
+        """Search multiple collections of the same dimension at once, returning the global top-k."""
+        table = self._get_table(len(query_vector), quantization, index_settings)
+        await self._set_ef_search(table, limit, oversampling=oversampling, ef_search=ef_search)
+        query = self._nearest(table, collection_ids, query_vector, limit, include=include, oversampling=oversampling)
+        rows = await self.connection.execute(query)
+        return [self._to_search_result(row, embedding_format=embedding_format) for row in rows.fetchall()]
+
+    async def batch_similarity_search(
+        self,
+        collection_id: UUID,
+        query_vectors: Sequence[Sequence[float]],
+        limit: int = 10,
+        include: Collection[VectorStoreItemField] | None = None,
+        embedding_format: EmbeddingFormat = EmbeddingFormat.float,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+        oversampling: int | None = None,
+        ef_search: int | None = None,
+    ) -> list[list[VectorStoreSearchResult]]:
+        """Run multiple similarity searches in a single statement using a LATERAL join over the query vectors."""
+        if not query_vectors:
+            return []
+        dimension = len(query_vectors[0])
+        table = self._get_table(dimension, quantization, index_settings)
+
+        await self._set_ef_search(table, limit, oversampling=oversampling, ef_search=ef_search)
+        queries = values(
+            column("query_index", Integer), column("query_vector", HALFVEC(dimension)), name="queries"
+        ).data(list(enumerate(query_vectors)))
+        hits = self._nearest(
+            table, collection_id, queries.c.query_vector, limit, include=include, oversampling=oversampling
+        ).lateral("hits")
+        query = (
+            select(queries.c.query_index, hits)
+            .select_from(queries.join(hits, true()))
+            .order_by(queries.c.query_index, hits.c.distance)
+        )
+
+        results: list[list[VectorStoreSearchResult]] = [[] for _ in query_vectors]
+        rows = await self.connection.execute(query)
+        for row in rows.fetchall():
+            results[row.query_index].append(self._to_search_result(row, embedding_format=embedding_format))
+        return results
+
+    async def hybrid_search(
+        self,
+        collection_id: UUID,
+        query_vector: Sequence[float],
+        query_text: str,
+        limit: int = 10,
+        candidate_limit: int | None = None,
+        include: Collection[VectorStoreItemField] | None = None,
+        embedding_format: EmbeddingFormat = EmbeddingFormat.float,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+        oversampling: int | None = None,
+        ef_search: int | None = None,
+    ) -> Iterable[VectorStoreSearchResult]:
+        """
+        Combine vector similarity and full-text candidates using reciprocal rank fusion.
+
+        Both candidate lists are ranked and fused in a single statement, the resulting score is the RRF score
+        (sum of 1 / (RRF_K + rank) over the lists in which the item appears), not the cosine similarity.
+        """
+        dimension = len(query_vector)
+        table = self._get_table(dimension, quantization, index_settings)
+        candidate_limit = candidate_limit or max(limit * 4, 20)
+        await self._set_ef_search(table, candidate_limit, oversampling=oversampling, ef_search=ef_search)
+
+        vector_hits = self._nearest(
+            table, collection_id, query_vector, candidate_limit, include=[], oversampling=oversampling
+        ).subquery()
+        vector_ranked = select(
+            vector_hits.c.id, func.row_number().over(order_by=vector_hits.c.distance).label("rank")
+        ).cte("vector_ranked")
+
+        ts_query = func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, query_text)
+        text_rank = func.ts_rank_cd(table.c.text_search, ts_query)
+        text_hits = (
+            select(table.c.id, text_rank.label("text_rank"))
+            .where((table.c.vector_store_id == collection_id) & table.c.text_search.bool_op("@@")(ts_query))
+            .order_by(text_rank.desc())
+            .limit(candidate_limit)
+            .subquery()
+        )
+        text_ranked = select(
+            text_hits.c.id, func.row_number().over(order_by=text_hits.c.text_rank.desc()).label("rank")
+        ).cte("text_ranked")
+
+        rrf_score = func.coalesce(literal(1.0) / (RRF_K + vector_ranked.c.rank), 0) + func.coalesce(
+            literal(1.0) / (RRF_K + text_ranked.c.rank), 0
+        )
+        fused = (
+            select(func.coalesce(vector_ranked.c.id, text_ranked.c.id).label("id"), rrf_score.label("score"))
+            .select_from(vector_ranked.join(text_ranked, vector_ranked.c.id == text_ranked.c.id, full=True))
+            .order_by(rrf_score.desc())
+            .limit(limit)
+            .subquery()
+        )
+
+        query = (
+            select(*self._get_item_columns(table, include), fused.c.score)
+            .join(fused, (table.c.id == fused.c.id) & (table.c.vector_store_id == collection_id))
+            .order_by(fused.c.score.desc())
+        )
         rows = await self.connection.execute(query)
-        return [self._to_search_result(row) for row in rows.fetchall()]
+        return [self._to_hybrid_search_result(row, embedding_format=embedding_format) for row in rows.fetchall()]
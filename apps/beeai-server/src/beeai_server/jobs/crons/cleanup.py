@@ -2,31 +2,40 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import logging
-from datetime import timedelta
 
 from kink import inject
+from opentelemetry.metrics import get_meter
 from procrastinate import Blueprint, JobContext, builtin_tasks
 
-from beeai_server.configuration import Configuration
-from beeai_server.service_layer.unit_of_work import IUnitOfWorkFactory
+from beeai_server.service_layer.services.vector_stores import VectorStoreService
+from beeai_server.telemetry import INSTRUMENTATION_NAME
 
 blueprint = Blueprint()
 
 logger = logging.getLogger(__name__)
 
+meter = get_meter(INSTRUMENTATION_NAME)
+expired_rows_counter = meter.create_counter(
+    "vector_store_expired_rows", description="Rows deleted together with expired vector stores"
+)
+reclaimed_bytes_counter = meter.create_counter(
+    "vector_store_expired_bytes", unit="By", description="Storage usage of deleted expired vector stores"
+)
+
 
 @blueprint.periodic(cron="5 * * * *")
 @blueprint.task(queueing_lock="cleanup_expired_vector_stores", queue="cron:cleanup")
 @inject
-async def cleanup_expired_vector_stores(configuration: Configuration, uow: IUnitOfWorkFactory, timestamp: int) -> None:
+async def cleanup_expired_vector_stores(service: VectorStoreService, timestamp: int) -> None:
     """Delete vector stores that haven't been accessed for a specified number of days."""
-    async with uow() as uow:
-        deleted_count = await uow.vector_stores.delete_expired(
-            active_threshold=timedelta(days=configuration.vector_stores.expire_after_days)
-        )
-        # Records in vector_database are deleted automatically by CASCADE operations in postgres
-        await uow.commit()
-    logger.info(f"Deleted {deleted_count} expired vector stores")
+    report = await service.delete_expired()
+    for row_type in ("vector_stores", "documents", "items"):
+        expired_rows_counter.add(getattr(report, row_type), {"type": row_type})
+    reclaimed_bytes_counter.add(report.usage_bytes)
+    logger.info(
+        f"Deleted {report.vector_stores} expired vector stores ({report.documents} documents, {report.items} items, "
+        f"{report.usage_bytes} bytes) in {report.batches} batches, vacuumed {report.vacuumed_tables} tables"
+    )
 
 
 @blueprint.periodic(cron="*/10 * * * *")
@@ -0,0 +1,23 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+import logging
+
+from kink import inject
+from procrastinate import Blueprint
+
+from beeai_server.service_layer.services.vector_stores import VectorStoreService
+
+blueprint = Blueprint()
+
+logger = logging.getLogger(__name__)
+
+
+@blueprint.periodic(cron="30 * * * *")
+@blueprint.task(queueing_lock="reconcile_vector_store_stats", queue="cron:vector_store")
+@inject
+async def reconcile_vector_store_stats(timestamp: int, service: VectorStoreService) -> None:
+    """Fix any drift of the incrementally maintained vector store statistics."""
+    corrected_count = await service.reconcile_stats()
+    if corrected_count:
+        logger.warning(f"Corrected statistics of {corrected_count} vector stores")
@@ -9,6 +9,7 @@ from kink import inject
 from beeai_server.configuration import Configuration
 from beeai_server.jobs.crons.cleanup import blueprint as cleanup_crons
 from beeai_server.jobs.crons.provider import blueprint as provider_crons
+from beeai_server.jobs.crons.vector_store import blueprint as vector_store_crons
 from beeai_server.jobs.tasks.file import blueprint as file_tasks
 
 logger = logging.getLogger(__name__)
@@ -39,4 +40,5 @@ def create_app(configuration: Configuration) -> procrastinate.App:
     app.add_tasks_from(blueprint=file_tasks, namespace="text_extraction")
     app.add_tasks_from(blueprint=provider_crons, namespace="cron_provider")
     app.add_tasks_from(blueprint=cleanup_crons, namespace="cron_cleanup")
+    app.add_tasks_from(blueprint=vector_store_crons, namespace="cron_vector_store")
     return app
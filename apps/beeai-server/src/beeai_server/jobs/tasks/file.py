@@ -10,6 +10,9 @@ from beeai_server.service_layer.services.files import FileService
 
 blueprint = Blueprint()
 
+# Text of simple formats is extracted by the builtin backend, it is deferred to this queue instead of "text_extraction"
+BUILTIN_TEXT_EXTRACTION_QUEUE = "builtin_text_extraction"
+
 
 @blueprint.task(queue="text_extraction", pass_context=True)
 @inject
@@ -8,26 +8,44 @@ from contextlib import asynccontextmanager
 import procrastinate
 from kink import inject
 
+from beeai_server.configuration import Configuration
+from beeai_server.jobs.tasks.file import BUILTIN_TEXT_EXTRACTION_QUEUE
+
 logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 @inject
-async def run_workers(app: procrastinate.App):
-    worker = asyncio.create_task(
-        app.run_worker_async(
-            install_signal_handlers=False,
-            concurrency=10,  # TODO finetune per-queue concurrency
-        )
-    )
+async def run_workers(app: procrastinate.App, configuration: Configuration):
+    # Simple formats are extracted by a separate worker so that they do not wait behind long docling extractions
+    queues = {task.queue for task in app.tasks.values()} - {BUILTIN_TEXT_EXTRACTION_QUEUE}
+    workers = [
+        asyncio.create_task(
+            app.run_worker_async(
+                name="worker",
+                queues=sorted(queues),
+                install_signal_handlers=False,
+                concurrency=10,  # TODO finetune per-queue concurrency
+            )
+        ),
+        asyncio.create_task(
+            app.run_worker_async(
+                name="builtin-text-extraction-worker",
+                queues=[BUILTIN_TEXT_EXTRACTION_QUEUE],
+                install_signal_handlers=False,
+                concurrency=configuration.builtin_text_extraction.max_processes,
+            )
+        ),
+    ]
     logger.info(f"Starting procrastinate workers for tasks: {app.tasks.keys()}")
     try:
         yield
     finally:
         logger.info("Stopping procrastinate workers")
-        worker.cancel()
+        for worker in workers:
+            worker.cancel()
         try:
-            await asyncio.wait_for(worker, timeout=10)
+            await asyncio.wait_for(asyncio.gather(*workers), timeout=10)
         except TimeoutError:
             logger.info("Procrastinate workers did not terminate gracefully")
         except asyncio.CancelledError:
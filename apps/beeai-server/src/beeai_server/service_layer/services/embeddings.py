@@ -0,0 +1,120 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+import logging
+from typing import Literal
+
+import ibm_watsonx_ai
+import ibm_watsonx_ai.foundation_models.embeddings
+import openai
+import openai.types
+import pydantic
+from cachetools import LRUCache, TTLCache
+from fastapi.concurrency import run_in_threadpool
+from kink import inject
+
+from beeai_server.configuration import Configuration
+from beeai_server.service_layer.unit_of_work import IUnitOfWorkFactory
+
+logger = logging.getLogger(__name__)
+
+
+@inject
+class EmbeddingService:
+    """Creates embeddings using the embedding backend configured in the platform environment."""
+
+    def __init__(self, uow: IUnitOfWorkFactory, configuration: Configuration):
+        self._uow = uow
+        # Keyed by (backend url, model, text), agents tend to repeat the same queries
+        self._query_embedding_cache: LRUCache[tuple[str, str, str], list[float]] = LRUCache(
+            maxsize=configuration.vector_stores.query_embedding_cache_size
+        )
+        # Platform env used for search queries, so that cached queries are answered without a database round trip
+        self._query_env_cache: TTLCache[str, dict[str, str]] = TTLCache(
+            maxsize=1, ttl=configuration.vector_stores.query_embedding_env_ttl_seconds
+        )
+
+    async def _get_env(self) -> dict[str, str]:
+        async with self._uow() as uow:
+            return await uow.env.get_all()
+
+    async def _get_query_env(self) -> dict[str, str]:
+        if (env := self._query_env_cache.get("env")) is None:
+            env = self._query_env_cache["env"] = await self._get_env()
+        return env
+
+    async def _create_embedding(
+        self,
+        env: dict[str, str],
+        *,
+        input: list[str] | str,
+        model: str | None = None,
+        encoding_format: Literal["float"] | None = None,
+    ) -> openai.types.CreateEmbeddingResponse:
+        backend_url = pydantic.HttpUrl(env["EMBEDDING_API_BASE"])
+        model = model or env["EMBEDDING_MODEL"]
+
+        if backend_url.host.endswith("api.voyageai.com"):
+            # Voyage does not support 'float' value: https://docs.voyageai.com/reference/embeddings-api
+            encoding_format = None if encoding_format == "float" else encoding_format
+
+        if backend_url.host.endswith(".ml.cloud.ibm.com"):
+            watsonx_response = await run_in_threadpool(
+                ibm_watsonx_ai.foundation_models.embeddings.Embeddings(
+                    model_id=model,
+                    credentials=ibm_watsonx_ai.Credentials(url=str(backend_url), api_key=env["EMBEDDING_API_KEY"]),
+                    project_id=env.get("WATSONX_PROJECT_ID"),
+                    space_id=env.get("WATSONX_SPACE_ID"),
+                ).generate,
+                inputs=[input] if isinstance(input, str) else input,
+            )
+            return openai.types.CreateEmbeddingResponse(
+                object="list",
+                model=watsonx_response["model_id"],
+                data=[
+                    openai.types.Embedding(
+                        object="embedding",
+                        index=i,
+                        embedding=result["embedding"],
+                    )
+                    for i, result in enumerate(watsonx_response.get("results", []))
+                ],
+                usage=openai.types.create_embedding_response.Usage(
+                    prompt_tokens=watsonx_response.get("usage", {}).get("prompt_tokens", 0),
+                    total_tokens=watsonx_response.get("usage", {}).get("total_tokens", 0),
+                ),
+            )
+        else:
+            return await openai.AsyncOpenAI(
+                api_key=env["EMBEDDING_API_KEY"],
+                base_url=str(backend_url),
+                default_headers=(
+                    {"RITS_API_KEY": env["EMBEDDING_API_KEY"]}
+                    if backend_url.host.endswith(".rits.fmaas.res.ibm.com")
+                    else {}
+                ),
+            ).embeddings.create(
+                input=input,
+                model=model,
+                **({"encoding_format": encoding_format} if encoding_format else {}),
+            )
+
+    async def create_embedding(
+        self, *, input: list[str] | str, encoding_format: Literal["float"] | None = None
+    ) -> openai.types.CreateEmbeddingResponse:
+        """Create embeddings using the model configured in the platform environment (EMBEDDING_MODEL)."""
+        return await self._create_embedding(await self._get_env(), input=input, encoding_format=encoding_format)
+
+    async def embed_query(self, text: str, *, model_id: str) -> list[float]:
+        """
+        Embed a search query using the given model, recently embedded queries are served from a cache.
+
+        The embedding backend settings are refreshed from the platform env at most every query_embedding_env_ttl_seconds.
+        """
+        env = await self._get_query_env()
+        key = (env["EMBEDDING_API_BASE"], model_id, text)
+        if (embedding := self._query_embedding_cache.get(key)) is None:
+            response = await self._create_embedding(env, input=[text], model=model_id, encoding_format="float")
+            embedding = response.data[0].embedding
+            self._query_embedding_cache[key] = embedding
+        return embedding
@@ -1,33 +1,53 @@
 # Copyright 2025 © BeeAI a Series of LF Projects, LLC
 # SPDX-License-Identifier: Apache-2.0
 
+import asyncio
+import hashlib
+import hmac
 import logging
+import time
 from asyncio import CancelledError
-from collections.abc import AsyncIterator, Awaitable, Callable
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
 from contextlib import asynccontextmanager, suppress
+from datetime import timedelta
 from typing import Annotated
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from kink import inject
+from pydantic import HttpUrl
 from typing_extensions import Doc
 
 from beeai_server.configuration import Configuration
 from beeai_server.domain.models.file import (
     AsyncFile,
+    CompletedUploadPart,
     ExtractionMetadata,
     ExtractionStatus,
     File,
+    FileMetadata,
     FileType,
+    FileUploadSession,
     TextExtraction,
+    TextExtractionEvent,
+    TextExtractionUpdate,
 )
 from beeai_server.domain.models.user import User
-from beeai_server.domain.repositories.file import IObjectStorageRepository, ITextExtractionBackend
+from beeai_server.domain.repositories.file import (
+    IBuiltinTextExtractionBackend,
+    IExtractionUpdateListener,
+    IObjectStorageRepository,
+    ITextExtractionBackend,
+)
 from beeai_server.exceptions import EntityNotFoundError, StorageCapacityExceededError
 from beeai_server.service_layer.services.users import UserService
-from beeai_server.service_layer.unit_of_work import IUnitOfWorkFactory
+from beeai_server.service_layer.unit_of_work import IUnitOfWork, IUnitOfWorkFactory
+from beeai_server.utils.utils import utc_now
 
 logger = logging.getLogger(__name__)
 
+EXTRACTION_PROGRESS_INTERVAL = timedelta(seconds=1)
+EXTRACTION_REFRESH_INTERVAL = timedelta(seconds=30)
+
 
 @inject
 class FileService:
@@ -35,6 +55,8 @@ class FileService:
         self,
         object_storage_repository: IObjectStorageRepository,
         extraction_backend: ITextExtractionBackend,
+        builtin_extraction_backend: IBuiltinTextExtractionBackend,
+        extraction_update_listener: IExtractionUpdateListener,
         uow: IUnitOfWorkFactory,
         user_service: UserService,
         configuration: Configuration,
@@ -44,7 +66,10 @@ class FileService:
         self._user_service = user_service
         self._storage_limit_per_user = configuration.object_storage.storage_limit_per_user_bytes
         self._storage_limit_per_file = configuration.object_storage.max_single_file_size
+        self._encryption_key = configuration.persistence.encryption_key
         self._extraction_backend = extraction_backend
+        self._builtin_extraction_backend = builtin_extraction_backend
+        self._extraction_update_listener = extraction_update_listener
 
     async def extract_text(self, file_id: UUID, job_id: str):
         error_log = []
@@ -57,16 +82,32 @@ class FileService:
             await uow.files.update_extraction(extraction=extraction)
             await uow.commit()
         try:
-            file_url = await self._object_storage.get_file_url(file_id=file_id)
-            error_log.append(f"file url: {file_url}")
-            async with self._extraction_backend.extract_text(file_url=file_url) as extracted_file:
-                extracted_db_file = await self.upload_file(
-                    file=extracted_file,
-                    user=user,
-                    file_type=FileType.extracted_text,
-                    parent_file_id=file_id,
-                )
-            extraction.set_completed(extracted_file_id=extracted_db_file.id)
+            file_metadata = await self._object_storage.get_file_metadata(file_id=file.object_id)
+            backend = self._extraction_backend_name(file_metadata)
+            if backend == self._builtin_extraction_backend.name:
+                async with (
+                    self._object_storage.get_file(file_id=file.object_id) as source,
+                    self._builtin_extraction_backend.extract_text(file=source) as extracted_file,
+                ):
+                    extracted_db_file = await self.upload_file(
+                        file=extracted_file, user=user, file_type=FileType.extracted_text, parent_file_id=file_id
+                    )
+            else:
+                file_url = await self._object_storage.get_file_url(file_id=file.object_id)
+                error_log.append(f"file url: {file_url}")
+                async with self._extraction_backend.extract_text(file_url=file_url) as extracted_file:
+                    extracted_db_file = await self.upload_file(
+                        file=extracted_file.model_copy(
+                            update={"read": self._report_extraction_progress(file_id, extracted_file.read)}
+                        ),
+                        user=user,
+                        file_type=FileType.extracted_text,
+                        parent_file_id=file_id,
+                    )
+            extraction.set_completed(
+                extracted_file_id=extracted_db_file.id,
+                metadata=ExtractionMetadata(backend=backend).model_dump(mode="json"),
+            )
             async with self._uow() as uow:
                 await uow.files.update_extraction(extraction=extraction)
                 await uow.commit()
@@ -84,6 +125,40 @@ class FileService:
                 await uow.commit()
             raise
 
+    def _is_builtin_extraction(self, file_metadata: FileMetadata) -> bool:
+        """Simple formats are extracted by the server itself, docling is used for everything else."""
+        return self._builtin_extraction_backend.supports(
+            content_type=file_metadata.content_type, size=file_metadata.content_length
+        )
+
+    def _extraction_backend_name(self, file_metadata: FileMetadata) -> str:
+        if self._is_builtin_extraction(file_metadata):
+            return self._builtin_extraction_backend.name
+        return self._extraction_backend.name
+
+    def _report_extraction_progress(
+        self, file_id: UUID, read: Callable[[int], Awaitable[bytes]]
+    ) -> Callable[[int], Awaitable[bytes]]:
+        """Notify the number of bytes of text extracted so far, at most once per EXTRACTION_PROGRESS_INTERVAL."""
+        progress_bytes = 0
+        last_notified_at = time.monotonic()
+
+        async def _read(size: int = -1) -> bytes:
+            nonlocal progress_bytes, last_notified_at
+            chunk = await read(size)
+            progress_bytes += len(chunk)
+            if chunk and time.monotonic() - last_notified_at >= EXTRACTION_PROGRESS_INTERVAL.total_seconds():
+                last_notified_at = time.monotonic()
+                try:
+                    async with self._uow() as uow:
+                        await uow.files.notify_extraction_progress(file_id=file_id, progress_bytes=progress_bytes)
+                        await uow.commit()
+                except Exception as ex:
+                    logger.warning(f"Failed to notify the progress of the extraction of file {file_id}: {ex}")
+            return chunk
+
+        return _read
+
     async def upload_file(
         self,
         *,
@@ -98,44 +173,182 @@ class FileService:
                 total_usage = await uow.files.total_usage(user_id=user.id)
                 file = file.model_copy()
                 max_size = min(self._storage_limit_per_user - total_usage, self._storage_limit_per_file)
-                file.read = limit_size_wrapper(read=file.read, max_size=max_size)
+                file.read = limit_size_wrapper(read=file.read, max_size=max_size, size=file.size)
 
-                db_file.file_size_bytes = await self._object_storage.upload_file(file_id=db_file.id, file=file)
+                uploaded = await self._object_storage.upload_file(file_id=db_file.id, file=file)
+                db_file.file_size_bytes, db_file.checksum_sha256 = uploaded.size, uploaded.checksum_sha256
+                # Files with the same content share the object uploaded first, the quota still counts every file
+                db_file.object_id = await uow.files.add_object_reference(
+                    object_id=db_file.id, checksum_sha256=uploaded.checksum_sha256, size=uploaded.size
+                )
                 await uow.files.create(file=db_file)
                 await uow.commit()
-                return db_file
         except Exception:
             # If the file was uploaded and then the commit failed, delete the file from the object storage.
             if db_file.file_size_bytes is not None:
                 with suppress(Exception):
                     await self._object_storage.delete_file(file_id=db_file.id)
             raise
+        if db_file.object_id != db_file.id:
+            await self._delete_objects(db_file.id)  # the content is already stored
+        return db_file
+
+    async def _release_objects(self, uow: IUnitOfWork, *files: File) -> list[UUID]:
+        """Release the objects of the deleted files, returns the objects which are no longer referenced."""
+        return [file.object_id for file in files if await uow.files.release_object(object_id=file.object_id)]
+
+    async def _delete_objects(self, *object_ids: UUID) -> None:
+        # Called after the commit, a failure leaves an orphaned object but the files are already deleted
+        for object_id in object_ids:
+            try:
+                await self._object_storage.delete_file(file_id=object_id)
+            except Exception as ex:
+                logger.warning(f"Failed to delete object {object_id}: {ex}")
+
+    async def create_upload_session(
+        self, *, filename: str, content_type: str, size: int, user: User
+    ) -> FileUploadSession:
+        """Start an upload of the file directly to the object storage, the file is created once it is completed."""
+        async with self._uow() as uow:
+            total_usage = await uow.files.total_usage(user_id=user.id)
+        if size > (max_size := min(self._storage_limit_per_user - total_usage, self._storage_limit_per_file)):
+            raise StorageCapacityExceededError("file", max_size)
+        session = await self._object_storage.create_upload(
+            file_id=uuid4(), filename=filename, content_type=content_type, size=size, created_by=user.id
+        )
+        if session.upload_id is not None:
+            signature = self._sign_upload(file_id=session.file_id, upload_id=session.upload_id, user=user)
+            session.upload_id = f"{session.upload_id}.{signature}"
+        return session
+
+    def _sign_upload(self, *, file_id: UUID, upload_id: str, user: User) -> str:
+        if not self._encryption_key:
+            raise RuntimeError("Missing encryption key in configuration.")
+        key = hmac.digest(self._encryption_key.get_secret_value().encode(), b"file-upload", hashlib.sha256)
+        return hmac.new(key, f"{file_id}:{upload_id}:{user.id}".encode(), hashlib.sha256).hexdigest()
+
+    def _verify_upload(self, *, file_id: UUID, upload_id: str, user: User) -> str:
+        """
+        Check that the multipart upload was started by the user, returns the upload ID of the object storage.
+
+        The metadata of a multipart upload cannot be read before it is completed, the upload ID handed out to the
+        client is signed instead.
+        """
+        storage_upload_id, _, signature = upload_id.rpartition(".")
+        expected_signature = self._sign_upload(file_id=file_id, upload_id=storage_upload_id, user=user)
+        if not storage_upload_id or not hmac.compare_digest(signature, expected_signature):
+            raise EntityNotFoundError(entity="file_upload", id=upload_id)
+        return storage_upload_id
+
+    async def complete_upload_session(
+        self,
+        *,
+        file_id: UUID,
+        upload_id: str | None = None,
+        parts: Sequence[CompletedUploadPart] = (),
+        user: User,
+    ) -> File:
+        """
+        Create the file of a completed direct upload, the quota is checked again using the actual size of the object.
+
+        Completing the same upload again returns the existing file.
+        """
+        async with self._uow() as uow:
+            with suppress(EntityNotFoundError):
+                return await uow.files.get(file_id=file_id, user_id=user.id)
+        if upload_id is not None:
+            upload_id = self._verify_upload(file_id=file_id, upload_id=upload_id, user=user)
+        metadata = await self._object_storage.complete_upload(file_id=file_id, upload_id=upload_id, parts=parts)
+        if metadata.created_by != user.id:
+            raise EntityNotFoundError(entity="file", id=file_id)
+
+        db_file = File(
+            id=file_id, filename=metadata.filename, file_size_bytes=metadata.content_length, created_by=user.id
+        )
+        try:
+            async with self._uow() as uow:
+                total_usage = await uow.files.total_usage(user_id=user.id)
+                max_size = min(self._storage_limit_per_user - total_usage, self._storage_limit_per_file)
+                if metadata.content_length > max_size:
+                    raise StorageCapacityExceededError("file", max_size)
+                await uow.files.create(file=db_file)
+                await uow.commit()
+                return db_file
+        except StorageCapacityExceededError:
+            await self._object_storage.delete_file(file_id=file_id)
+            raise
+
+    async def abort_upload_session(self, *, file_id: UUID, upload_id: str, user: User) -> None:
+        """Abort a multipart direct upload started by the user, single part uploads simply expire."""
+        upload_id = self._verify_upload(file_id=file_id, upload_id=upload_id, user=user)
+        await self._object_storage.abort_upload(file_id=file_id, upload_id=upload_id)
+
+    async def get_download_url(self, *, file_id: UUID, user: User) -> HttpUrl:
+        """Presigned URL to download the file content directly from the object storage."""
+        async with self._uow() as uow:
+            file = await uow.files.get(file_id=file_id, user_id=user.id)  # check if the user owns the file
+        return await self._object_storage.get_file_url(file_id=file.object_id, public=True)
 
     async def get(self, *, file_id: UUID, user: User) -> File:
         async with self._uow() as uow:
             return await uow.files.get(file_id=file_id, user_id=user.id)
 
     @asynccontextmanager
-    async def get_content(self, *, file_id: UUID, user: User) -> AsyncIterator[AsyncFile]:
+    async def get_content(
+        self, *, file_id: UUID, user: User, byte_range: tuple[int, int] | None = None
+    ) -> AsyncIterator[AsyncFile]:
         async with self._uow() as uow:
-            await uow.files.get(file_id=file_id, user_id=user.id)  # check if the user owns the file
-            async with self._object_storage.get_file(file_id=file_id) as file:
-                yield file
+            db_file = await uow.files.get(file_id=file_id, user_id=user.id)  # check if the user owns the file
+        # Do not hold the database connection while the content is streamed
+        async with self._object_storage.get_file(file_id=db_file.object_id, byte_range=byte_range) as file:
+            yield file
 
     async def get_extraction(self, *, file_id: UUID, user: User) -> TextExtraction:
         async with self._uow() as uow:
             return await uow.files.get_extraction_by_file_id(file_id=file_id, user_id=user.id)
 
+    async def watch_extraction(self, *, file_id: UUID, user: User) -> AsyncIterator[TextExtractionEvent]:
+        """
+        Stream the text extraction, then its changes and progress until it is finished.
+
+        The changes are pushed by the replica running the extraction, the extraction is also read again after
+        EXTRACTION_REFRESH_INTERVAL without any update in case a notification was missed.
+        """
+        async with self._extraction_update_listener.subscribe(file_id=file_id) as updates:
+            # Subscribed before reading the extraction, so no change after the read is missed
+            extraction = await self.get_extraction(file_id=file_id, user=user)
+            yield TextExtractionEvent(extraction=extraction)
+            while extraction.status in {ExtractionStatus.pending, ExtractionStatus.in_progress}:
+                try:
+                    async with asyncio.timeout(EXTRACTION_REFRESH_INTERVAL.total_seconds()):
+                        update = await anext(updates)
+                except TimeoutError:
+                    update = TextExtractionUpdate(file_id=file_id)
+                if update.progress_bytes is not None:
+                    yield TextExtractionEvent(extraction=extraction, progress_bytes=update.progress_bytes)
+                    continue
+                previous_status, extraction = extraction.status, await self.get_extraction(file_id=file_id, user=user)
+                if extraction.status != previous_status:
+                    yield TextExtractionEvent(extraction=extraction)
+
     async def delete(self, *, file_id: UUID, user: User) -> None:
         async with self._uow() as uow:
+            files = [await uow.files.get(file_id=file_id, user_id=user.id)]
+            with suppress(EntityNotFoundError):
+                # The extracted text file is deleted with the file
+                extraction = await uow.files.get_extraction_by_file_id(file_id=file_id)
+                if extraction.extracted_file_id and extraction.extracted_file_id != file_id:
+                    files.append(await uow.files.get(file_id=extraction.extracted_file_id))
+            unreferenced_objects = await self._release_objects(uow, *files)
             await uow.files.delete(file_id=file_id, user_id=user.id)
-            await self._object_storage.delete_file(file_id=file_id)
             await uow.commit()
+        await self._delete_objects(*unreferenced_objects)
 
     async def create_extraction(self, *, file_id: UUID, user: User) -> TextExtraction:
         async with self._uow() as uow:
             # Check user permissions
-            await uow.files.get(file_id=file_id, user_id=user.id, file_type=FileType.user_upload)
+            file = await uow.files.get(file_id=file_id, user_id=user.id, file_type=FileType.user_upload)
+            file_metadata = None
             try:
                 # Check if extraction already exists
                 extraction = await uow.files.get_extraction_by_file_id(file_id=file_id, user_id=user.id)
@@ -148,32 +361,63 @@ class FileService:
                     case _:
                         raise TypeError(f"Unknown extraction status: {extraction.status}")
             except EntityNotFoundError:
-                file_metadata = await self._object_storage.get_file_metadata(file_id=file_id)
+                file_metadata = await self._object_storage.get_file_metadata(file_id=file.object_id)
+                backend = self._extraction_backend_name(file_metadata)
                 extraction = TextExtraction(file_id=file_id)
                 if file_metadata.content_type in {"text/plain", "text/markdown"}:
                     extraction.set_completed(
                         extracted_file_id=file_id,  # Point to itself since it's already text
                         metadata=ExtractionMetadata(backend="in-place").model_dump(mode="json"),
                     )
+                elif extracted_file := await self._reuse_extracted_file(uow, file=file, backend=backend):
+                    extraction.set_completed(
+                        extracted_file_id=extracted_file.id,
+                        metadata=ExtractionMetadata(backend=backend).model_dump(mode="json"),
+                    )
                 await uow.files.create_extraction(extraction=extraction)
             if extraction.status == ExtractionStatus.pending:
-                from beeai_server.jobs.tasks.file import extract_text
+                from beeai_server.jobs.tasks.file import BUILTIN_TEXT_EXTRACTION_QUEUE, extract_text
 
-                await extract_text.configure(queueing_lock=str(file_id)).defer_async(file_id=str(file_id))
+                file_metadata = file_metadata or await self._object_storage.get_file_metadata(file_id=file.object_id)
+                # Simple formats have their own queue so that they do not wait behind long docling extractions
+                queue = BUILTIN_TEXT_EXTRACTION_QUEUE if self._is_builtin_extraction(file_metadata) else None
+                await extract_text.configure(queueing_lock=str(file_id), queue=queue).defer_async(file_id=str(file_id))
 
             await uow.commit()
             return extraction
 
+    async def _reuse_extracted_file(self, uow: IUnitOfWork, *, file: File, backend: str) -> File | None:
+        """Share the text already extracted by the same backend from a file with the same content."""
+        if not file.checksum_sha256:
+            return None
+        extracted_file = await uow.files.find_extracted_file(checksum_sha256=file.checksum_sha256, backend=backend)
+        if not extracted_file or not await uow.files.reference_object(object_id=extracted_file.object_id):
+            return None
+        extracted_file = extracted_file.model_copy(
+            update={
+                "id": uuid4(),
+                "created_at": utc_now(),
+                "created_by": file.created_by,
+                "parent_file_id": file.id,
+            }
+        )
+        await uow.files.create(file=extracted_file)
+        return extracted_file
+
     async def delete_extraction(self, *, file_id: UUID, user: User) -> None:
+        unreferenced_objects = []
         async with self._uow() as uow:
             extraction = await uow.files.get_extraction_by_file_id(file_id=file_id, user_id=user.id)
 
-            if extraction.extracted_file_id:
-                await self._object_storage.delete_file(file_id=extraction.extracted_file_id)
+            # Text files are their own extraction
+            if extraction.extracted_file_id and extraction.extracted_file_id != file_id:
+                extracted_file = await uow.files.get(file_id=extraction.extracted_file_id)
+                unreferenced_objects = await self._release_objects(uow, extracted_file)
                 await uow.files.delete(file_id=extraction.extracted_file_id)
 
             await uow.files.delete_extraction(extraction_id=extraction.id)
             await uow.commit()
+        await self._delete_objects(*unreferenced_objects)
 
 
 def limit_size_wrapper(
@@ -1,11 +1,18 @@
 # Copyright 2025 © BeeAI a Series of LF Projects, LLC
 # SPDX-License-Identifier: Apache-2.0
 
+import asyncio
+import base64
 import builtins
 import logging
-from collections.abc import Iterable
+from collections import Counter, defaultdict
+from collections.abc import AsyncIterator, Collection, Iterable
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import BinaryIO
 from uuid import UUID
 
+import numpy as np
 from kink import inject
 from sqlalchemy import Sequence
 
@@ -13,36 +20,92 @@ from beeai_server.configuration import Configuration
 from beeai_server.domain.models.user import User
 from beeai_server.domain.models.vector_store import (
     DocumentType,
+    EmbeddingFormat,
+    ExpiredVectorStoresReport,
+    HnswIndexSettings,
+    SearchMode,
+    SnapshotFormat,
+    VectorQuantization,
     VectorStore,
+    VectorStoreBatchSearchResult,
     VectorStoreDocument,
+    VectorStoreDocumentReplaceResult,
     VectorStoreItem,
+    VectorStoreItemField,
+    VectorStoreRecallReport,
     VectorStoreSearchResult,
 )
-from beeai_server.exceptions import InvalidVectorDimensionError, StorageCapacityExceededError
-from beeai_server.service_layer.unit_of_work import IUnitOfWorkFactory
+from beeai_server.domain.repositories.vector_store import IVectorStoreCache
+from beeai_server.exceptions import (
+    EntityNotFoundError,
+    IncompatibleVectorStoresError,
+    InvalidVectorDimensionError,
+    StorageCapacityExceededError,
+)
+from beeai_server.infrastructure.vector_database.snapshot import read_snapshot, snapshot_schema, write_snapshot
+from beeai_server.service_layer.services.embeddings import EmbeddingService
+from beeai_server.service_layer.unit_of_work import IUnitOfWork, IUnitOfWorkFactory
 
 logger = logging.getLogger(__name__)
 
+# Number of candidates retrieved per requested result when the results are diversified
+DIVERSITY_CANDIDATES_FACTOR = 5
+
 
 @inject
 class VectorStoreService:
     """Service for managing vector stores."""
 
-    def __init__(self, uow: IUnitOfWorkFactory, configuration: Configuration):
+    def __init__(
+        self,
+        uow: IUnitOfWorkFactory,
+        configuration: Configuration,
+        embedding_service: EmbeddingService,
+        vector_store_cache: IVectorStoreCache,
+    ):
         self._uow = uow
+        self._embedding_service = embedding_service
+        self._vector_store_cache = vector_store_cache
         self._vector_store_expiration_days = configuration.vector_stores.expire_after_days
         self._storage_limit_per_user = configuration.vector_stores.storage_limit_per_user_bytes
+        self._quantization_oversampling = configuration.vector_stores.quantization_oversampling
+        self._snapshot_batch_size = configuration.vector_stores.snapshot_batch_size
+        self._expire_batch_size = configuration.vector_stores.expire_batch_size
+        self._reconcile_batch_size = configuration.vector_stores.reconcile_batch_size
+        self._expire_batch_delay_seconds = configuration.vector_stores.expire_batch_delay_seconds
+        self._expire_vacuum_threshold = configuration.vector_stores.expire_vacuum_threshold
 
     async def list(self, *, user: User) -> list[VectorStore]:
         """List all vector stores for a user."""
         async with self._uow() as uow:
             return [document async for document in uow.vector_stores.list(user_id=user.id)]
 
-    async def create(self, *, name: str, dimension: int, model_id: str, user: User) -> VectorStore:
-        vector_store = VectorStore(name=name, dimension=dimension, created_by=user.id, model_id=model_id)
+    async def create(
+        self,
+        *,
+        name: str,
+        dimension: int,
+        model_id: str,
+        quantization: VectorQuantization = VectorQuantization.none,
+        index_settings: HnswIndexSettings | None = None,
+        user: User,
+    ) -> VectorStore:
+        vector_store = VectorStore(
+            name=name,
+            dimension=dimension,
+            created_by=user.id,
+            model_id=model_id,
+            quantization=quantization,
+            index_settings=index_settings or HnswIndexSettings(),
+        )
         async with self._uow() as uow:
             await uow.vector_stores.create(vector_store=vector_store)
-            await uow.vector_database.create_collection(vector_store.id, dimension=dimension)
+            await uow.vector_database.create_collection(
+                vector_store.id,
+                dimension=dimension,
+                quantization=quantization,
+                index_settings=vector_store.index_settings,
+            )
             await uow.commit()
         return vector_store
 
@@ -60,6 +123,7 @@ class VectorStoreService:
             await uow.vector_stores.delete(vector_store_id=vector_store_id, user_id=user.id)
             # Records in vector_database are deleted automatically by CASCADE operations in postgres
             await uow.commit()
+        self._vector_store_cache.invalidate(vector_store_id)
 
     async def list_documents(self, *, vector_store_id: UUID, user: User) -> Sequence[VectorStoreDocument]:
         """List all documents in a vector store."""
@@ -77,6 +141,7 @@ class VectorStoreService:
             )
             # Records in vector_database are deleted automatically by CASCADE operations in postgres
             await uow.commit()
+        self._vector_store_cache.invalidate(vector_store_id)
 
     async def add_items(self, *, vector_store_id: UUID, items: builtins.list[VectorStoreItem], user: User) -> None:
         """Add items to a vector store."""
@@ -100,22 +165,582 @@ class VectorStoreService:
                     for item in items
                 }.values()
             )
+            if await uow.vector_stores.total_usage(user_id=user.id) > self._storage_limit_per_user:
+                raise StorageCapacityExceededError(entity="vector_store", max_size=self._storage_limit_per_user)
+
+            await uow.vector_database.add_items(
+                collection_id=vector_store_id,
+                items=items,
+                quantization=vector_store.quantization,
+                index_settings=vector_store.index_settings,
+            )
+            await uow.commit()
+        self._vector_store_cache.invalidate(vector_store_id)
+
+    async def replace_document(
+        self, *, vector_store_id: UUID, document_id: str, items: builtins.list[VectorStoreItem], user: User
+    ) -> VectorStoreDocumentReplaceResult:
+        """
+        Replace all items of a document in a single transaction, replacing with no items removes the document.
+
+        Only new and changed items are written and items missing from the new version are deleted, so re-indexing
+        costs proportionally to the change. The usage of the document is recomputed from the new items.
+        """
+        if not items:
+            async with self._uow() as uow:
+                vector_store = await uow.vector_stores.get(vector_store_id=vector_store_id, user_id=user.id)
+                # Delete the items explicitly to count them, they would be deleted by CASCADE as well
+                deleted = await uow.vector_database.delete_documents(
+                    collection_id=vector_store_id,
+                    dimension=vector_store.dimension,
+                    vector_store_document_ids=[document_id],
+                    quantization=vector_store.quantization,
+                    index_settings=vector_store.index_settings,
+                )
+                await uow.vector_stores.remove_documents(vector_store_id=vector_store_id, document_ids=[document_id])
+                await uow.commit()
+            self._vector_store_cache.invalidate(vector_store_id)
+            return VectorStoreDocumentReplaceResult(deleted=deleted.rowcount)
+
+        async with self._uow() as uow:
             vector_store = await uow.vector_stores.get(vector_store_id=vector_store_id, user_id=user.id)
-            if vector_store.stats.usage_bytes > self._storage_limit_per_user:
+            if any(len(item.embedding) != vector_store.dimension for item in items):
+                raise InvalidVectorDimensionError(
+                    f"Vector dimensions must match vector store dimension: {vector_store.dimension}"
+                )
+            [document_info] = uow.vector_database.estimate_size(items)
+            document_type = items[0].document_type
+            await uow.vector_stores.replace_document(
+                document=VectorStoreDocument(
+                    vector_store_id=vector_store_id,
+                    id=document_id,
+                    file_id=document_id if document_type == DocumentType.platform_file else None,
+                    usage_bytes=document_info.usage_bytes,
+                )
+            )
+            if await uow.vector_stores.total_usage(user_id=user.id) > self._storage_limit_per_user:
                 raise StorageCapacityExceededError(entity="vector_store", max_size=self._storage_limit_per_user)
 
-            await uow.vector_database.add_items(collection_id=vector_store_id, items=items)
+            result = await uow.vector_database.replace_document_items(
+                collection_id=vector_store_id,
+                document_id=document_id,
+                items=items,
+                quantization=vector_store.quantization,
+                index_settings=vector_store.index_settings,
+            )
+            await uow.commit()
+        self._vector_store_cache.invalidate(vector_store_id)
+        return result
+
+    @asynccontextmanager
+    async def export_snapshot(
+        self, *, vector_store_id: UUID, snapshot_format: SnapshotFormat, user: User
+    ) -> AsyncIterator[AsyncIterator[bytes]]:
+        """Export all items of a vector store, the snapshot is streamed batch by batch while the context is open."""
+        async with self._uow() as uow:
+            vector_store = await uow.vector_stores.get(vector_store_id=vector_store_id, user_id=user.id)
+            batches = uow.vector_database.export_items(
+                collection_id=vector_store_id,
+                dimension=vector_store.dimension,
+                quantization=vector_store.quantization,
+                index_settings=vector_store.index_settings,
+                batch_size=self._snapshot_batch_size,
+            )
+            yield write_snapshot(batches, snapshot_schema(vector_store.dimension), snapshot_format)
+
+    async def import_snapshot(
+        self, *, vector_store_id: UUID, file: BinaryIO, snapshot_format: SnapshotFormat, user: User
+    ) -> VectorStore:
+        """
+        Bulk load the items of a snapshot into a vector store, the import is atomic.
+
+        Imported documents are not linked to platform files, the snapshot could come from a different deployment.
+        """
+        async with self._uow() as uow:
+            vector_store = await uow.vector_stores.get(vector_store_id=vector_store_id, user_id=user.id)
+            async for batch in read_snapshot(file, snapshot_format, vector_store.dimension, self._snapshot_batch_size):
+                documents = await uow.vector_database.import_items(
+                    collection_id=vector_store_id,
+                    batch=batch,
+                    quantization=vector_store.quantization,
+                    index_settings=vector_store.index_settings,
+                )
+                await uow.vector_stores.upsert_documents(
+                    documents=[
+                        VectorStoreDocument(
+                            vector_store_id=vector_store_id, id=document.id, usage_bytes=document.usage_bytes
+                        )
+                        for document in documents
+                    ]
+                )
+                if await uow.vector_stores.total_usage(user_id=user.id) > self._storage_limit_per_user:
+                    raise StorageCapacityExceededError(entity="vector_store", max_size=self._storage_limit_per_user)
+            vector_store = await uow.vector_stores.get(vector_store_id=vector_store_id, user_id=user.id)
             await uow.commit()
+        self._vector_store_cache.invalidate(vector_store_id)
+        return vector_store
 
     async def search(
-        self, *, vector_store_id: UUID, query_vector: Sequence[float], limit: int = 10, user: User
+        self,
+        *,
+        vector_store_id: UUID,
+        query_vector: Sequence[float] | None = None,
+        query_text: str | None = None,
+        mode: SearchMode = SearchMode.vector,
+        limit: int = 10,
+        include: Collection[VectorStoreItemField] | None = None,
+        embedding_format: EmbeddingFormat = EmbeddingFormat.float,
+        oversampling: int | None = None,
+        ef_search: int | None = None,
+        mmr_lambda: float | None = None,
+        max_per_document: int | None = None,
+        candidate_limit: int | None = None,
+        user: User,
     ) -> Sequence[VectorStoreSearchResult]:
         """
         Search a vector store using a query vector and return results with similarity scores.
+
+        Without query_vector, query_text is embedded using the model of the vector store. In hybrid mode, the vector
+        results are fused with full-text results for query_text and the score is the reciprocal rank fusion score.
+        For binary quantized stores, oversampling overrides the configured number of candidates retrieved per result
+        before re-ranking. ef_search overrides the size of the HNSW candidate list derived from the limit.
+
+        With mmr_lambda or max_per_document, candidate_limit results are retrieved and diversified using maximal
+        marginal relevance and/or a cap on the number of hits per document, the scores are kept unchanged.
         """
+        if query_vector is None:
+            async with self._uow() as uow:
+                vector_store = await uow.vector_stores.get(vector_store_id=vector_store_id, user_id=user.id)
+            # Embed outside of the transaction, the embedding backend can be slow
+            query_vector = await self._embedding_service.embed_query(query_text, model_id=vector_store.model_id)
+
+        diversify = mmr_lambda is not None or max_per_document is not None
+        requested_include, requested_embedding_format = include, embedding_format
+        if diversify:
+            # Over-fetch candidates, MMR needs their embeddings as floats
+            limit, requested_limit = candidate_limit or limit * DIVERSITY_CANDIDATES_FACTOR, limit
+            include = set(VectorStoreItemField) if include is None else set(include)
+            if mmr_lambda is not None:
+                include.add(VectorStoreItemField.embedding)
+            embedding_format = EmbeddingFormat.float
+
         async with self._uow() as uow:
-            await uow.vector_stores.get(vector_store_id=vector_store_id, user_id=user.id)
-            results = await uow.vector_database.similarity_search(
-                collection_id=vector_store_id, query_vector=query_vector, limit=limit
+            vector_store = await uow.vector_stores.get(vector_store_id=vector_store_id, user_id=user.id)
+            if len(query_vector) != vector_store.dimension:
+                raise InvalidVectorDimensionError(
+                    f"Query vector dimensions must match vector store dimension: {vector_store.dimension}"
+                )
+            results = None
+            if mode == SearchMode.vector:
+                results = await self._cached_search(
+                    uow, vector_store, query_vector, limit=limit, include=include, embedding_format=embedding_format
+                )
+            if results is None and mode == SearchMode.hybrid:
+                results = await uow.vector_database.hybrid_search(
+                    collection_id=vector_store_id,
+                    query_vector=query_vector,
+                    query_text=query_text,
+                    limit=limit,
+                    include=include,
+                    embedding_format=embedding_format,
+                    quantization=vector_store.quantization,
+                    index_settings=vector_store.index_settings,
+                    oversampling=oversampling or self._quantization_oversampling,
+                    ef_search=ef_search,
+                )
+            elif results is None:
+                results = await uow.vector_database.similarity_search(
+                    collection_id=vector_store_id,
+                    query_vector=query_vector,
+                    limit=limit,
+                    include=include,
+                    embedding_format=embedding_format,
+                    quantization=vector_store.quantization,
+                    index_settings=vector_store.index_settings,
+                    oversampling=oversampling or self._quantization_oversampling,
+                    ef_search=ef_search,
+                )
+
+        if not diversify:
+            return list(results)
+        results = diversify_search_results(
+            results,
+            query_vector,
+            limit=requested_limit,
+            mmr_lambda=mmr_lambda,
+            max_per_document=max_per_document,
+        )
+        return [
+            select_search_result_fields(result, include=requested_include, embedding_format=requested_embedding_format)
+            for result in results
+        ]
+
+    async def federated_search(
+        self,
+        *,
+        vector_store_ids: Collection[UUID],
+        query_vector: Sequence[float] | None = None,
+        query_text: str | None = None,
+        limit: int = 10,
+        include: Collection[VectorStoreItemField] | None = None,
+        embedding_format: EmbeddingFormat = EmbeddingFormat.float,
+        oversampling: int | None = None,
+        ef_search: int | None = None,
+        user: User,
+    ) -> builtins.list[VectorStoreSearchResult]:
+        """
+        Search multiple vector stores at once and return the global top-k, each item contains its vector store ID.
+
+        All vector stores must share the same dimension, model, quantization and index settings, so that they live in
+        the same collection table and their similarity scores are comparable.
+        """
+        vector_store_ids = set(vector_store_ids)
+        async with self._uow() as uow:
+            vector_stores = [
+                vector_store
+                async for vector_store in uow.vector_stores.list(user_id=user.id, vector_store_ids=vector_store_ids)
+            ]
+        if missing_ids := vector_store_ids - {vector_store.id for vector_store in vector_stores}:
+            raise EntityNotFoundError(entity="vector_store", id=str(sorted(missing_ids)))
+        if len({(vs.dimension, vs.model_id, vs.quantization, vs.index_settings) for vs in vector_stores}) > 1:
+            raise IncompatibleVectorStoresError(
+                "All vector stores searched at once must have the same dimension, model, quantization and index "
+                "settings"
+            )
+        [vector_store, *_] = vector_stores
+
+        if query_vector is None:
+            query_vector = await self._embedding_service.embed_query(query_text, model_id=vector_store.model_id)
+        if len(query_vector) != vector_store.dimension:
+            raise InvalidVectorDimensionError(
+                f"Query vector dimensions must match vector store dimension: {vector_store.dimension}"
+            )
+
+        async with self._uow() as uow:
+            results = await uow.vector_database.federated_search(
+                collection_ids=vector_store_ids,
+                query_vector=query_vector,
+                limit=limit,
+                include=include,
+                embedding_format=embedding_format,
+                quantization=vector_store.quantization,
+                index_settings=vector_store.index_settings,
+                oversampling=oversampling or self._quantization_oversampling,
+                ef_search=ef_search,
             )
             return list(results)
+
+    async def _cached_search(
+        self,
+        uow: IUnitOfWork,
+        vector_store: VectorStore,
+        query_vector: Sequence[float],
+        *,
+        limit: int,
+        include: Collection[VectorStoreItemField] | None,
+        embedding_format: EmbeddingFormat,
+    ) -> builtins.list[VectorStoreSearchResult] | None:
+        """Exact search of a hot vector store in memory, returns None if the vector store is not cached."""
+        search_kwargs = {"limit": limit, "include": include, "embedding_format": embedding_format}
+        results = await self._vector_store_cache.search(vector_store, query_vector, **search_kwargs)
+        if results is None and self._vector_store_cache.should_load(vector_store):
+            items, embeddings = await uow.vector_database.load_items(
+                collection_id=vector_store.id,
+                dimension=vector_store.dimension,
+                quantization=vector_store.quantization,
+                index_settings=vector_store.index_settings,
+            )
+            self._vector_store_cache.put(vector_store, items, embeddings)
+            results = await self._vector_store_cache.search(vector_store, query_vector, **search_kwargs)
+        return results
+
+    async def batch_search(
+        self,
+        *,
+        vector_store_id: UUID,
+        query_vectors: Sequence[Sequence[float]],
+        limit: int = 10,
+        deduplicate: bool = False,
+        merge: bool = False,
+        include: Collection[VectorStoreItemField] | None = None,
+        embedding_format: EmbeddingFormat = EmbeddingFormat.float,
+        oversampling: int | None = None,
+        ef_search: int | None = None,
+        user: User,
+    ) -> VectorStoreBatchSearchResult:
+        """
+        Search a vector store with multiple query vectors using a single ownership check and database round trip.
+
+        With deduplicate, each item is only returned for the query where it scored the highest. With merge, the
+        results are additionally combined into a single list of unique items ranked by their best score.
+        """
+        async with self._uow() as uow:
+            vector_store = await uow.vector_stores.get(vector_store_id=vector_store_id, user_id=user.id)
+            if any(len(query_vector) != vector_store.dimension for query_vector in query_vectors):
+                raise InvalidVectorDimensionError(
+                    f"Query vector dimensions must match vector store dimension: {vector_store.dimension}"
+                )
+            results = await uow.vector_database.batch_similarity_search(
+                collection_id=vector_store_id,
+                query_vectors=query_vectors,
+                limit=limit,
+                include=include,
+                embedding_format=embedding_format,
+                quantization=vector_store.quantization,
+                index_settings=vector_store.index_settings,
+                oversampling=oversampling or self._quantization_oversampling,
+                ef_search=ef_search,
+            )
+        return VectorStoreBatchSearchResult(
+            results=deduplicate_search_results(results) if deduplicate else results,
+            merged=merge_search_results(results, limit=limit) if merge else None,
+        )
+
+    async def recall_report(
+        self,
+        *,
+        vector_store_id: UUID,
+        sample_size: int = 10,
+        limit: int = 10,
+        oversampling: int | None = None,
+        ef_search: int | None = None,
+        user: User,
+    ) -> VectorStoreRecallReport:
+        """
+        Estimate recall@limit of the regular search by comparing it with exact brute force search.
+
+        Stored embeddings sampled from the vector store are used as query vectors.
+        """
+        oversampling = oversampling or self._quantization_oversampling
+        async with self._uow() as uow:
+            vector_store = await uow.vector_stores.get(vector_store_id=vector_store_id, user_id=user.id)
+            query_vectors = await uow.vector_database.sample_embeddings(
+                collection_id=vector_store_id,
+                dimension=vector_store.dimension,
+                sample_size=sample_size,
+                quantization=vector_store.quantization,
+                index_settings=vector_store.index_settings,
+            )
+            recalls = []
+            for query_vector in query_vectors:
+                approximate = await uow.vector_database.similarity_search(
+                    collection_id=vector_store_id,
+                    query_vector=query_vector,
+                    limit=limit,
+                    include=[],
+                    quantization=vector_store.quantization,
+                    index_settings=vector_store.index_settings,
+                    oversampling=oversampling,
+                    ef_search=ef_search,
+                )
+                exact = await uow.vector_database.exact_search(
+                    collection_id=vector_store_id,
+                    query_vector=query_vector,
+                    limit=limit,
+                    quantization=vector_store.quantization,
+                    index_settings=vector_store.index_settings,
+                )
+                expected_ids = {result.item.id for result in exact}
+                if expected_ids:
+                    found_ids = {result.item.id for result in approximate}
+                    recalls.append(len(found_ids & expected_ids) / len(expected_ids))
+        return VectorStoreRecallReport(
+            sample_size=len(query_vectors),
+            limit=limit,
+            quantization=vector_store.quantization,
+            index_settings=vector_store.index_settings,
+            oversampling=oversampling if vector_store.quantization != VectorQuantization.none else None,
+            ef_search=ef_search,
+            recall=sum(recalls) / len(recalls) if recalls else None,
+        )
+
+    async def delete_expired(self) -> ExpiredVectorStoresReport:
+        """
+        Delete vector stores that haven't been accessed for the configured number of days.
+
+        Each batch of vector stores is deleted in its own short transaction and the batches are throttled, so that the
+        cleanup doesn't hold locks or produce WAL in bursts. Collection tables with many deleted items are vacuumed and
+        their vector index is rebuilt concurrently afterwards.
+        """
+        active_threshold = timedelta(days=self._vector_store_expiration_days)
+        report = ExpiredVectorStoresReport()
+        deleted_items_per_table: Counter[tuple[int, VectorQuantization, HnswIndexSettings]] = Counter()
+        while True:
+            async with self._uow() as uow:
+                vector_stores = await uow.vector_stores.list_expired(
+                    active_threshold=active_threshold, limit=self._expire_batch_size
+                )
+                if not vector_stores:
+                    break
+                vector_store_ids_per_table = defaultdict(list)
+                for vector_store in vector_stores:
+                    table_key = (vector_store.dimension, vector_store.quantization, vector_store.index_settings)
+                    vector_store_ids_per_table[table_key].append(vector_store.id)
+                # The items would be deleted by CASCADE as well, deleting them explicitly tells how many there were
+                for table_key, vector_store_ids in vector_store_ids_per_table.items():
+                    dimension, quantization, index_settings = table_key
+                    deleted_items_per_table[table_key] += await uow.vector_database.delete_collection(
+                        collection_id=vector_store_ids,
+                        dimension=dimension,
+                        quantization=quantization,
+                        index_settings=index_settings,
+                    )
+                report.vector_stores += await uow.vector_stores.delete_expired(
+                    active_threshold=active_threshold, vector_store_ids=[v.id for v in vector_stores]
+                )
+                await uow.commit()
+
+            for vector_store in vector_stores:
+                self._vector_store_cache.invalidate(vector_store.id)
+                report.documents += vector_store.stats.num_documents
+                report.usage_bytes += vector_store.stats.usage_bytes
+            report.batches += 1
+            if len(vector_stores) < self._expire_batch_size:
+                break
+            await asyncio.sleep(self._expire_batch_delay_seconds)
+
+        report.items = sum(deleted_items_per_table.values())
+        for (dimension, quantization, index_settings), deleted_items in deleted_items_per_table.items():
+            if deleted_items < self._expire_vacuum_threshold:
+                continue
+            async with self._uow() as uow:
+                await uow.commit()  # VACUUM cannot run inside a transaction block
+                await uow.vector_database.vacuum_collections(
+                    dimension=dimension, quantization=quantization, index_settings=index_settings
+                )
+            report.vacuumed_tables += 1
+        return report
+
+    async def reconcile_stats(self) -> int:
+        """
+        Recompute the incrementally maintained statistics of all vector stores and the usage of their owners.
+
+        Each batch is reconciled in its own short transaction, so that ingestion is only blocked for the vector stores
+        (and users) of the current batch. Returns the number of vector stores whose statistics were corrected.
+        """
+        corrected_count, after_id = 0, None
+        while True:
+            async with self._uow() as uow:
+                after_id, batch_corrected_count = await uow.vector_stores.reconcile_stats(
+                    limit=self._reconcile_batch_size, after_id=after_id
+                )
+                await uow.commit()
+            corrected_count += batch_corrected_count
+            if after_id is None:
+                break
+
+        corrected_usage_count, after_user_id = 0, None
+        while True:
+            async with self._uow() as uow:
+                after_user_id, batch_corrected_count = await uow.vector_stores.reconcile_usage(
+                    limit=self._reconcile_batch_size, after_user_id=after_user_id
+                )
+                await uow.commit()
+            corrected_usage_count += batch_corrected_count
+            if after_user_id is None:
+                break
+        if corrected_usage_count:
+            logger.warning(f"Corrected vector store usage of {corrected_usage_count} users")
+        return corrected_count
+
+
+def deduplicate_search_results(
+    results: Iterable[Iterable[VectorStoreSearchResult]],
+) -> list[list[VectorStoreSearchResult]]:
+    """Keep each item only in the result list where it has the highest score."""
+    results = [list(query_results) for query_results in results]
+    best_query: dict[UUID, tuple[int, float]] = {}
+    for query_index, query_results in enumerate(results):
+        for result in query_results:
+            if result.item.id not in best_query or best_query[result.item.id][1] < result.score:
+                best_query[result.item.id] = (query_index, result.score)
+    return [
+        [result for result in query_results if best_query[result.item.id][0] == query_index]
+        for query_index, query_results in enumerate(results)
+    ]
+
+
+def merge_search_results(
+    results: Iterable[Iterable[VectorStoreSearchResult]], limit: int | None = None
+) -> list[VectorStoreSearchResult]:
+    """Merge results of multiple queries into a single list of unique items ranked by their best score."""
+    best: dict[UUID, VectorStoreSearchResult] = {}
+    for query_results in results:
+        for result in query_results:
+            if result.item.id not in best or best[result.item.id].score < result.score:
+                best[result.item.id] = result
+    merged = sorted(best.values(), key=lambda result: result.score, reverse=True)
+    return merged[:limit] if limit is not None else merged
+
+
+def diversify_search_results(
+    results: Iterable[VectorStoreSearchResult],
+    query_vector: Sequence[float],
+    limit: int,
+    mmr_lambda: float | None = None,
+    max_per_document: int | None = None,
+) -> list[VectorStoreSearchResult]:
+    """
+    Select up to limit results using maximal marginal relevance and/or a cap on the number of hits per document.
+
+    MMR greedily picks the candidate maximizing mmr_lambda * sim(query, item) - (1 - mmr_lambda) * max sim(item,
+    selected), so mmr_lambda=1 keeps the relevance order and lower values prefer diverse results. Results must contain
+    float embeddings when mmr_lambda is set.
+    """
+    results = list(results)
+    if not results:
+        return []
+    document_ids = np.array([result.item.document_id for result in results])
+
+    if mmr_lambda is None:
+        relevance = np.array([result.score for result in results], dtype=np.float32)
+        similarity = None
+    else:
+        embeddings = np.array([result.item.embedding for result in results], dtype=np.float32)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            embeddings = np.nan_to_num(embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True))
+            query = np.asarray(query_vector, dtype=np.float32)
+            query = np.nan_to_num(query / np.linalg.norm(query))
+        relevance = embeddings @ query
+        similarity = embeddings @ embeddings.T
+
+    available = np.ones(len(results), dtype=bool)
+    max_similarity = np.zeros(len(results), dtype=np.float32)
+    selected: list[int] = []
+    document_counts: dict[str, int] = {}
+    while len(selected) < limit and available.any():
+        if similarity is None:
+            scores = relevance
+        else:
+            redundancy = max_similarity if selected else 0
+            scores = mmr_lambda * relevance - (1 - mmr_lambda) * redundancy
+        index = int(np.argmax(np.where(available, scores, -np.inf)))
+        selected.append(index)
+        available[index] = False
+        if similarity is not None:
+            max_similarity = np.maximum(max_similarity, similarity[index])
+        document_id = results[index].item.document_id
+        document_counts[document_id] = document_counts.get(document_id, 0) + 1
+        if max_per_document is not None and document_counts[document_id] >= max_per_document:
+            available &= document_ids != document_id
+    return [results[index] for index in selected]
+
+
+def select_search_result_fields(
+    result: VectorStoreSearchResult,
+    include: Collection[VectorStoreItemField] | None = None,
+    embedding_format: EmbeddingFormat = EmbeddingFormat.float,
+) -> VectorStoreSearchResult:
+    """Leave out item fields which were not requested and encode a float embedding in the requested format."""
+    include = set(VectorStoreItemField) if include is None else set(include)
+    embedding = result.item.embedding if VectorStoreItemField.embedding in include else None
+    if embedding is not None and embedding_format == EmbeddingFormat.base64 and not isinstance(embedding, str):
+        embedding = base64.b64encode(np.asarray(embedding, dtype="<f2").tobytes()).decode("ascii")
+    item = result.item.model_copy(
+        update={
+            "text": result.item.text if VectorStoreItemField.text in include else None,
+            "metadata": result.item.metadata if VectorStoreItemField.metadata in include else None,
+            "embedding": embedding,
+        }
+    )
+    return result.model_copy(update={"item": item})
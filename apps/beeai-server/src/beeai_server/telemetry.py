@@ -22,6 +22,8 @@ OTEL_HTTP_ENDPOINT = str(get_configuration().telemetry.collector_url)
 
 INSTRUMENTATION_NAME = "beeai-server"
 
+_TELEMETRY_CONFIGURED = False
+
 
 class SilentOTLPSpanExporter(OTLPSpanExporter):
     def export(self, *args, **kwargs):
@@ -42,6 +44,10 @@ class SilentOTLPMetricExporter(OTLPMetricExporter):
 
 
 def configure_telemetry():
+    global _TELEMETRY_CONFIGURED
+    if _TELEMETRY_CONFIGURED:
+        return
+
     resource = Resource(
         attributes={
             SERVICE_NAME: "beeai-server",
@@ -63,6 +69,7 @@ def configure_telemetry():
             ],
         )
     )
+    _TELEMETRY_CONFIGURED = True
 
 
 def shutdown_telemetry():
@@ -1,11 +1,16 @@
 # Copyright 2025 © BeeAI a Series of LF Projects, LLC
 # SPDX-License-Identifier: Apache-2.0
 
-from fastapi import status
+from collections.abc import AsyncIterable
+
+from fastapi import HTTPException, Request, status
 from fastapi.staticfiles import StaticFiles
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
 from starlette.responses import AsyncContentStream, StreamingResponse
 
 from beeai_server.api.schema.common import ErrorStreamResponse, ErrorStreamResponseError
+from beeai_server.domain.models.file import AsyncFile
 from beeai_server.utils.utils import extract_messages
 
 
@@ -50,3 +55,157 @@ def streaming_response(content: AsyncContentStream):
             "Connection": "keep-alive",
         },
     )
+
+
+class StreamReader:
+    """File-like reader over an async stream of chunks, the chunks are pulled from the stream only when read."""
+
+    def __init__(self, stream: AsyncIterable[bytes]):
+        self._stream = aiter(stream)
+        self._buffer = bytearray()
+        self._exhausted = False
+
+    @property
+    def _complete(self) -> bool:
+        return self._exhausted
+
+    async def _read_chunk(self) -> None:
+        try:
+            self._buffer += await anext(self._stream)
+        except StopAsyncIteration:
+            self._exhausted = True
+
+    async def read(self, size: int = -1) -> bytes:
+        while not self._complete and (size < 0 or len(self._buffer) < size):
+            await self._read_chunk()
+        size = len(self._buffer) if size < 0 else size
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+class MultipartFileReader(StreamReader):
+    """
+    Incremental multipart/form-data parser reading the content of the first file field of the form.
+
+    Unlike starlette's form parser, the file is not spooled to disk, the body is parsed as the file is read.
+    """
+
+    def __init__(self, stream: AsyncIterable[bytes], boundary: bytes):
+        super().__init__(stream)
+        self.filename: str | None = None
+        self.content_type: str | None = None
+        self._in_file = False
+        self._file_complete = False
+        self._headers: dict[bytes, bytes] = {}
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._parser = MultipartParser(
+            boundary,
+            callbacks={
+                "on_part_begin": self._headers.clear,
+                "on_header_field": lambda data, start, end: self._header_field.extend(data[start:end]),
+                "on_header_value": lambda data, start, end: self._header_value.extend(data[start:end]),
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+
+    def _on_header_end(self) -> None:
+        self._headers[bytes(self._header_field).lower()] = bytes(self._header_value)
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition"))
+        if self.filename is None and b"filename" in options:
+            self.filename = options[b"filename"].decode("utf-8")
+            self.content_type = self._headers.get(b"content-type", b"application/octet-stream").decode("latin-1")
+            self._in_file = True
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self._buffer += data[start:end]
+
+    def _on_part_end(self) -> None:
+        if self._in_file:
+            self._in_file, self._file_complete = False, True
+
+    @property
+    def _complete(self) -> bool:
+        return self._file_complete
+
+    async def _read_chunk(self) -> None:
+        try:
+            chunk = await anext(self._stream)
+        except StopAsyncIteration:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, "Incomplete multipart body") from None
+        try:
+            self._parser.write(chunk)
+        except MultipartParseError as e:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, f"Invalid multipart body: {e}") from e
+
+    async def open(self) -> None:
+        """Parse the body up to the headers of the file field."""
+        while self.filename is None:
+            await self._read_chunk()
+
+
+async def stream_request_file(request: Request, filename: str | None = None) -> AsyncFile:
+    """
+    Read the file uploaded in the request body as it arrives, without spooling it to disk.
+
+    The body is either a multipart/form-data form with a file field or the raw file content, in which case the filename
+    must be given and the content type is taken from the Content-Type header.
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type"))
+    if content_type == b"multipart/form-data":
+        if b"boundary" not in options:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, "Missing multipart boundary")
+        reader = MultipartFileReader(request.stream(), boundary=options[b"boundary"])
+        await reader.open()
+        return AsyncFile(filename=reader.filename, content_type=reader.content_type, read=reader.read)
+    if not filename:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Filename is required when uploading the raw file content")
+    content_length = request.headers.get("content-length")
+    return AsyncFile(
+        filename=filename,
+        content_type=content_type.decode("latin-1") or "application/octet-stream",
+        read=StreamReader(request.stream()).read,
+        size=int(content_length) if content_length and content_length.isdigit() else None,
+    )
+
+
+def parse_range_header(range_header: str, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single byte range (RFC 9110), returns the inclusive (start, end) offsets or None to send the whole content.
+
+    Malformed headers and multiple ranges are ignored as allowed by the RFC, unsatisfiable ranges are rejected with 416.
+    """
+    unit, _, byte_range = range_header.partition("=")
+    first, separator, last = byte_range.strip().partition("-")
+    if unit.strip().lower() != "bytes" or not separator or not (first or last):
+        return None
+    if (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+    if not first:  # suffix range, the last bytes of the content
+        start, end = max(size - int(last), 0), size - 1 if int(last) else -1
+    elif last and int(last) < int(first):
+        return None
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise HTTPException(
+            status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            "Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of the ETag with the entity tags of an If-None-Match header."""
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
@@ -0,0 +1,97 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Incremental extraction of a single string value from a (large) JSON document streamed in chunks."""
+
+import json
+import re
+from collections.abc import AsyncIterable, Callable
+
+# Longest run of characters without a quote or a backslash followed by complete escape sequences, surrogate pairs are
+# only matched as a whole so that they are never split between two decoded pieces. The alternatives start with
+# different characters, the regex never backtracks.
+_STRING_BODY = re.compile(
+    r"""(?:
+        [^"\\]+
+        | \\["\\/bfnrt]
+        | \\u(?![dD][89abAB])[0-9a-fA-F]{4}
+        | \\u[dD][89abAB][0-9a-fA-F]{2}\\u[dD][c-fC-F][0-9a-fA-F]{2}
+    )*""",
+    re.VERBOSE,
+)
+# Escape sequence (or surrogate pair) cut by the end of the chunk, completed by the next one
+_INCOMPLETE_ESCAPE = re.compile(
+    r"\\(?:u(?:[dD][89abAB][0-9a-fA-F]{0,2}(?:\\(?:u[0-9a-fA-F]{0,3})?)?|[0-9a-fA-F]{0,3})?)?"
+)
+# High surrogate which is not followed by a low surrogate, decoded on its own like json.loads does
+_LONE_SURROGATE = re.compile(r"\\u[dD][89abAB][0-9a-fA-F]{2}")
+
+
+class JsonStringValueExtractor:
+    """
+    Find the first string value of the key in JSON text fed in chunks and decode it as the chunks arrive.
+
+    The text is never scanned character by character in Python: the key is found with a regex search, the string body
+    up to the closing quote is matched by a single regex and decoded by json.loads. Only an escape sequence cut by the
+    end of a chunk is kept for the next one.
+    """
+
+    def __init__(self, key: str):
+        self._key = key
+        self._key_pattern = re.compile(rf'"{re.escape(key)}"\s*:\s*"')
+        self._max_key_overlap = len(key) + 64  # the key (and whitespace) can be split between chunks
+        self._pending = ""
+        self._inside = False
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        """Process the next chunk, returns the decoded part of the value (possibly empty)."""
+        if self.done:
+            return ""
+        text = self._pending + chunk
+        self._pending = ""
+        start = 0
+        if not self._inside:
+            if not (match := self._key_pattern.search(text)):
+                self._pending = text[-self._max_key_overlap :]
+                return ""
+            self._inside, start = True, match.end()
+
+        pieces = []
+        position = start
+        while True:
+            end = _STRING_BODY.match(text, position).end()
+            pieces.append(text[position:end])
+            position = end
+            if position == len(text):
+                break
+            if text[position] == '"':
+                self.done = True
+                break
+            if _INCOMPLETE_ESCAPE.fullmatch(text, position):
+                self._pending = text[position:]
+                break
+            if not (surrogate := _LONE_SURROGATE.match(text, position)):
+                raise ValueError(f"Invalid escape sequence in JSON string: {text[position : position + 6]!r}")
+            pieces.append(surrogate.group())
+            position = surrogate.end()
+        return json.loads(f'"{"".join(pieces)}"')
+
+    def close(self) -> None:
+        """Check that the whole value was found once the input ends."""
+        if self._inside and not self.done:
+            raise EOFError("Unterminated string value in JSON input")
+        if not self._inside:
+            raise KeyError(f"Key {self._key} not found in JSON input")
+
+
+async def extract_string_value_stream(
+    async_stream: Callable[[int], AsyncIterable[str]], key: str, chunk_size: int = 1024
+) -> AsyncIterable[str]:
+    extractor = JsonStringValueExtractor(key)
+    async for chunk in async_stream(chunk_size):
+        if value := extractor.feed(chunk):
+            yield value
+        if extractor.done:
+            return
+    extractor.close()
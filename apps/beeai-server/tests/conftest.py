@@ -19,6 +19,7 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine
 
 from beeai_server.infrastructure.persistence.repositories.db_metadata import metadata
+from beeai_server.infrastructure.vector_database.vector_db import clear_created_tables_cache
 
 
 class TestConfiguration(BaseSettings):
@@ -101,6 +102,7 @@ def clean_up_fn(test_configuration):
             vecdb = await connection.execute(text("SELECT tablename from pg_tables where schemaname = 'vector_db'"))
             for row in vecdb.fetchall():
                 await connection.execute(text(f"DROP TABLE vector_db.{row.tablename} CASCADE"))
+            clear_created_tables_cache()
 
             await connection.commit()
         # Clean all deployments
@@ -1,12 +1,12 @@
 # Copyright 2025 © BeeAI a Series of LF Projects, LLC
 # SPDX-License-Identifier: Apache-2.0
+import asyncio
+import json
 from collections.abc import Callable
 from io import BytesIO
 
 import httpx
 import pytest
-from asyncpg.pgproto.pgproto import timedelta
-from tenacity import AsyncRetrying, stop_after_delay, wait_fixed
 
 pytestmark = pytest.mark.e2e
 
@@ -32,6 +32,20 @@ async def test_files(subtests, setup_real_llm, api_client):
         assert response.json() == {"hello": "world"}
         assert response.headers["Content-Type"] == "application/json"
 
+    with subtests.test("get file content range"):
+        response = await api_client.get(f"files/{file_id}/content", headers={"Range": "bytes=1-7"})
+        assert response.status_code == 206
+        assert response.content == b'"hello"'
+        assert response.headers["Content-Range"] == "bytes 1-7/18"
+        response = await api_client.get(f"files/{file_id}/content", headers={"Range": "bytes=100-"})
+        assert response.status_code == 416
+
+    with subtests.test("get file content conditionally"):
+        response = await api_client.get(f"files/{file_id}/content")
+        etag = response.headers["ETag"]
+        response = await api_client.get(f"files/{file_id}/content", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
     with subtests.test("delete file"):
         response = await api_client.delete(f"files/{file_id}")
         response.raise_for_status()
@@ -39,6 +53,29 @@ async def test_files(subtests, setup_real_llm, api_client):
             response = await api_client.get(f"files/{file_id}")
             response.raise_for_status()
 
+    with subtests.test("upload raw file stream"):
+        response = await api_client.post(
+            "files/stream",
+            params={"filename": "stream.txt"},
+            content=b"x" * 10_000_000,
+            headers={"Content-Type": "text/plain"},
+        )
+        response.raise_for_status()
+        assert response.json()["file_size_bytes"] == 10_000_000
+        response = await api_client.get(f"files/{response.json()['id']}/content")
+        response.raise_for_status()
+        assert response.content == b"x" * 10_000_000
+
+    with subtests.test("upload multipart file stream"):
+        response = await api_client.post(
+            "files/stream", files={"file": ("test.txt", '{"hello": "world"}', "application/json")}
+        )
+        response.raise_for_status()
+        assert response.json()["filename"] == "test.txt"
+        response = await api_client.get(f"files/{response.json()['id']}/content")
+        response.raise_for_status()
+        assert response.json() == {"hello": "world"}
+
 
 @pytest.fixture
 def test_pdf() -> Callable[[str], BytesIO]:
@@ -96,14 +133,13 @@ async def test_text_extraction_pdf_workflow(subtests, api_client, test_pdf: Call
         extraction_data = response.json()
         assert extraction_data["file_id"] == file_id
 
-    async for attempt in AsyncRetrying(stop=stop_after_delay(timedelta(seconds=40)), wait=wait_fixed(1)):
-        with attempt:
-            response = await api_client.get(f"files/{file_id}/extraction")
-            response.raise_for_status()
-            extraction_data = response.json()
-            final_status = extraction_data["status"]
-            if final_status not in ["completed", "failed"]:
-                raise ValueError("not completed")
+    # The event stream ends once the extraction is finished
+    async with asyncio.timeout(40), api_client.stream("GET", f"files/{file_id}/extraction/events") as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if line.startswith("data: "):
+                extraction_data = json.loads(line.removeprefix("data: "))["extraction"]
+    final_status = extraction_data["status"]
 
     assert final_status == "completed", (
         f"Expected completed status, got {final_status}: {extraction_data['error_message']}"
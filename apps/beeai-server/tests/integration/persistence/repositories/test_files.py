@@ -275,3 +275,28 @@ async def test_total_usage(db_transaction: AsyncConnection, test_user_id: uuid.U
     # Get total usage for other user
     other_user_total_usage = await repository.total_usage(user_id=other_user_id)
     assert other_user_total_usage == 4096
+
+
+@pytest.mark.asyncio
+async def test_shared_file_objects(db_transaction: AsyncConnection):
+    repository = SqlAlchemyFileRepository(connection=db_transaction)
+    first_object_id, second_object_id = uuid.uuid4(), uuid.uuid4()
+    checksum = "a" * 64
+
+    # The second upload with the same content references the object of the first one
+    assert await repository.add_object_reference(object_id=first_object_id, checksum_sha256=checksum, size=10) == (
+        first_object_id
+    )
+    assert await repository.add_object_reference(object_id=second_object_id, checksum_sha256=checksum, size=10) == (
+        first_object_id
+    )
+    assert await repository.reference_object(object_id=first_object_id)
+    assert not await repository.reference_object(object_id=second_object_id)
+
+    assert not await repository.release_object(object_id=first_object_id)
+    assert not await repository.release_object(object_id=first_object_id)
+    assert await repository.release_object(object_id=first_object_id)
+    assert not await repository.reference_object(object_id=first_object_id)
+
+    # Objects which are not shared are never referenced by other files
+    assert await repository.release_object(object_id=second_object_id)
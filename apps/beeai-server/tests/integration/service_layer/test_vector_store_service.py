@@ -1,17 +1,35 @@
 # Copyright 2025 © BeeAI a Series of LF Projects, LLC
 # SPDX-License-Identifier: Apache-2.0
 
+import io
 from uuid import uuid4
 
+import openai.types
+import pyarrow as pa
 import pytest
 import pytest_asyncio
+from sqlalchemy import text
 
 from beeai_server.bootstrap import setup_database_engine
 from beeai_server.configuration import Configuration, VectorStoresConfiguration
 from beeai_server.domain.models.user import User
-from beeai_server.domain.models.vector_store import DocumentType, VectorStoreItem
-from beeai_server.exceptions import InvalidVectorDimensionError, StorageCapacityExceededError
+from beeai_server.domain.models.vector_store import (
+    DocumentType,
+    HnswIndexSettings,
+    SearchMode,
+    SnapshotFormat,
+    VectorStoreItem,
+)
+from beeai_server.exceptions import (
+    IncompatibleVectorStoresError,
+    InvalidVectorDimensionError,
+    InvalidVectorStoreSnapshotError,
+    StorageCapacityExceededError,
+)
 from beeai_server.infrastructure.persistence.unit_of_work import SqlAlchemyUnitOfWorkFactory
+from beeai_server.infrastructure.vector_database.cache import InMemoryVectorStoreCache
+from beeai_server.infrastructure.vector_database.snapshot import snapshot_schema
+from beeai_server.service_layer.services.embeddings import EmbeddingService
 from beeai_server.service_layer.services.vector_stores import VectorStoreService
 
 pytestmark = pytest.mark.integration
@@ -20,7 +38,9 @@ pytestmark = pytest.mark.integration
 @pytest_asyncio.fixture
 async def low_limit_config():
     """Create a configuration with a very low storage limit for testing."""
-    return Configuration(vector_stores=VectorStoresConfiguration(storage_limit_per_user_bytes=2000))
+    return Configuration(
+        vector_stores=VectorStoresConfiguration(storage_limit_per_user_bytes=2000, reconcile_batch_size=1)
+    )
 
 
 @pytest_asyncio.fixture
@@ -31,7 +51,12 @@ async def uow_factory(low_limit_config, clean_up):
 @pytest_asyncio.fixture
 async def vector_store_service(uow_factory, low_limit_config):
     """Create a VectorStoreService with real transaction behavior."""
-    return VectorStoreService(uow_factory, low_limit_config)
+    return VectorStoreService(
+        uow_factory,
+        low_limit_config,
+        EmbeddingService(uow_factory, low_limit_config),
+        InMemoryVectorStoreCache(low_limit_config.vector_stores),
+    )
 
 
 @pytest_asyncio.fixture
@@ -150,3 +175,306 @@ async def test_invalid_vector_dimension(vector_store_service: VectorStoreService
 
     with pytest.raises(InvalidVectorDimensionError):
         await vector_store_service.add_items(vector_store_id=vector_store.id, items=small_items, user=test_user)
+
+
+@pytest.mark.asyncio
+async def test_vector_store_stats_are_maintained(
+    vector_store_service: VectorStoreService, uow_factory, test_user: User, large_vector_items: list[VectorStoreItem]
+):
+    """Test that statistics and user usage are updated when documents are added and removed."""
+    vector_store = await vector_store_service.create(
+        name="test-stats", dimension=128, model_id="test_model", user=test_user
+    )
+    await vector_store_service.add_items(vector_store_id=vector_store.id, items=[large_vector_items[0]], user=test_user)
+    await vector_store_service.add_items(vector_store_id=vector_store.id, items=[large_vector_items[0]], user=test_user)
+
+    retrieved_store = await vector_store_service.get(vector_store_id=vector_store.id, user=test_user)
+    assert retrieved_store.stats.num_documents == 1
+    async with uow_factory() as uow:
+        assert await uow.vector_stores.total_usage(user_id=test_user.id) == retrieved_store.stats.usage_bytes
+
+    await vector_store_service.remove_documents(
+        vector_store_id=vector_store.id, document_ids=[large_vector_items[0].document_id], user=test_user
+    )
+
+    retrieved_store = await vector_store_service.get(vector_store_id=vector_store.id, user=test_user)
+    assert retrieved_store.stats.usage_bytes == 0
+    assert retrieved_store.stats.num_documents == 0
+    assert await vector_store_service.reconcile_stats() == 0
+
+
+@pytest.mark.asyncio
+async def test_reconcile_vector_store_stats(
+    vector_store_service: VectorStoreService, uow_factory, test_user: User, large_vector_items: list[VectorStoreItem]
+):
+    """Test that drifted statistics are recomputed from the documents."""
+    vector_store = await vector_store_service.create(
+        name="test-reconcile", dimension=128, model_id="test_model", user=test_user
+    )
+    # An empty vector store makes the reconciliation run in more than one batch
+    await vector_store_service.create(name="test-reconcile-empty", dimension=128, model_id="test_model", user=test_user)
+    await vector_store_service.add_items(vector_store_id=vector_store.id, items=[large_vector_items[0]], user=test_user)
+    expected_stats = (await vector_store_service.get(vector_store_id=vector_store.id, user=test_user)).stats
+
+    async with uow_factory.engine.begin() as connection:
+        await connection.execute(
+            text("UPDATE vector_stores SET usage_bytes = 0, num_documents = 42 WHERE id = :id"),
+            {"id": vector_store.id},
+        )
+        await connection.execute(
+            text("UPDATE vector_store_usage SET usage_bytes = 7 WHERE user_id = :id"), {"id": test_user.id}
+        )
+
+    assert await vector_store_service.reconcile_stats() == 1
+    assert (await vector_store_service.get(vector_store_id=vector_store.id, user=test_user)).stats == expected_stats
+    async with uow_factory() as uow:
+        assert await uow.vector_stores.total_usage(user_id=test_user.id) == expected_stats.usage_bytes
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("snapshot_format", list(SnapshotFormat))
+async def test_export_and_import_snapshot(
+    vector_store_service: VectorStoreService, test_user: User, snapshot_format: SnapshotFormat
+):
+    """Test that a vector store restored from a snapshot contains the same items."""
+    items = [
+        VectorStoreItem(
+            document_id=f"doc_{i % 2}",
+            document_type=DocumentType.external,
+            text=f"Item {i}",
+            embedding=[float(i), 1.0, 0.5],
+            metadata={"i": str(i)} if i % 2 else None,
+        )
+        for i in range(5)
+    ]
+    source = await vector_store_service.create(name="source", dimension=3, model_id="test_model", user=test_user)
+    await vector_store_service.add_items(vector_store_id=source.id, items=items, user=test_user)
+
+    async with vector_store_service.export_snapshot(
+        vector_store_id=source.id, snapshot_format=snapshot_format, user=test_user
+    ) as snapshot:
+        data = b"".join([chunk async for chunk in snapshot])
+
+    target = await vector_store_service.create(name="target", dimension=3, model_id="test_model", user=test_user)
+    target = await vector_store_service.import_snapshot(
+        vector_store_id=target.id, file=io.BytesIO(data), snapshot_format=snapshot_format, user=test_user
+    )
+    assert target.stats.num_documents == 2
+
+    results = await vector_store_service.search(
+        vector_store_id=target.id, query_vector=[4.0, 1.0, 0.5], limit=10, user=test_user
+    )
+    assert {(r.item.id, r.item.text, r.item.embedding[0]) for r in results} == {
+        (item.id, item.text, item.embedding[0]) for item in items
+    }
+    assert {r.item.text: r.item.metadata for r in results}["Item 1"] == {"i": "1"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("item_id", "document_id"),
+    [("not-a-uuid", "doc"), (str(uuid4()), "x" * 257)],
+    ids=["invalid_id", "long_document_id"],
+)
+async def test_import_invalid_snapshot(
+    vector_store_service: VectorStoreService, test_user: User, item_id: str, document_id: str
+):
+    """Test that snapshot values rejected by the database are reported as an invalid snapshot."""
+    schema = snapshot_schema(3)
+    batch = pa.record_batch(
+        [[str(uuid4()), item_id], ["doc", document_id], ["a", "b"], [None, None], [[1, 2, 3], [3, 2, 1]]],
+        schema=schema,
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_batch(batch)
+
+    vector_store = await vector_store_service.create(name="target", dimension=3, model_id="test_model", user=test_user)
+    with pytest.raises(InvalidVectorStoreSnapshotError):
+        await vector_store_service.import_snapshot(
+            vector_store_id=vector_store.id,
+            file=io.BytesIO(sink.getvalue().to_pybytes()),
+            snapshot_format=SnapshotFormat.arrow,
+            user=test_user,
+        )
+    assert (await vector_store_service.get(vector_store_id=vector_store.id, user=test_user)).stats.num_documents == 0
+
+
+@pytest.mark.asyncio
+async def test_delete_expired_in_batches(uow_factory, test_user: User):
+    """Test that expired vector stores are deleted in batches together with their items."""
+    config = Configuration(
+        vector_stores=VectorStoresConfiguration(
+            expire_batch_size=2, expire_batch_delay_seconds=0, expire_vacuum_threshold=3
+        )
+    )
+    vector_store_service = VectorStoreService(
+        uow_factory,
+        config,
+        EmbeddingService(uow_factory, config),
+        InMemoryVectorStoreCache(config.vector_stores),
+    )
+    vector_stores = []
+    for i in range(5):
+        vector_store = await vector_store_service.create(
+            name=f"test-expire-{i}", dimension=3, model_id="test_model", user=test_user
+        )
+        items = [
+            VectorStoreItem(document_id=f"doc_{j}", document_type=DocumentType.external, text="x", embedding=[1, 2, 3])
+            for j in range(2)
+        ]
+        await vector_store_service.add_items(vector_store_id=vector_store.id, items=items, user=test_user)
+        vector_stores.append(vector_store)
+
+    async with uow_factory.engine.begin() as connection:
+        await connection.execute(
+            text("UPDATE vector_stores SET last_active_at = now() - interval '30 days' WHERE id <> :id"),
+            {"id": vector_stores[-1].id},
+        )
+
+    report = await vector_store_service.delete_expired()
+    assert (report.vector_stores, report.documents, report.items, report.batches) == (4, 8, 8, 2)
+    assert report.usage_bytes > 0
+    assert report.vacuumed_tables == 1
+
+    async with uow_factory() as uow:
+        remaining = [vector_store.id async for vector_store in uow.vector_stores.list(user_id=test_user.id)]
+        assert remaining == [vector_stores[-1].id]
+        assert (
+            await uow.vector_stores.total_usage(user_id=test_user.id)
+            == (await uow.vector_stores.get(vector_store_id=vector_stores[-1].id)).stats.usage_bytes
+        )
+
+
+@pytest.mark.asyncio
+async def test_replace_document(vector_store_service: VectorStoreService, uow_factory, test_user: User):
+    """Test that replacing a document writes only the changes and recomputes its usage."""
+    vector_store = await vector_store_service.create(
+        name="test-replace", dimension=3, model_id="test_model", user=test_user
+    )
+    items = [
+        VectorStoreItem(document_id="doc", document_type=DocumentType.external, text=f"Chunk {i}", embedding=[i, 1, 1])
+        for i in range(3)
+    ]
+    result = await vector_store_service.replace_document(
+        vector_store_id=vector_store.id, document_id="doc", items=items, user=test_user
+    )
+    assert (result.inserted, result.updated, result.deleted, result.unchanged) == (3, 0, 0, 0)
+
+    new_items = [
+        items[0],
+        items[1].model_copy(update={"text": "Changed chunk"}),
+        VectorStoreItem(document_id="doc", document_type=DocumentType.external, text="New chunk", embedding=[5, 1, 1]),
+    ]
+    result = await vector_store_service.replace_document(
+        vector_store_id=vector_store.id, document_id="doc", items=new_items, user=test_user
+    )
+    assert (result.inserted, result.updated, result.deleted, result.unchanged) == (1, 1, 1, 1)
+
+    [document] = await vector_store_service.list_documents(vector_store_id=vector_store.id, user=test_user)
+    retrieved_store = await vector_store_service.get(vector_store_id=vector_store.id, user=test_user)
+    async with uow_factory() as uow:
+        [expected_usage] = uow.vector_database.estimate_size(new_items)
+    assert document.usage_bytes == retrieved_store.stats.usage_bytes == expected_usage.usage_bytes
+    assert retrieved_store.stats.num_documents == 1
+
+    results = await vector_store_service.search(
+        vector_store_id=vector_store.id, query_vector=[1, 1, 1], limit=10, user=test_user
+    )
+    assert sorted(r.item.text for r in results) == ["Changed chunk", "Chunk 0", "New chunk"]
+
+    result = await vector_store_service.replace_document(
+        vector_store_id=vector_store.id, document_id="doc", items=[], user=test_user
+    )
+    assert result.deleted == 3
+    assert (await vector_store_service.get(vector_store_id=vector_store.id, user=test_user)).stats.num_documents == 0
+
+
+@pytest.mark.asyncio
+async def test_custom_index_settings(vector_store_service: VectorStoreService, uow_factory, test_user: User):
+    """Test that stores with custom HNSW settings are indexed in their own table and searchable with ef_search."""
+    index_settings = HnswIndexSettings(m=8, ef_construction=32)
+    vector_store = await vector_store_service.create(
+        name="test-index-settings", dimension=3, model_id="test_model", index_settings=index_settings, user=test_user
+    )
+    default_store = await vector_store_service.create(
+        name="test-default-index-settings", dimension=3, model_id="test_model", user=test_user
+    )
+    assert (await vector_store_service.get(vector_store_id=vector_store.id, user=test_user)).index_settings == (
+        index_settings
+    )
+
+    items = [
+        VectorStoreItem(document_id="doc", document_type=DocumentType.external, text=f"Chunk {i}", embedding=[i, 1, 1])
+        for i in range(3)
+    ]
+    await vector_store_service.add_items(vector_store_id=vector_store.id, items=items, user=test_user)
+    async with uow_factory.engine.begin() as connection:
+        index_definition = await connection.scalar(
+            text("SELECT indexdef FROM pg_indexes WHERE indexname = 'collections_dim_3_m8_ef32_vector_index'")
+        )
+    assert "halfvec_cosine_ops" in index_definition
+    assert "m='8'" in index_definition
+
+    results = await vector_store_service.search(
+        vector_store_id=vector_store.id, query_vector=[2, 1, 1], limit=1, ef_search=10, user=test_user
+    )
+    assert [r.item.text for r in results] == ["Chunk 2"]
+
+    report = await vector_store_service.recall_report(
+        vector_store_id=vector_store.id, sample_size=3, limit=3, ef_search=10, user=test_user
+    )
+    assert report.index_settings == index_settings
+    assert report.recall == pytest.approx(1.0)
+
+    with pytest.raises(IncompatibleVectorStoresError):
+        await vector_store_service.federated_search(
+            vector_store_ids=[vector_store.id, default_store.id], query_vector=[1, 1, 1], user=test_user
+        )
+
+
+@pytest.mark.asyncio
+async def test_search_by_query_text(vector_store_service: VectorStoreService, test_user: User, monkeypatch):
+    """Test that query_text is embedded using the model of the vector store and the embedding is cached."""
+    vector_store = await vector_store_service.create(
+        name="test-query-text", dimension=3, model_id="test_model", user=test_user
+    )
+    items = [
+        VectorStoreItem(
+            document_id="doc", document_type=DocumentType.external, text="Bees make honey", embedding=[1, 0, 0]
+        ),
+        VectorStoreItem(
+            document_id="doc", document_type=DocumentType.external, text="Ants dig tunnels", embedding=[0, 1, 0]
+        ),
+    ]
+    await vector_store_service.add_items(vector_store_id=vector_store.id, items=items, user=test_user)
+
+    embedded = []
+
+    async def get_query_env():
+        return {"EMBEDDING_API_BASE": "http://embeddings.test/v1", "EMBEDDING_API_KEY": "key"}
+
+    async def create_embedding(env, *, input, model=None, encoding_format=None):
+        embedded.append((model, input))
+        return openai.types.CreateEmbeddingResponse(
+            object="list",
+            model=model,
+            data=[openai.types.Embedding(object="embedding", index=0, embedding=[0.1, 1, 0])],
+            usage=openai.types.create_embedding_response.Usage(prompt_tokens=1, total_tokens=1),
+        )
+
+    embedding_service = vector_store_service._embedding_service
+    monkeypatch.setattr(embedding_service, "_get_query_env", get_query_env)
+    monkeypatch.setattr(embedding_service, "_create_embedding", create_embedding)
+
+    for _ in range(2):
+        results = await vector_store_service.search(
+            vector_store_id=vector_store.id, query_text="what do ants do", limit=1, user=test_user
+        )
+        assert [r.item.text for r in results] == ["Ants dig tunnels"]
+    assert embedded == [("test_model", ["what do ants do"])]
+
+    results = await vector_store_service.search(
+        vector_store_id=vector_store.id, query_text="honey", mode=SearchMode.hybrid, limit=2, user=test_user
+    )
+    assert {r.item.text for r in results} == {"Bees make honey", "Ants dig tunnels"}
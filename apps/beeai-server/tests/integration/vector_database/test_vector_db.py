@@ -1,15 +1,25 @@
 # Copyright 2025 © BeeAI a Series of LF Projects, LLC
 # SPDX-License-Identifier: Apache-2.0
 
+import base64
 import uuid
 from uuid import UUID
 
+import numpy as np
 import pytest
 import pytest_asyncio
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncConnection
 
-from beeai_server.domain.models.vector_store import VectorStoreItem, VectorStoreSearchResult
+from beeai_server.configuration import VectorStoresConfiguration
+from beeai_server.domain.models.vector_store import (
+    EmbeddingFormat,
+    VectorQuantization,
+    VectorStoreItem,
+    VectorStoreItemField,
+    VectorStoreSearchResult,
+)
+from beeai_server.infrastructure.vector_database import vector_db
 from beeai_server.infrastructure.vector_database.vector_db import VectorDatabaseRepository
 
 pytestmark = pytest.mark.integration
@@ -18,7 +28,11 @@ pytestmark = pytest.mark.integration
 @pytest_asyncio.fixture
 async def vector_db_repository(db_transaction: AsyncConnection) -> VectorDatabaseRepository:
     """Create a VectorDatabaseRepository instance for testing."""
-    return VectorDatabaseRepository(connection=db_transaction, schema_name="vector_db")
+    return VectorDatabaseRepository(
+        connection=db_transaction,
+        schema_name="vector_db",
+        quantization_oversampling=VectorStoresConfiguration().quantization_oversampling,
+    )
 
 
 @pytest_asyncio.fixture
@@ -75,22 +89,26 @@ async def test_create_collection(
 
 
 @pytest.mark.asyncio
-async def test_create_collection_with_unsupported_dimension(
+async def test_create_collection_with_uncommon_dimension(
     vector_db_repository: VectorDatabaseRepository,
     test_collection_id: UUID,
     db_transaction: AsyncConnection,
 ):
-    """Test creating collection with unsupported dimension uses closest supported dimension."""
-    dimension = 100  # Not in SUPPORTED_DIMENSIONS, should use 64 (largest <= 100)
+    """Test that collections are stored in a table with the exact dimension."""
+    dimension = 1000
 
-    # Create collection
     await vector_db_repository.create_collection(test_collection_id, dimension)
+    await vector_db_repository.add_items(
+        test_collection_id,
+        [VectorStoreItem(document_id="doc_001", embedding=[1.0] * dimension, text="Uncommon dimension")],
+    )
 
-    # Verify table was created with supported dimension (64)
     result = await db_transaction.execute(
-        text("SELECT tablename FROM pg_tables WHERE schemaname = 'vector_db' AND tablename = 'collections_dim_64'")
+        text("SELECT tablename FROM pg_tables WHERE schemaname = 'vector_db' AND tablename = 'collections_dim_1000'")
     )
     assert result.fetchone() is not None
+    results = list(await vector_db_repository.similarity_search(test_collection_id, [1.0] * dimension, limit=1))
+    assert results[0].item.text == "Uncommon dimension"
 
 
 @pytest.mark.asyncio
@@ -404,25 +422,23 @@ async def test_different_dimensions_use_different_tables(
 
 
 @pytest.mark.asyncio
-async def test_dimension_mapping_to_supported_dimensions(
+async def test_created_tables_are_cached_after_commit(
     vector_db_repository: VectorDatabaseRepository,
+    test_collection_id: UUID,
+    db_transaction: AsyncConnection,
 ):
-    """Test that dimensions are mapped to supported dimensions correctly."""
-    # Test various dimension mappings - function returns highest supported dimension <= input
-    # For inputs smaller than minimum supported, it returns the minimum supported dimension
-    test_cases = [
-        (50, 64),  # 50 -> 64 (minimum supported dimension, since 50 < 64)
-        (64, 64),  # 64 -> 64 (exact match)
-        (100, 64),  # 100 -> 64 (largest supported <= 100)
-        (128, 128),  # 128 -> 128 (exact match)
-        (200, 128),  # 200 -> 128 (largest supported <= 200)
-        (1000, 896),  # 1000 -> 896 (largest supported <= 1000)
-        (5000, 4000),  # 5000 -> 4000 (highest supported)
-    ]
+    """Test that table creation is only cached once the creating transaction is committed."""
+    table = vector_db_repository._get_table(128)
+
+    await vector_db_repository.create_collection(test_collection_id, 128)
+    assert table.fullname not in vector_db._created_tables
 
-    for input_dim, expected_dim in test_cases:
-        mapped_dim = vector_db_repository._get_supported_dimension(input_dim)
-        assert mapped_dim == expected_dim, f"Input {input_dim} should map to {expected_dim}, got {mapped_dim}"
+    # The test transaction is rolled back, only simulate the commit event
+    vector_db_repository._on_commit(db_transaction.sync_connection)
+    try:
+        assert table.fullname in vector_db._created_tables
+    finally:
+        vector_db.clear_created_tables_cache()
 
 
 @pytest.mark.asyncio
@@ -443,3 +459,185 @@ async def test_get_item_size_calculation(
     # Different items should have different sizes
     sizes = [vector_db_repository._get_item_size(item) for item in sample_vector_items]
     assert len(set(sizes)) > 1  # At least some items should have different sizes
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search(
+    vector_db_repository: VectorDatabaseRepository,
+    test_collection_id: UUID,
+    sample_vector_items: list[VectorStoreItem],
+):
+    """Test hybrid search fuses full-text matches with vector similarity."""
+    dimension = 128
+
+    await vector_db_repository.create_collection(test_collection_id, dimension)
+    await vector_db_repository.add_items(test_collection_id, sample_vector_items)
+
+    # Query vector is closest to the "quick brown fox" item, but the text matches the "vector databases" item
+    query_vector = [1.1] * 128
+    results = list(
+        await vector_db_repository.hybrid_search(
+            test_collection_id, query_vector, query_text="vector database similarity", limit=3
+        )
+    )
+
+    assert len(results) == 3
+    # The item matched by both the text and vector queries gets the highest fused score
+    assert results[0].item.text == "Vector databases enable efficient similarity search."
+    assert all(results[i].score >= results[i + 1].score for i in range(len(results) - 1))
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_without_text_matches(
+    vector_db_repository: VectorDatabaseRepository,
+    test_collection_id: UUID,
+    sample_vector_items: list[VectorStoreItem],
+):
+    """Test hybrid search falls back to vector ranking when no text matches."""
+    dimension = 128
+
+    await vector_db_repository.create_collection(test_collection_id, dimension)
+    await vector_db_repository.add_items(test_collection_id, sample_vector_items)
+
+    results = list(
+        await vector_db_repository.hybrid_search(test_collection_id, [1.1] * 128, query_text="nonexistentword", limit=2)
+    )
+
+    assert len(results) == 2
+    assert results[0].item.text == "The quick brown fox jumps over the lazy dog."
+
+
+@pytest.mark.asyncio
+async def test_batch_similarity_search(
+    vector_db_repository: VectorDatabaseRepository,
+    test_collection_id: UUID,
+    sample_vector_items: list[VectorStoreItem],
+):
+    """Test batch similarity search returns results for each query vector in order."""
+    dimension = 128
+
+    await vector_db_repository.create_collection(test_collection_id, dimension)
+    await vector_db_repository.add_items(test_collection_id, sample_vector_items)
+
+    query_vectors = [[1.0] * 127 + [4.0], [1.0] * 127 + [-4.0], [1.0] * 128]
+    results = await vector_db_repository.batch_similarity_search(test_collection_id, query_vectors, limit=2)
+
+    assert len(results) == len(query_vectors)
+    for query_vector, query_results in zip(query_vectors, results, strict=True):
+        single_results = list(await vector_db_repository.similarity_search(test_collection_id, query_vector, limit=2))
+        assert [r.item.id for r in query_results] == [r.item.id for r in single_results]
+
+
+@pytest.mark.asyncio
+async def test_similarity_search_field_selection(
+    vector_db_repository: VectorDatabaseRepository,
+    test_collection_id: UUID,
+    sample_vector_items: list[VectorStoreItem],
+):
+    """Test that only the requested item fields are returned."""
+    await vector_db_repository.create_collection(test_collection_id, 128)
+    await vector_db_repository.add_items(test_collection_id, sample_vector_items)
+
+    results = list(
+        await vector_db_repository.similarity_search(
+            test_collection_id, [1.1] * 128, limit=1, include=[VectorStoreItemField.text]
+        )
+    )
+
+    assert results[0].item.text == "The quick brown fox jumps over the lazy dog."
+    assert results[0].item.embedding is None
+    assert results[0].item.metadata is None
+
+
+@pytest.mark.asyncio
+async def test_similarity_search_base64_embedding(
+    vector_db_repository: VectorDatabaseRepository,
+    test_collection_id: UUID,
+    sample_vector_items: list[VectorStoreItem],
+):
+    """Test that embeddings can be returned as base64 encoded float16 values."""
+    await vector_db_repository.create_collection(test_collection_id, 128)
+    await vector_db_repository.add_items(test_collection_id, sample_vector_items)
+
+    results = list(
+        await vector_db_repository.similarity_search(
+            test_collection_id, [1.1] * 128, limit=1, embedding_format=EmbeddingFormat.base64
+        )
+    )
+
+    embedding = np.frombuffer(base64.b64decode(results[0].item.embedding), dtype="<f2")
+    assert embedding.tolist() == [1.0] * 128
+
+
+@pytest.mark.asyncio
+async def test_binary_quantized_search_matches_exact_search(
+    vector_db_repository: VectorDatabaseRepository,
+    test_collection_id: UUID,
+):
+    """Test that binary quantized search re-ranks candidates using the full precision embeddings."""
+    rng = np.random.default_rng(42)
+    items = [
+        VectorStoreItem(document_id=f"doc_{i:03d}", embedding=rng.standard_normal(128).tolist(), text=f"Item {i}")
+        for i in range(50)
+    ]
+    await vector_db_repository.create_collection(test_collection_id, 128, quantization=VectorQuantization.binary)
+    await vector_db_repository.add_items(test_collection_id, items, quantization=VectorQuantization.binary)
+
+    query_vector = items[7].embedding
+    results = list(
+        await vector_db_repository.similarity_search(
+            test_collection_id, query_vector, limit=5, quantization=VectorQuantization.binary, oversampling=10
+        )
+    )
+    exact_results = list(
+        await vector_db_repository.exact_search(
+            test_collection_id, query_vector, limit=5, quantization=VectorQuantization.binary
+        )
+    )
+
+    assert results[0].item.id == items[7].id
+    assert [r.item.id for r in results] == [r.item.id for r in exact_results]
+    assert results[0].score == pytest.approx(1.0, abs=1e-3)
+
+
+@pytest.mark.asyncio
+async def test_sample_embeddings(
+    vector_db_repository: VectorDatabaseRepository,
+    test_collection_id: UUID,
+    sample_vector_items: list[VectorStoreItem],
+):
+    """Test that stored embeddings can be sampled to be used as query vectors."""
+    await vector_db_repository.create_collection(test_collection_id, 128)
+    await vector_db_repository.add_items(test_collection_id, sample_vector_items)
+
+    embeddings = await vector_db_repository.sample_embeddings(test_collection_id, 128, sample_size=2)
+
+    assert len(embeddings) == 2
+    assert all(embedding in [item.embedding for item in sample_vector_items] for embedding in embeddings)
+
+
+@pytest.mark.asyncio
+async def test_federated_search(
+    vector_db_repository: VectorDatabaseRepository,
+    sample_vector_items: list[VectorStoreItem],
+):
+    """Test that multiple collections are searched at once and ranked globally."""
+    collection_1, collection_2, collection_3 = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    for collection_id in (collection_1, collection_2, collection_3):
+        await vector_db_repository.create_collection(collection_id, 128)
+    await vector_db_repository.add_items(
+        collection_1, [VectorStoreItem(document_id="doc_1", embedding=[1.0] * 127 + [2.0], text="First")]
+    )
+    await vector_db_repository.add_items(
+        collection_2, [VectorStoreItem(document_id="doc_2", embedding=[1.0] * 128, text="Second")]
+    )
+    await vector_db_repository.add_items(
+        collection_3, [VectorStoreItem(document_id="doc_3", embedding=[1.0] * 128, text="Not searched")]
+    )
+
+    results = list(await vector_db_repository.federated_search([collection_1, collection_2], [1.0] * 128, limit=5))
+
+    assert [(r.item.text, r.item.vector_store_id) for r in results] == [
+        ("Second", collection_2),
+        ("First", collection_1),
+    ]
@@ -0,0 +1,82 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+import hashlib
+import uuid
+from pathlib import Path
+
+import pytest
+
+from beeai_server.configuration import Configuration, ObjectStorageConfiguration
+from beeai_server.domain.models.file import AsyncFile
+from beeai_server.exceptions import EntityNotFoundError
+from beeai_server.infrastructure.object_storage.filesystem import FilesystemObjectStorageRepository
+
+pytestmark = pytest.mark.unit
+
+CONTENT = bytes(range(256)) * 4000
+
+
+def async_file(content: bytes) -> AsyncFile:
+    offset = 0
+
+    async def read(size: int = -1) -> bytes:
+        nonlocal offset
+        chunk = content[offset : offset + size] if size >= 0 else content[offset:]
+        offset += len(chunk)
+        return chunk
+
+    return AsyncFile(filename="data.bin", content_type="application/octet-stream", read=read)
+
+
+@pytest.fixture
+def repository(tmp_path: Path) -> FilesystemObjectStorageRepository:
+    configuration = Configuration(
+        object_storage=ObjectStorageConfiguration(backend="filesystem", filesystem_root_dir=tmp_path)
+    )
+    return FilesystemObjectStorageRepository(configuration)
+
+
+@pytest.mark.asyncio
+async def test_upload_and_get_file(repository: FilesystemObjectStorageRepository, tmp_path: Path):
+    file_id = uuid.uuid4()
+    uploaded = await repository.upload_file(file_id=file_id, file=async_file(CONTENT))
+    assert (uploaded.size, uploaded.checksum_sha256) == (len(CONTENT), hashlib.sha256(CONTENT).hexdigest())
+    assert not list((tmp_path / ".tmp").iterdir())
+
+    metadata = await repository.get_file_metadata(file_id=file_id)
+    assert (metadata.filename, metadata.content_length) == ("data.bin", len(CONTENT))
+
+    async with repository.get_file(file_id=file_id) as file:
+        assert file.path.read_bytes() == CONTENT
+        assert await file.read(-1) == CONTENT
+
+    async with repository.get_file(file_id=file_id, byte_range=(10, 1009)) as file:
+        assert (file.size, file.path) == (1000, None)
+        content = b""
+        while chunk := await file.read(333):
+            content += chunk
+        assert content == CONTENT[10:1010]
+
+    await repository.delete_file(file_id=file_id)
+    with pytest.raises(EntityNotFoundError):
+        await repository.get_file_metadata(file_id=file_id)
+
+
+@pytest.mark.asyncio
+async def test_failed_upload(repository: FilesystemObjectStorageRepository, tmp_path: Path):
+    file = async_file(CONTENT)
+    read = file.read
+
+    async def failing_read(size: int = -1) -> bytes:
+        if chunk := await read(size):
+            return chunk
+        raise ConnectionError("Client disconnected")
+
+    file_id = uuid.uuid4()
+    with pytest.raises(ConnectionError):
+        await repository.upload_file(file_id=file_id, file=file.model_copy(update={"read": failing_read}))
+    assert not list((tmp_path / ".tmp").iterdir())
+    with pytest.raises(EntityNotFoundError):
+        async with repository.get_file(file_id=file_id):
+            pass
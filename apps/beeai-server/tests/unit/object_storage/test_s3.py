@@ -0,0 +1,260 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import base64
+import hashlib
+import random
+import uuid
+
+import pytest
+from aiobotocore.response import StreamingBody
+from botocore.exceptions import ClientError
+
+from beeai_server.configuration import Configuration, ObjectStorageConfiguration
+from beeai_server.domain.models.file import AsyncFile
+from beeai_server.infrastructure.object_storage.repository import S3ObjectStorageRepository
+
+pytestmark = pytest.mark.unit
+
+CONTENT = bytes(range(256)) * 40
+
+
+class FakeStream:
+    """Content of the aiohttp response, returns at most chunk_size bytes per read like a chunked HTTP body."""
+
+    def __init__(self, content: bytes, chunk_size: int):
+        self._content = content
+        self._chunk_size = chunk_size
+
+    async def read(self, amount: int = -1) -> bytes:
+        amount = self._chunk_size if amount < 0 else min(amount, self._chunk_size)
+        chunk, self._content = self._content[:amount], self._content[amount:]
+        return chunk
+
+
+class FakeClientResponse:
+    """The aiohttp response wrapped by StreamingBody, its read() does not accept an amount."""
+
+    def __init__(self, content: bytes, chunk_size: int):
+        self.content = FakeStream(content, chunk_size)
+        self.released = False
+
+    async def read(self) -> bytes:
+        raise AssertionError("The body must be read through the StreamingBody")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.released = True
+
+
+class FakeS3Client:
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.responses: list[FakeClientResponse] = []
+
+    async def get_object(self, **kwargs) -> dict:
+        content = self.objects[kwargs["Key"]]
+        if byte_range := kwargs.get("Range"):
+            start, end = byte_range.removeprefix("bytes=").split("-")
+            content = content[int(start) : int(end) + 1]
+        response = FakeClientResponse(content, chunk_size=1000)
+        self.responses.append(response)
+        return {
+            "Body": StreamingBody(response, str(len(content))),
+            "Metadata": {"filename": "data.bin"},
+            "ContentType": "application/octet-stream",
+            "ContentLength": len(content),
+        }
+
+
+@pytest.fixture
+def client() -> FakeS3Client:
+    return FakeS3Client()
+
+
+@pytest.fixture
+def repository(client: FakeS3Client, monkeypatch) -> S3ObjectStorageRepository:
+    repository = S3ObjectStorageRepository(Configuration(object_storage=ObjectStorageConfiguration()))
+
+    async def get_client(*, public: bool = False) -> FakeS3Client:
+        return client
+
+    monkeypatch.setattr(repository, "_get_client", get_client)
+    return repository
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("byte_range", [None, (10, 5009)])
+async def test_get_file_reads_chunked_body(
+    repository: S3ObjectStorageRepository, client: FakeS3Client, byte_range: tuple[int, int] | None
+):
+    file_id = uuid.uuid4()
+    client.objects[f"files/{file_id}"] = CONTENT
+    expected = CONTENT[byte_range[0] : byte_range[1] + 1] if byte_range else CONTENT
+
+    async with repository.get_file(file_id=file_id, byte_range=byte_range) as file:
+        assert file.size == len(expected)
+        content = bytearray()
+        while chunk := await file.read(4096):
+            assert len(chunk) <= 1000
+            content += chunk
+    assert content == expected
+    assert client.responses[0].released
+
+
+@pytest.mark.asyncio
+async def test_get_file_releases_partially_read_body(repository: S3ObjectStorageRepository, client: FakeS3Client):
+    file_id = uuid.uuid4()
+    client.objects[f"files/{file_id}"] = CONTENT
+
+    async with repository.get_file(file_id=file_id) as file:
+        assert await file.read(10) == CONTENT[:10]
+    assert client.responses[0].released
+
+
+class FakeMultipartS3Client(FakeS3Client):
+    """Records the multipart uploads, each part upload takes a while so that the concurrency can be observed."""
+
+    def __init__(self, fail_part: int | None = None, delay: float = 0.01):
+        super().__init__()
+        self.calls: list[str] = []
+        self.parts: dict[int, bytes] = {}
+        self.active_uploads = 0
+        self.max_active_uploads = 0
+        self._fail_part = fail_part
+        self._delay = delay
+
+    async def put_object(self, **kwargs) -> dict:
+        self.calls.append("put_object")
+        assert kwargs["ContentMD5"] == base64.b64encode(hashlib.md5(kwargs["Body"]).digest()).decode()
+        self.objects[kwargs["Key"]] = kwargs["Body"]
+        return {}
+
+    async def create_multipart_upload(self, **kwargs) -> dict:
+        self.calls.append("create_multipart_upload")
+        return {"UploadId": "upload-id"}
+
+    async def upload_part(self, **kwargs) -> dict:
+        assert kwargs["UploadId"] == "upload-id"
+        assert kwargs["ContentMD5"] == base64.b64encode(hashlib.md5(kwargs["Body"]).digest()).decode()
+        self.active_uploads += 1
+        self.max_active_uploads = max(self.max_active_uploads, self.active_uploads)
+        try:
+            await asyncio.sleep(self._delay)
+            if kwargs["PartNumber"] == self._fail_part:
+                raise ClientError({"Error": {"Code": "InternalError"}}, "UploadPart")
+            self.parts[kwargs["PartNumber"]] = kwargs["Body"]
+            return {"ETag": f"etag-{kwargs['PartNumber']}"}
+        finally:
+            self.active_uploads -= 1
+
+    async def complete_multipart_upload(self, **kwargs) -> dict:
+        self.calls.append("complete_multipart_upload")
+        parts = kwargs["MultipartUpload"]["Parts"]
+        assert parts == [{"PartNumber": n, "ETag": f"etag-{n}"} for n in range(1, len(self.parts) + 1)]
+        self.objects[kwargs["Key"]] = b"".join(self.parts[p["PartNumber"]] for p in parts)
+        return {}
+
+    async def abort_multipart_upload(self, **kwargs) -> dict:
+        self.calls.append("abort_multipart_upload")
+        return {}
+
+
+PART_SIZE = 5 * 1024 * 1024
+
+
+def multipart_repository(client: FakeMultipartS3Client, monkeypatch, concurrency: int = 2) -> S3ObjectStorageRepository:
+    configuration = ObjectStorageConfiguration(multipart_chunk_size=PART_SIZE, multipart_max_concurrency=concurrency)
+    repository = S3ObjectStorageRepository(Configuration(object_storage=configuration))
+
+    async def get_client(*, public: bool = False) -> FakeMultipartS3Client:
+        return client
+
+    monkeypatch.setattr(repository, "_get_client", get_client)
+    return repository
+
+
+def async_file(content: bytes, read_size: int = 1024 * 1024) -> AsyncFile:
+    """File whose reads return at most read_size bytes, parts are assembled from several reads."""
+
+    async def read(amount: int = -1) -> bytes:
+        nonlocal content
+        amount = min(read_size, len(content) if amount < 0 else amount)
+        chunk, content = content[:amount], content[amount:]
+        return chunk
+
+    return AsyncFile(filename="data.bin", content_type="application/octet-stream", read=read)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("size", "expected_calls", "expected_parts"),
+    [
+        (0, ["put_object"], 0),
+        (PART_SIZE - 1, ["put_object"], 0),
+        (PART_SIZE, ["create_multipart_upload", "complete_multipart_upload"], 1),
+        (PART_SIZE + 1, ["create_multipart_upload", "complete_multipart_upload"], 2),
+        (3 * PART_SIZE, ["create_multipart_upload", "complete_multipart_upload"], 3),
+    ],
+)
+async def test_upload_file_part_boundaries(monkeypatch, size: int, expected_calls: list[str], expected_parts: int):
+    client = FakeMultipartS3Client()
+    repository = multipart_repository(client, monkeypatch)
+    content = random.Random(size).randbytes(size)
+    file_id = uuid.uuid4()
+
+    uploaded = await repository.upload_file(file_id=file_id, file=async_file(content))
+
+    assert client.calls == expected_calls
+    assert len(client.parts) == expected_parts
+    assert all(len(part) == PART_SIZE for number, part in client.parts.items() if number < expected_parts)
+    assert client.objects[f"files/{file_id}"] == content
+    assert uploaded.size == size
+    assert uploaded.checksum_sha256 == hashlib.sha256(content).hexdigest()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("concurrency", [1, 3])
+async def test_upload_file_concurrency_is_bounded(monkeypatch, concurrency: int):
+    # Slower than reading and hashing the next parts, the uploads pile up to the limit
+    client = FakeMultipartS3Client(delay=0.5)
+    repository = multipart_repository(client, monkeypatch, concurrency=concurrency)
+
+    await repository.upload_file(file_id=uuid.uuid4(), file=async_file(bytes(6 * PART_SIZE)))
+
+    assert len(client.parts) == 6
+    assert client.max_active_uploads == concurrency
+
+
+@pytest.mark.asyncio
+async def test_upload_file_is_aborted_on_failure(monkeypatch):
+    client = FakeMultipartS3Client(fail_part=2)
+    repository = multipart_repository(client, monkeypatch)
+
+    with pytest.raises(ClientError):
+        await repository.upload_file(file_id=uuid.uuid4(), file=async_file(bytes(4 * PART_SIZE)))
+
+    assert client.calls == ["create_multipart_upload", "abort_multipart_upload"]
+    assert client.active_uploads == 0
+
+
+@pytest.mark.asyncio
+async def test_upload_file_is_aborted_on_read_failure(monkeypatch):
+    client = FakeMultipartS3Client()
+    repository = multipart_repository(client, monkeypatch)
+    file = async_file(bytes(3 * PART_SIZE))
+    read = file.read
+
+    async def failing_read(amount: int = -1) -> bytes:
+        if len(client.parts) >= 1:
+            raise ConnectionError("client disconnected")
+        return await read(amount)
+
+    with pytest.raises(ConnectionError):
+        await repository.upload_file(file_id=uuid.uuid4(), file=file.model_copy(update={"read": failing_read}))
+
+    assert client.calls == ["create_multipart_upload", "abort_multipart_upload"]
+    assert client.active_uploads == 0
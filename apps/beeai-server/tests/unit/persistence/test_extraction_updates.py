@@ -0,0 +1,102 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import uuid
+
+import pytest
+
+from beeai_server.configuration import Configuration
+from beeai_server.domain.models.file import TextExtractionUpdate
+from beeai_server.infrastructure.persistence.extraction_updates import PostgresExtractionUpdateListener
+from beeai_server.infrastructure.persistence.repositories.file import EXTRACTION_UPDATES_CHANNEL
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def listener(monkeypatch) -> PostgresExtractionUpdateListener:
+    listener = PostgresExtractionUpdateListener(Configuration())
+
+    async def ensure_listening() -> None:
+        pass
+
+    monkeypatch.setattr(listener, "_ensure_listening", ensure_listening)
+    return listener
+
+
+def notify(listener: PostgresExtractionUpdateListener, update: TextExtractionUpdate | str) -> None:
+    """Deliver a notification as asyncpg would call the listener."""
+    payload = update if isinstance(update, str) else update.model_dump_json()
+    listener._on_notification(None, 0, EXTRACTION_UPDATES_CHANNEL, payload)
+
+
+async def receive(updates) -> TextExtractionUpdate | None:
+    try:
+        async with asyncio.timeout(0.1):
+            return await anext(updates)
+    except TimeoutError:
+        return None
+
+
+@pytest.mark.asyncio
+async def test_updates_are_dispatched_to_subscribers_of_the_file(listener: PostgresExtractionUpdateListener):
+    file_id, other_file_id = uuid.uuid4(), uuid.uuid4()
+    async with (
+        listener.subscribe(file_id=file_id) as first,
+        listener.subscribe(file_id=file_id) as second,
+        listener.subscribe(file_id=other_file_id) as other,
+    ):
+        update = TextExtractionUpdate(file_id=file_id, progress_bytes=10)
+        notify(listener, update)
+        assert await receive(first) == update
+        assert await receive(second) == update
+        assert await receive(other) is None
+
+        # Every update is queued in order until it is read
+        notify(listener, TextExtractionUpdate(file_id=other_file_id, progress_bytes=1))
+        notify(listener, TextExtractionUpdate(file_id=other_file_id))
+        assert await receive(other) == TextExtractionUpdate(file_id=other_file_id, progress_bytes=1)
+        assert await receive(other) == TextExtractionUpdate(file_id=other_file_id)
+        assert await receive(first) is None
+
+
+@pytest.mark.asyncio
+async def test_invalid_notification_is_ignored(listener: PostgresExtractionUpdateListener):
+    file_id = uuid.uuid4()
+    async with listener.subscribe(file_id=file_id) as updates:
+        notify(listener, '{"file_id": "not-an-uuid"}')
+        notify(listener, TextExtractionUpdate(file_id=file_id))
+        assert await receive(updates) == TextExtractionUpdate(file_id=file_id)
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe_removes_the_queue(listener: PostgresExtractionUpdateListener):
+    file_id = uuid.uuid4()
+    async with listener.subscribe(file_id=file_id):
+        async with listener.subscribe(file_id=file_id):
+            assert len(listener._subscribers[file_id]) == 2
+        assert len(listener._subscribers[file_id]) == 1
+    assert file_id not in listener._subscribers
+
+    # Updates of files without subscribers are dropped
+    notify(listener, TextExtractionUpdate(file_id=file_id))
+    assert file_id not in listener._subscribers
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe_on_error(listener: PostgresExtractionUpdateListener):
+    file_id = uuid.uuid4()
+    with pytest.raises(RuntimeError):
+        async with listener.subscribe(file_id=file_id):
+            raise RuntimeError("stream closed")
+    assert not listener._subscribers
+
+
+@pytest.mark.asyncio
+async def test_updates_can_be_read_after_a_timeout(listener: PostgresExtractionUpdateListener):
+    file_id = uuid.uuid4()
+    async with listener.subscribe(file_id=file_id) as updates:
+        assert await receive(updates) is None
+        notify(listener, TextExtractionUpdate(file_id=file_id))
+        assert await receive(updates) == TextExtractionUpdate(file_id=file_id)
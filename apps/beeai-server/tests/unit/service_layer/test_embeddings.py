@@ -0,0 +1,91 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import openai.types
+import pytest
+
+from beeai_server.configuration import Configuration, VectorStoresConfiguration
+from beeai_server.service_layer.services.embeddings import EmbeddingService
+
+pytestmark = pytest.mark.unit
+
+ENV = {"EMBEDDING_API_BASE": "http://embeddings.test/v1", "EMBEDDING_API_KEY": "key", "EMBEDDING_MODEL": "model"}
+
+
+class FakeEmbeddingService(EmbeddingService):
+    """Embeds texts as [len(text), number of the call] and counts the platform env reads."""
+
+    def __init__(self, configuration: Configuration):
+        self.env = dict(ENV)
+        self.env_reads = 0
+        self.embedded: list[tuple[str, str, str]] = []
+
+        @asynccontextmanager
+        async def uow():
+            async def get_all() -> dict[str, str]:
+                self.env_reads += 1
+                return dict(self.env)
+
+            yield SimpleNamespace(env=SimpleNamespace(get_all=get_all))
+
+        super().__init__(uow, configuration)
+
+    async def _create_embedding(self, env, *, input, model=None, encoding_format=None):
+        self.embedded.extend((env["EMBEDDING_API_BASE"], model, text) for text in input)
+        return openai.types.CreateEmbeddingResponse(
+            object="list",
+            model=model,
+            data=[openai.types.Embedding(object="embedding", index=0, embedding=[len(input[0]), len(self.embedded)])],
+            usage=openai.types.create_embedding_response.Usage(prompt_tokens=1, total_tokens=1),
+        )
+
+
+def _service(**config) -> FakeEmbeddingService:
+    return FakeEmbeddingService(Configuration(vector_stores=VectorStoresConfiguration(**config)))
+
+
+@pytest.mark.asyncio
+async def test_embed_query_cache_hit_and_miss():
+    service = _service()
+    assert await service.embed_query("query", model_id="model") == [5, 1]
+    assert await service.embed_query("query", model_id="model") == [5, 1]
+    assert service.embedded == [(ENV["EMBEDDING_API_BASE"], "model", "query")]
+
+    # Different text or model is a miss
+    assert await service.embed_query("other query", model_id="model") == [11, 2]
+    assert await service.embed_query("query", model_id="other_model") == [5, 3]
+    assert len(service.embedded) == 3
+
+
+@pytest.mark.asyncio
+async def test_embed_query_cache_hit_does_not_read_env():
+    service = _service()
+    for _ in range(5):
+        await service.embed_query("query", model_id="model")
+    assert service.env_reads == 1
+
+
+@pytest.mark.asyncio
+async def test_embed_query_cache_eviction():
+    service = _service(query_embedding_cache_size=2)
+    for text in ["a", "b", "a", "c"]:  # "b" is the least recently used when "c" is added
+        await service.embed_query(text, model_id="model")
+    assert [text for *_, text in service.embedded] == ["a", "b", "c"]
+
+    await service.embed_query("a", model_id="model")
+    await service.embed_query("b", model_id="model")
+    assert [text for *_, text in service.embedded] == ["a", "b", "c", "b"]
+
+
+@pytest.mark.asyncio
+async def test_embed_query_env_refresh():
+    service = _service(query_embedding_env_ttl_seconds=0)
+    await service.embed_query("query", model_id="model")
+    service.env["EMBEDDING_API_BASE"] = "http://other-embeddings.test/v1"
+    # The backend is part of the cache key, queries are embedded again by the new backend
+    await service.embed_query("query", model_id="model")
+    assert service.env_reads == 2
+    assert [base for base, *_ in service.embedded] == [ENV["EMBEDDING_API_BASE"], "http://other-embeddings.test/v1"]
@@ -0,0 +1,432 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from types import SimpleNamespace
+from uuid import UUID
+
+import pytest
+from cryptography.fernet import Fernet
+from pydantic import Secret
+
+from beeai_server.configuration import Configuration, ObjectStorageConfiguration, PersistenceConfiguration
+from beeai_server.domain.models.file import (
+    AsyncFile,
+    CompletedUploadPart,
+    ExtractionStatus,
+    File,
+    FileMetadata,
+    FileUploadSession,
+    PresignedUploadPart,
+    TextExtraction,
+    TextExtractionUpdate,
+    UploadedFileInfo,
+)
+from beeai_server.domain.models.user import User
+from beeai_server.exceptions import EntityNotFoundError, StorageCapacityExceededError
+from beeai_server.service_layer.services import files as files_service
+from beeai_server.service_layer.services.files import FileService
+from beeai_server.utils.utils import utc_now
+
+pytestmark = pytest.mark.unit
+
+MAX_FILE_SIZE = 1000
+MAX_USER_STORAGE = 2000
+MULTIPART_SIZE = 100
+
+
+class FakeFileRepository:
+    def __init__(self):
+        self.files: dict[UUID, File] = {}
+        self.extractions: dict[UUID, TextExtraction] = {}
+
+    async def total_usage(self, *, user_id: UUID | None = None) -> int:
+        return sum(f.file_size_bytes or 0 for f in self.files.values() if user_id in (None, f.created_by))
+
+    async def get(self, *, file_id: UUID, user_id: UUID | None = None, file_type=None) -> File:
+        file = self.files.get(file_id)
+        if not file or (user_id and file.created_by != user_id):
+            raise EntityNotFoundError(entity="file", id=file_id)
+        return file
+
+    async def get_extraction_by_file_id(self, *, file_id: UUID, user_id: UUID | None = None) -> TextExtraction:
+        await self.get(file_id=file_id, user_id=user_id)
+        if file_id not in self.extractions:
+            raise EntityNotFoundError(entity="text_extraction", id=file_id)
+        return self.extractions[file_id].model_copy()
+
+    async def create(self, *, file: File) -> None:
+        self.files[file.id] = file
+
+    async def add_object_reference(self, *, object_id: UUID, checksum_sha256: str, size: int) -> UUID:
+        return object_id
+
+
+class FakeUnitOfWork:
+    def __init__(self, files: FakeFileRepository):
+        self.files = files
+        self.committed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    async def commit(self) -> None:
+        self.committed = True
+
+
+class FakeObjectStorage:
+    """Object storage with direct uploads, files larger than MULTIPART_SIZE use a multipart upload."""
+
+    def __init__(self):
+        self.objects: dict[UUID, bytes] = {}
+        self.metadata: dict[UUID, FileMetadata] = {}
+        self.uploads: dict[str, tuple[UUID, FileMetadata]] = {}
+
+    async def create_upload(
+        self, *, file_id: UUID, filename: str, content_type: str, size: int, created_by: UUID
+    ) -> FileUploadSession:
+        metadata = FileMetadata(
+            content_type=content_type, filename=filename, content_length=size, created_by=created_by
+        )
+        upload_id = f"upload.{file_id}" if size > MULTIPART_SIZE else None
+        if upload_id:
+            self.uploads[upload_id] = (file_id, metadata)
+        else:
+            self.metadata[file_id] = metadata  # the client uploads the object directly
+        return FileUploadSession(
+            file_id=file_id,
+            upload_id=upload_id,
+            parts=[PresignedUploadPart(part_number=1, size=size, url="http://storage.test/upload")],
+            expires_at=utc_now() + timedelta(hours=1),
+        )
+
+    async def complete_upload(self, *, file_id: UUID, upload_id: str | None = None, parts=()) -> FileMetadata:
+        if upload_id is not None:
+            if upload_id not in self.uploads or self.uploads[upload_id][0] != file_id:
+                raise EntityNotFoundError(entity="file_upload", id=upload_id)
+            self.metadata[file_id] = self.uploads.pop(upload_id)[1]
+        return self.metadata[file_id]
+
+    async def abort_upload(self, *, file_id: UUID, upload_id: str) -> None:
+        if upload_id not in self.uploads or self.uploads[upload_id][0] != file_id:
+            raise EntityNotFoundError(entity="file_upload", id=upload_id)
+        del self.uploads[upload_id]
+
+    async def upload_file(self, *, file_id: UUID, file: AsyncFile) -> UploadedFileInfo:
+        content = bytearray()
+        while chunk := await file.read(100):
+            content += chunk
+        self.objects[file_id] = bytes(content)
+        return UploadedFileInfo(size=len(content), checksum_sha256="checksum")
+
+    async def delete_file(self, *, file_id: UUID) -> None:
+        self.objects.pop(file_id, None)
+        self.metadata.pop(file_id, None)
+
+
+class FakeExtractionUpdateListener:
+    def __init__(self):
+        self.subscribers: defaultdict[UUID, list[asyncio.Queue]] = defaultdict(list)
+
+    def notify(self, update: TextExtractionUpdate) -> None:
+        for queue in self.subscribers[update.file_id]:
+            queue.put_nowait(update)
+
+    @asynccontextmanager
+    async def subscribe(self, *, file_id: UUID):
+        queue = asyncio.Queue()
+        self.subscribers[file_id].append(queue)
+
+        class Updates:
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self) -> TextExtractionUpdate:
+                return await queue.get()
+
+        try:
+            yield Updates()
+        finally:
+            self.subscribers[file_id].remove(queue)
+
+
+@pytest.fixture
+def files() -> FakeFileRepository:
+    return FakeFileRepository()
+
+
+@pytest.fixture
+def object_storage() -> FakeObjectStorage:
+    return FakeObjectStorage()
+
+
+@pytest.fixture
+def extraction_update_listener() -> FakeExtractionUpdateListener:
+    return FakeExtractionUpdateListener()
+
+
+@pytest.fixture
+def file_service(
+    files: FakeFileRepository,
+    object_storage: FakeObjectStorage,
+    extraction_update_listener: FakeExtractionUpdateListener,
+) -> FileService:
+    configuration = Configuration(
+        object_storage=ObjectStorageConfiguration(
+            max_single_file_size=MAX_FILE_SIZE, storage_limit_per_user_bytes=MAX_USER_STORAGE
+        ),
+        persistence=PersistenceConfiguration(encryption_key=Secret(Fernet.generate_key().decode())),
+    )
+    return FileService(
+        object_storage_repository=object_storage,
+        extraction_backend=SimpleNamespace(name="docling"),
+        builtin_extraction_backend=SimpleNamespace(name="builtin"),
+        extraction_update_listener=extraction_update_listener,
+        uow=lambda: FakeUnitOfWork(files),
+        user_service=None,
+        configuration=configuration,
+    )
+
+
+@pytest.fixture
+def user() -> User:
+    return User(email="user@beeai.dev")
+
+
+@pytest.fixture
+def other_user() -> User:
+    return User(email="other@beeai.dev")
+
+
+def async_file(content: bytes, size: int | None = None) -> tuple[AsyncFile, list[int]]:
+    """File reading the content, the returned list records the requested read sizes."""
+    reads = []
+
+    async def read(amount: int = -1) -> bytes:
+        nonlocal content
+        reads.append(amount)
+        amount = len(content) if amount < 0 else amount
+        chunk, content = content[:amount], content[amount:]
+        return chunk
+
+    return AsyncFile(filename="data.bin", content_type="application/octet-stream", read=read, size=size), reads
+
+
+@pytest.mark.asyncio
+async def test_upload_file(file_service: FileService, object_storage: FakeObjectStorage, user: User):
+    file, _ = async_file(b"x" * MAX_FILE_SIZE, size=MAX_FILE_SIZE)
+    db_file = await file_service.upload_file(file=file, user=user)
+    assert db_file.file_size_bytes == MAX_FILE_SIZE
+    assert object_storage.objects[db_file.id] == b"x" * MAX_FILE_SIZE
+
+
+@pytest.mark.asyncio
+async def test_upload_declared_oversize_file_is_rejected_before_reading(
+    file_service: FileService, files: FakeFileRepository, object_storage: FakeObjectStorage, user: User
+):
+    file, reads = async_file(b"x" * (MAX_FILE_SIZE + 1), size=MAX_FILE_SIZE + 1)
+    with pytest.raises(StorageCapacityExceededError):
+        await file_service.upload_file(file=file, user=user)
+    assert reads == []
+    assert not object_storage.objects and not files.files
+
+
+@pytest.mark.asyncio
+async def test_upload_undeclared_oversize_file_is_rejected_while_reading(
+    file_service: FileService, object_storage: FakeObjectStorage, user: User
+):
+    file, reads = async_file(b"x" * (MAX_FILE_SIZE + 1))
+    with pytest.raises(StorageCapacityExceededError):
+        await file_service.upload_file(file=file, user=user)
+    assert reads
+    assert not object_storage.objects
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [MULTIPART_SIZE, MULTIPART_SIZE + 1])
+async def test_upload_session(
+    file_service: FileService, files: FakeFileRepository, object_storage: FakeObjectStorage, user: User, size: int
+):
+    session = await file_service.create_upload_session(
+        filename="data.bin", content_type="application/octet-stream", size=size, user=user
+    )
+    assert (session.upload_id is None) == (size <= MULTIPART_SIZE)
+
+    parts = [CompletedUploadPart(part_number=1, etag="etag")] if session.upload_id else []
+    db_file = await file_service.complete_upload_session(
+        file_id=session.file_id, upload_id=session.upload_id, parts=parts, user=user
+    )
+    assert db_file.id == session.file_id
+    assert db_file.file_size_bytes == size
+    assert files.files[db_file.id].created_by == user.id
+    assert not object_storage.uploads
+
+    # Completing again (a retry) returns the same file
+    again = await file_service.complete_upload_session(
+        file_id=session.file_id, upload_id=session.upload_id, parts=parts, user=user
+    )
+    assert again == db_file
+
+
+@pytest.mark.asyncio
+async def test_upload_session_declared_size_over_quota(
+    file_service: FileService, object_storage: FakeObjectStorage, user: User
+):
+    with pytest.raises(StorageCapacityExceededError):
+        await file_service.create_upload_session(
+            filename="data.bin", content_type="application/octet-stream", size=MAX_FILE_SIZE + 1, user=user
+        )
+    assert not object_storage.uploads and not object_storage.metadata
+
+
+@pytest.mark.asyncio
+async def test_upload_session_actual_size_over_quota(
+    file_service: FileService, files: FakeFileRepository, object_storage: FakeObjectStorage, user: User
+):
+    session = await file_service.create_upload_session(
+        filename="data.bin", content_type="application/octet-stream", size=10, user=user
+    )
+    # The storage used by the user grows before the upload is completed
+    await files.create(file=File(filename="other.bin", file_size_bytes=MAX_USER_STORAGE - 5, created_by=user.id))
+
+    with pytest.raises(StorageCapacityExceededError):
+        await file_service.complete_upload_session(file_id=session.file_id, user=user)
+    assert session.file_id not in files.files
+    assert session.file_id not in object_storage.metadata
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [MULTIPART_SIZE, MULTIPART_SIZE + 1])
+async def test_upload_session_of_other_user_cannot_be_completed(
+    file_service: FileService, files: FakeFileRepository, user: User, other_user: User, size: int
+):
+    session = await file_service.create_upload_session(
+        filename="data.bin", content_type="application/octet-stream", size=size, user=user
+    )
+    with pytest.raises(EntityNotFoundError):
+        await file_service.complete_upload_session(
+            file_id=session.file_id, upload_id=session.upload_id, user=other_user
+        )
+    assert session.file_id not in files.files
+
+
+@pytest.mark.asyncio
+async def test_abort_upload_session(file_service: FileService, object_storage: FakeObjectStorage, user: User):
+    session = await file_service.create_upload_session(
+        filename="data.bin", content_type="application/octet-stream", size=MULTIPART_SIZE + 1, user=user
+    )
+    await file_service.abort_upload_session(file_id=session.file_id, upload_id=session.upload_id, user=user)
+    assert not object_storage.uploads
+
+    with pytest.raises(EntityNotFoundError):
+        await file_service.abort_upload_session(file_id=session.file_id, upload_id=session.upload_id, user=user)
+
+
+@pytest.mark.asyncio
+async def test_upload_session_of_other_user_cannot_be_aborted(
+    file_service: FileService, object_storage: FakeObjectStorage, user: User, other_user: User
+):
+    session = await file_service.create_upload_session(
+        filename="data.bin", content_type="application/octet-stream", size=MULTIPART_SIZE + 1, user=user
+    )
+    storage_upload_id = session.upload_id.rpartition(".")[0]
+    for upload_id in [session.upload_id, storage_upload_id, f"{storage_upload_id}.forged"]:
+        with pytest.raises(EntityNotFoundError):
+            await file_service.abort_upload_session(file_id=session.file_id, upload_id=upload_id, user=other_user)
+    assert storage_upload_id in object_storage.uploads
+
+
+async def collect_events(stream) -> list[tuple[ExtractionStatus, int | None]]:
+    async with asyncio.timeout(1):
+        return [(event.extraction.status, event.progress_bytes) async for event in stream]
+
+
+async def file_with_extraction(files: FakeFileRepository, user: User, status: ExtractionStatus) -> UUID:
+    file = File(filename="data.pdf", file_size_bytes=10, created_by=user.id)
+    await files.create(file=file)
+    files.extractions[file.id] = TextExtraction(file_id=file.id, status=status)
+    return file.id
+
+
+@pytest.mark.asyncio
+async def test_watch_extraction_ends_on_terminal_status(
+    file_service: FileService,
+    files: FakeFileRepository,
+    extraction_update_listener: FakeExtractionUpdateListener,
+    user: User,
+):
+    file_id = await file_with_extraction(files, user, ExtractionStatus.pending)
+
+    async def run_extraction():
+        await asyncio.sleep(0.01)  # let the stream subscribe
+        files.extractions[file_id].status = ExtractionStatus.in_progress
+        extraction_update_listener.notify(TextExtractionUpdate(file_id=file_id))
+        extraction_update_listener.notify(TextExtractionUpdate(file_id=file_id, progress_bytes=5))
+        await asyncio.sleep(0.01)
+        files.extractions[file_id].status = ExtractionStatus.completed
+        extraction_update_listener.notify(TextExtractionUpdate(file_id=file_id))
+
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(run_extraction())
+        events = await collect_events(file_service.watch_extraction(file_id=file_id, user=user))
+
+    assert events == [
+        (ExtractionStatus.pending, None),
+        (ExtractionStatus.in_progress, None),
+        (ExtractionStatus.in_progress, 5),
+        (ExtractionStatus.completed, None),
+    ]
+    assert not extraction_update_listener.subscribers[file_id]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status", [ExtractionStatus.completed, ExtractionStatus.failed, ExtractionStatus.cancelled])
+async def test_watch_finished_extraction(
+    file_service: FileService, files: FakeFileRepository, user: User, status: ExtractionStatus
+):
+    file_id = await file_with_extraction(files, user, status)
+    assert await collect_events(file_service.watch_extraction(file_id=file_id, user=user)) == [(status, None)]
+
+
+@pytest.mark.asyncio
+async def test_watch_extraction_refreshes_without_updates(
+    file_service: FileService, files: FakeFileRepository, user: User, monkeypatch
+):
+    monkeypatch.setattr(files_service, "EXTRACTION_REFRESH_INTERVAL", timedelta(seconds=0.05))
+    file_id = await file_with_extraction(files, user, ExtractionStatus.in_progress)
+
+    async def finish_extraction():
+        await asyncio.sleep(0.12)  # more than one refresh, the notification is missed
+        files.extractions[file_id].status = ExtractionStatus.completed
+
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(finish_extraction())
+        events = await collect_events(file_service.watch_extraction(file_id=file_id, user=user))
+
+    assert events == [(ExtractionStatus.in_progress, None), (ExtractionStatus.completed, None)]
+
+
+@pytest.mark.asyncio
+async def test_watch_extraction_of_missing_file(
+    file_service: FileService,
+    files: FakeFileRepository,
+    extraction_update_listener: FakeExtractionUpdateListener,
+    user: User,
+    other_user: User,
+):
+    missing_file_id = UUID(int=0)
+    with pytest.raises(EntityNotFoundError):
+        await collect_events(file_service.watch_extraction(file_id=missing_file_id, user=user))
+    assert not extraction_update_listener.subscribers[missing_file_id]
+
+    # Files of other users are not found either
+    file_id = await file_with_extraction(files, user, ExtractionStatus.pending)
+    with pytest.raises(EntityNotFoundError):
+        await collect_events(file_service.watch_extraction(file_id=file_id, user=other_user))
+    assert not extraction_update_listener.subscribers[file_id]
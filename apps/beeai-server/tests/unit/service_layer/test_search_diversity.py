@@ -0,0 +1,71 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+import base64
+import uuid
+
+import numpy as np
+import pytest
+
+from beeai_server.domain.models.vector_store import (
+    EmbeddingFormat,
+    VectorStoreItemField,
+    VectorStoreSearchItem,
+    VectorStoreSearchResult,
+)
+from beeai_server.service_layer.services.vector_stores import diversify_search_results, select_search_result_fields
+
+pytestmark = pytest.mark.unit
+
+
+def _result(document_id: str, embedding: list[float], score: float) -> VectorStoreSearchResult:
+    item = VectorStoreSearchItem(
+        id=uuid.uuid4(), vector_store_id=uuid.uuid4(), document_id=document_id, text="text", embedding=embedding
+    )
+    return VectorStoreSearchResult(item=item, score=score)
+
+
+@pytest.fixture
+def results() -> list[VectorStoreSearchResult]:
+    return [
+        _result("a", [1, 0, 0], 0.99),
+        _result("a", [0.99, 0.01, 0], 0.98),
+        _result("a", [0.98, 0.02, 0], 0.97),
+        _result("b", [0.7, 0.7, 0], 0.7),
+    ]
+
+
+def test_mmr_prefers_diverse_results(results):
+    diversified = diversify_search_results(results, [1, 0, 0], limit=2, mmr_lambda=0.3)
+    assert [result.item.document_id for result in diversified] == ["a", "b"]
+    assert diversified[1].score == 0.7
+
+
+def test_mmr_lambda_one_keeps_relevance_order(results):
+    diversified = diversify_search_results(results, [1, 0, 0], limit=3, mmr_lambda=1)
+    assert diversified == results[:3]
+
+
+def test_max_per_document(results):
+    diversified = diversify_search_results(results, [1, 0, 0], limit=3, max_per_document=2)
+    assert diversified == [results[0], results[1], results[3]]
+
+
+def test_max_per_document_returns_fewer_results(results):
+    assert diversify_search_results(results, [1, 0, 0], limit=3, max_per_document=1) == [results[0], results[3]]
+
+
+def test_diversify_empty():
+    assert diversify_search_results([], [1, 0, 0], limit=3, mmr_lambda=0.5) == []
+
+
+def test_select_search_result_fields(results):
+    result = select_search_result_fields(
+        results[3],
+        include={VectorStoreItemField.embedding},
+        embedding_format=EmbeddingFormat.base64,
+    )
+    assert result.item.text is None
+    decoded = np.frombuffer(base64.b64decode(result.item.embedding), dtype="<f2")
+    assert np.allclose(decoded, [0.7, 0.7, 0], atol=1e-3)
+    assert select_search_result_fields(results[3], include=set()).item.embedding is None
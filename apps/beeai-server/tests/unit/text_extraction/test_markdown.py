@@ -0,0 +1,139 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+import io
+import json
+import subprocess
+import sys
+import zipfile
+
+import pytest
+
+from beeai_server.configuration import BuiltinExtractionConfiguration
+from beeai_server.domain.models.file import AsyncFile
+from beeai_server.infrastructure.text_extraction.builtin import BuiltinTextExtractionBackend
+from beeai_server.infrastructure.text_extraction.markdown import (
+    DOCX_CONTENT_TYPE,
+    convert_to_markdown,
+    csv_to_markdown,
+    docx_to_markdown,
+    html_to_markdown,
+    json_to_markdown,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def test_html_to_markdown():
+    html = b"""
+        <html><head><title>Ignored</title><style>p {color: red}</style></head>
+        <body>
+            <h1>Title</h1>
+            <p>Some <strong>bold</strong> and <a href="https://example.com">a link</a>.</p>
+            <ul><li>first</li><li>second</li></ul>
+            <table><tr><th>Name</th><th>Value</th></tr><tr><td>a|b</td><td>1</td></tr></table>
+            <pre>x = 1
+y = 2</pre>
+            <script>alert("ignored")</script>
+        </body></html>
+    """
+    assert html_to_markdown(html, "text/html") == (
+        "# Title\n\n"
+        "Some **bold** and [a link](https://example.com).\n\n"
+        "- first\n- second\n\n"
+        "| Name | Value |\n|---|---|\n| a\\|b | 1 |\n\n"
+        "```\nx = 1\ny = 2\n```\n"
+    )
+
+
+def test_html_charset():
+    assert html_to_markdown("<p>žluťoučký</p>".encode("cp1250"), "text/html; charset=windows-1250") == "žluťoučký\n"
+
+
+@pytest.mark.parametrize("delimiter", [",", ";", "\t"])
+def test_csv_to_markdown(delimiter: str):
+    content = delimiter.join(["name", "value"]) + "\n" + delimiter.join(["a", '"b, c"']) + "\n"
+    assert csv_to_markdown(content.encode(), "text/csv") == "| name | value |\n|---|---|\n| a | b, c |\n"
+
+
+def test_json_to_markdown():
+    assert json_to_markdown(json.dumps({"hello": "světe"}).encode(), "application/json") == (
+        '```json\n{\n  "hello": "světe"\n}\n```\n'
+    )
+    assert json_to_markdown(b'{"a": 1}\n{"a": 2}', "application/json") == '```json\n{"a": 1}\n{"a": 2}\n```\n'
+
+
+def docx(body: str) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(
+            "word/document.xml",
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f"<w:body>{body}</w:body></w:document>",
+        )
+    return buffer.getvalue()
+
+
+def test_docx_to_markdown():
+    content = docx(
+        '<w:p><w:pPr><w:pStyle w:val="Heading2"/></w:pPr><w:r><w:t>Heading</w:t></w:r></w:p>'
+        "<w:p><w:r><w:t>Hello </w:t></w:r><w:r><w:t>world</w:t></w:r></w:p>"
+        "<w:p><w:pPr><w:numPr/></w:pPr><w:r><w:t>item</w:t></w:r></w:p>"
+        "<w:tbl><w:tr><w:tc><w:p><w:r><w:t>A</w:t></w:r></w:p></w:tc><w:tc><w:p><w:r><w:t>B</w:t></w:r></w:p></w:tc>"
+        "</w:tr><w:tr><w:tc><w:p><w:r><w:t>1</w:t></w:r></w:p></w:tc></w:tr></w:tbl>"
+    )
+    assert docx_to_markdown(content, DOCX_CONTENT_TYPE) == (
+        "## Heading\n\nHello world\n\n- item\n\n| A | B |\n|---|---|\n| 1 |  |\n"
+    )
+
+
+def test_docx_decompressed_size_is_limited():
+    content = docx("<w:p><w:r><w:t>bomb</w:t></w:r></w:p>" * 100_000)  # 3.7 MB of XML compressed to a few KB
+    assert len(content) < 100_000
+    with pytest.raises(ValueError, match="exceeds the limit"):
+        docx_to_markdown(content, DOCX_CONTENT_TYPE, max_size=1024 * 1024)
+    with pytest.raises(ValueError, match="exceeds the limit"):
+        convert_to_markdown(content, DOCX_CONTENT_TYPE, max_size=1024 * 1024)
+    assert convert_to_markdown(content, DOCX_CONTENT_TYPE, max_size=4 * 1024 * 1024).startswith("bomb\n\nbomb")
+
+
+def test_convert_to_markdown_media_type():
+    assert convert_to_markdown(b"a,b\n1,2\n", "Text/CSV; charset=utf-8") == "| a | b |\n|---|---|\n| 1 | 2 |\n"
+
+
+def test_builtin_backend_supports():
+    backend = BuiltinTextExtractionBackend(BuiltinExtractionConfiguration(max_file_size=100))
+    assert backend.supports(content_type="text/html; charset=utf-8", size=100)
+    assert not backend.supports(content_type="text/html", size=101)
+    assert not backend.supports(content_type="application/pdf")
+    disabled = BuiltinTextExtractionBackend(BuiltinExtractionConfiguration(enabled=False))
+    assert not disabled.supports(content_type="text/csv")
+
+
+@pytest.mark.asyncio
+async def test_builtin_backend_extract_text():
+    content = b"<h2>Hello</h2>"
+
+    async def read(size: int = -1) -> bytes:
+        nonlocal content
+        chunk, content = content[:size], content[size:]
+        return chunk
+
+    backend = BuiltinTextExtractionBackend(BuiltinExtractionConfiguration())
+    file = AsyncFile(filename="page.html", content_type="text/html", read=read)
+    async with backend.extract_text(file=file) as extracted_file:
+        assert extracted_file.content_type == "text/markdown"
+        assert await extracted_file.read(-1) == b"## Hello\n"
+        assert extracted_file.size == len(b"## Hello\n")
+
+
+def test_worker_process_import_has_no_side_effects():
+    # The converters are imported by the worker processes, which must not configure logging or telemetry
+    code = (
+        "import logging\n"
+        "from opentelemetry import trace\n"
+        "import beeai_server.infrastructure.text_extraction.markdown\n"
+        "assert not logging.getLogger().handlers, logging.getLogger().handlers\n"
+        "assert type(trace.get_tracer_provider()).__name__ == 'ProxyTracerProvider', trace.get_tracer_provider()\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, timeout=60)
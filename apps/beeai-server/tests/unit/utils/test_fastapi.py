@@ -0,0 +1,96 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+from fastapi import HTTPException
+
+from beeai_server.utils.fastapi import MultipartFileReader, StreamReader, etag_matches, parse_range_header
+
+pytestmark = pytest.mark.unit
+
+BOUNDARY = b"----boundary"
+CONTENT = bytes(range(256)) * 40
+
+
+def multipart_body(content: bytes) -> bytes:
+    return (
+        b"--" + BOUNDARY + b"\r\n"
+        b'Content-Disposition: form-data; name="purpose"\r\n\r\n'
+        b"upload\r\n"
+        b"--" + BOUNDARY + b"\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="data.bin"\r\n'
+        b"Content-Type: application/octet-stream\r\n\r\n" + content + b"\r\n"
+        b"--" + BOUNDARY + b"--\r\n"
+    )
+
+
+async def chunked(data: bytes, chunk_size: int):
+    for offset in range(0, len(data), chunk_size):
+        yield data[offset : offset + chunk_size]
+
+
+async def read_all(reader: StreamReader, size: int) -> bytes:
+    content = b""
+    while chunk := await reader.read(size):
+        assert len(chunk) <= size
+        content += chunk
+    return content
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000, 100_000])
+async def test_stream_reader(chunk_size: int):
+    reader = StreamReader(chunked(CONTENT, chunk_size))
+    assert await read_all(reader, 333) == CONTENT
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000, 100_000])
+async def test_multipart_file_reader(chunk_size: int):
+    reader = MultipartFileReader(chunked(multipart_body(CONTENT), chunk_size), boundary=BOUNDARY)
+    await reader.open()
+    assert (reader.filename, reader.content_type) == ("data.bin", "application/octet-stream")
+    assert await read_all(reader, 333) == CONTENT
+
+
+@pytest.mark.asyncio
+async def test_multipart_file_reader_incomplete_body():
+    reader = MultipartFileReader(chunked(multipart_body(CONTENT)[:-100], 1000), boundary=BOUNDARY)
+    await reader.open()
+    with pytest.raises(HTTPException, match="Incomplete multipart body"):
+        await reader.read()
+
+
+@pytest.mark.parametrize(
+    "range_header,expected",
+    [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=100-", (100, 999)),
+        ("bytes=900-2000", (900, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-2000", (0, 999)),
+        ("bytes=0-0", (0, 0)),
+        ("bytes=0-9,20-29", None),
+        ("bytes=20-10", None),
+        ("bytes=-", None),
+        ("bytes=a-b", None),
+        ("items=0-10", None),
+    ],
+)
+def test_parse_range_header(range_header: str, expected: tuple[int, int] | None):
+    assert parse_range_header(range_header, size=1000) == expected
+
+
+@pytest.mark.parametrize("range_header,size", [("bytes=1000-", 1000), ("bytes=-0", 1000), ("bytes=0-", 0)])
+def test_parse_range_header_unsatisfiable(range_header: str, size: int):
+    with pytest.raises(HTTPException) as exc_info:
+        parse_range_header(range_header, size=size)
+    assert exc_info.value.status_code == 416
+    assert exc_info.value.headers == {"Content-Range": f"bytes */{size}"}
+
+
+def test_etag_matches():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"def"', '"abc"')
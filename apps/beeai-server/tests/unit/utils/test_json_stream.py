@@ -0,0 +1,95 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import random
+from io import StringIO
+from typing import Any
+
+import pytest
+
+from beeai_server.utils.json_stream import JsonStringValueExtractor, extract_string_value_stream
+
+
+def async_json_reader(obj: dict[str, Any] | str):
+    stringio = StringIO(json.dumps(obj) if not isinstance(obj, str) else obj)
+
+    async def read(size: int):
+        while chunk := stringio.read(size):
+            yield chunk
+
+    return read
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "obj",
+    [
+        {"text": "abcde" * 100},
+        {"text": "abcde" * 100, "other_key": 42},
+        {"first_key": '"text": "haha"', "text": "abcde" * 100, "other_key": 666},
+        {"text": 'escape "hell\\"\\' * 1000},
+        {"text": 'escape "hell2\\n\t\r\\d"\\' * 1000},
+        {"text": "unicode \u00e9\u4e2d\U0001f600 \ud83d lone surrogates \ude00" * 100},
+    ],
+)
+async def test_extract_string_value_stream(obj):
+    reader = async_json_reader(obj)
+
+    result = []
+    async for chunk in extract_string_value_stream(reader, "text", chunk_size=128):
+        result.append(chunk)
+
+    assert "".join(result) == obj["text"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "obj, error",
+    [
+        ({"txt": "aa"}, KeyError),
+        ('{"text": "aaaa ', EOFError),
+    ],
+)
+async def test_extract_string_value_stream_key_in_between_chunks(obj, error):
+    reader = async_json_reader(obj)
+
+    with pytest.raises(error):
+        async for _chunk in extract_string_value_stream(reader, "text"):
+            ...
+
+
+# Characters which are escaped by json.dumps, including surrogate pairs and lone surrogates
+FUZZ_ALPHABET = ["a", "b", " ", '"', "\\", "/", "\n", "\t", "\x00", "\x1f", "é", "中", "\U0001f600", "\ud83d", "\ude00"]
+
+
+def fuzz_document(rng: random.Random) -> tuple[str, str]:
+    value = "".join(rng.choices(FUZZ_ALPHABET, k=rng.randint(0, 300)))
+    document = {"before": "".join(rng.choices(FUZZ_ALPHABET, k=20)), "md_content": value, "after": 1}
+    document = json.dumps(document, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 2]))
+    return document, json.loads(document)["md_content"]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("seed", range(200))
+def test_json_string_value_extractor_fuzz(seed: int):
+    """Any split of the document into chunks decodes to the value parsed by json.loads."""
+    rng = random.Random(seed)
+    document, value = fuzz_document(rng)
+    extractor = JsonStringValueExtractor("md_content")
+    result, offset = [], 0
+    while offset < len(document) and not extractor.done:
+        size = rng.choice([1, 2, 3, 5, 7, 13, 64, 1000])
+        result.append(extractor.feed(document[offset : offset + size]))
+        offset += size
+    extractor.close()
+    assert "".join(result) == value
+
+
+@pytest.mark.unit
+def test_json_string_value_extractor_invalid_escape():
+    extractor = JsonStringValueExtractor("md_content")
+    with pytest.raises(ValueError, match="Invalid escape sequence"):
+        extractor.feed('{"md_content": "abc \\x41 def"}')
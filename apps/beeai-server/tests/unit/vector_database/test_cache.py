@@ -0,0 +1,116 @@
+# Copyright 2025 © BeeAI a Series of LF Projects, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+import base64
+import uuid
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from beeai_server.configuration import VectorStoresConfiguration
+from beeai_server.domain.models.vector_store import (
+    EmbeddingFormat,
+    VectorStore,
+    VectorStoreItemField,
+    VectorStoreSearchItem,
+    VectorStoreStats,
+)
+from beeai_server.infrastructure.vector_database.cache import InMemoryVectorStoreCache
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def vector_store() -> VectorStore:
+    return VectorStore(
+        model_id="test_model",
+        dimension=4,
+        created_by=uuid.uuid4(),
+        stats=VectorStoreStats(usage_bytes=1000, num_documents=1),
+    )
+
+
+@pytest.fixture
+def items() -> tuple[list[VectorStoreSearchItem], np.ndarray]:
+    embeddings = np.array([[1, 0, 0, 0], [1, 1, 0, 0], [0, 0, 1, 0], [0.5, 0.1, 0, 0]], dtype=np.float32)
+    items = [
+        VectorStoreSearchItem(
+            id=uuid.uuid4(), vector_store_id=uuid.uuid4(), document_id="doc", text=f"Item {i}", metadata={"i": str(i)}
+        )
+        for i in range(len(embeddings))
+    ]
+    return items, embeddings
+
+
+@pytest.mark.asyncio
+async def test_search_returns_exact_top_k(vector_store, items):
+    cache = InMemoryVectorStoreCache(VectorStoresConfiguration(cache_min_searches=1))
+    assert await cache.search(vector_store, [1, 0, 0, 0]) is None
+    assert cache.should_load(vector_store)
+    assert not cache.should_load(vector_store)
+
+    cache.put(vector_store, *items)
+    results = await cache.search(vector_store, [1, 0.2, 0, 0], limit=2)
+
+    assert [result.item.text for result in results] == ["Item 3", "Item 0"]
+    assert results[0].score == pytest.approx(1.0)
+    assert results[0].item.embedding == pytest.approx([0.5, 0.1, 0, 0], abs=1e-3)
+    assert (cache.hits, cache.misses, cache.num_stores) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_search_field_selection(vector_store, items):
+    cache = InMemoryVectorStoreCache(VectorStoresConfiguration())
+    cache.put(vector_store, *items)
+
+    [result] = await cache.search(
+        vector_store,
+        [0, 0, 1, 0],
+        limit=1,
+        include=[VectorStoreItemField.embedding],
+        embedding_format=EmbeddingFormat.base64,
+    )
+
+    assert result.item.text is None and result.item.metadata is None
+    assert np.frombuffer(base64.b64decode(result.item.embedding), dtype="<f2").tolist() == [0, 0, 1, 0]
+
+
+@pytest.mark.asyncio
+async def test_modified_vector_store_is_not_served(vector_store, items):
+    cache = InMemoryVectorStoreCache(VectorStoresConfiguration())
+    cache.put(vector_store, *items)
+
+    modified = vector_store.model_copy(update={"modified_at": vector_store.modified_at + timedelta(seconds=1)})
+
+    assert await cache.search(modified, [1, 0, 0, 0]) is None
+    assert cache.num_stores == 0
+    assert cache.memory_bytes == 0
+
+
+def test_least_recently_used_store_is_evicted(vector_store, items):
+    _, embeddings = items
+    store_size = embeddings.nbytes + sum(len(f"Item {i}") + len('{"i": "0"}') + 64 for i in range(4))
+    cache = InMemoryVectorStoreCache(VectorStoresConfiguration(cache_size_bytes=2 * store_size))
+    other_stores = [vector_store.model_copy(update={"id": uuid.uuid4()}) for _ in range(2)]
+
+    for store in [vector_store, *other_stores]:
+        cache.put(store, *items)
+
+    assert cache.num_stores == 2
+    assert cache.memory_bytes == 2 * store_size
+
+
+@pytest.mark.asyncio
+async def test_search_counts_are_bounded(vector_store):
+    cache = InMemoryVectorStoreCache(VectorStoresConfiguration(cache_min_searches=2, cache_tracked_stores=2))
+    other_stores = [vector_store.model_copy(update={"id": uuid.uuid4()}) for _ in range(2)]
+
+    await cache.search(vector_store, [1, 0, 0, 0])
+    for store in other_stores:  # the least recently searched vector store is forgotten
+        await cache.search(store, [1, 0, 0, 0])
+    await cache.search(vector_store, [1, 0, 0, 0])
+    assert not cache.should_load(vector_store)
+
+    await cache.search(other_stores[1], [1, 0, 0, 0])
+    assert cache.should_load(other_stores[1])